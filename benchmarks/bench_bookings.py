@@ -0,0 +1,307 @@
+"""
+Concurrent booking throughput and oversell check.
+
+Each run books `--offers` hot flight offers in a scratch copy of the inventory database. N
+clients (asyncio tasks, spread over `--processes` processes that share the file and start
+together) each make `--attempts` bookings of 1-2 seats on random hot offers. Demand is about
+1.5 x N x attempts seats; the offers hold `--capacity` seats each, by default 80% of the demand
+in total, so the last attempts race for the last seats and find offers sold out. A
+`--retry-rate` share of attempts is sent a second time with the same idempotency key, like a
+tool call replayed after a retry.
+
+Every concurrency level runs twice: with group commit (`TRAVEL_BOOKING_MAX_BATCH`) and with one
+transaction per booking (`max_batch=1`), both with `synchronous` = `--synchronous`. Per run the
+benchmark reports:
+
+- confirmed bookings per second, attempts per second (every request the writers processed,
+  including rejections and replays), booking latency p50/p99
+- outcomes (confirmed, replayed, sold_out) and commits / mean bookings per transaction
+- the oversell check, read back from the database: for every offer, seats booked plus seats
+  left equals capacity and seats left is never negative; every idempotency key has exactly one
+  booking; every replay returned the booking of its first attempt
+
+The process exits non-zero when any check fails.
+
+Usage:
+    python -m benchmarks.bench_bookings [--concurrency 1,10,100] [--processes 2] [--attempts 20]
+                                        [--offers 20] [--capacity N] [--retry-rate 0.2]
+                                        [--synchronous FULL] [--output bookings.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.bench_graph import git_commit, summarize
+from src.config import BOOKING_MAX_BATCH, DB_SEED_PATH
+from src.db.bookings import BookingError, BookingStore
+from src.db.pool import ensure_database
+from src.metrics import LatencyRecorder
+
+
+def prepare(db_path: str, offers: int, capacity: int) -> List[str]:
+    """Scratch database with `offers` dated flight offers at `capacity` seats; their ids."""
+
+    ensure_database(db_path, DB_SEED_PATH)
+    conn = sqlite3.connect(db_path)
+    ids = [
+        row[0]
+        for row in conn.execute(
+            "SELECT id FROM flights WHERE price IS NOT NULL ORDER BY id LIMIT ?",
+            (offers,),
+        )
+    ]
+    conn.executemany(
+        "UPDATE flights SET available = ? WHERE id = ?", [(capacity, i) for i in ids]
+    )
+    conn.execute("DELETE FROM bookings")
+    conn.commit()
+    conn.close()
+    return ids
+
+
+async def client(
+    store: BookingStore,
+    rng: random.Random,
+    ids: List[str],
+    name: str,
+    attempts: int,
+    retry_rate: float,
+    latency: LatencyRecorder,
+    outcomes: Counter,
+    replays: List[Tuple[str, str]],
+) -> None:
+    for attempt in range(attempts):
+        key = f"{name}:{attempt}"
+        item_id, seats = rng.choice(ids), rng.choice((1, 2))
+        for send in range(2 if rng.random() < retry_rate else 1):
+            start = time.perf_counter()
+            try:
+                booking = await store.book("flight", item_id, seats, key)
+                outcomes["replayed" if send else "confirmed"] += 1
+                replays.append((key, booking.booking_id))
+            except BookingError as e:
+                outcomes[e.reason] += 1
+            except Exception:
+                outcomes["error"] += 1
+            latency.record("booking", time.perf_counter() - start)
+
+
+async def run_clients(
+    db_path: str,
+    ids: List[str],
+    worker: int,
+    clients: int,
+    args: Dict[str, Any],
+) -> Dict[str, Any]:
+    store = BookingStore(
+        db_path, synchronous=args["synchronous"], max_batch=args["max_batch"]
+    )
+    latency = LatencyRecorder(max_samples=10**6)
+    outcomes: Counter = Counter()
+    replays: List[Tuple[str, str]] = []
+    rng = random.Random(worker)
+    start = time.time()
+    await asyncio.gather(
+        *(
+            client(
+                store,
+                rng,
+                ids,
+                f"w{worker}c{i}",
+                args["attempts"],
+                args["retry_rate"],
+                latency,
+                outcomes,
+                replays,
+            )
+            for i in range(clients)
+        )
+    )
+    end = time.time()
+    stats = store.stats()
+    await store.close()
+    return {
+        "start": start,
+        "end": end,
+        "outcomes": dict(outcomes),
+        "commits": stats.get("commits", 0),
+        "samples": latency.samples["booking"],
+        "replays": replays,
+    }
+
+
+def worker_main(job: tuple, barrier, results) -> None:
+    # Imports and interpreter start-up are done; start booking together with the others
+    barrier.wait()
+    results.put(asyncio.run(run_clients(*job)))
+
+
+def verify(
+    db_path: str, ids: List[str], capacity: int, replays: List[Tuple[str, str]]
+) -> Dict[str, Any]:
+    conn = sqlite3.connect(db_path)
+    left = dict(
+        conn.execute(
+            f"SELECT id, available FROM flights WHERE id IN ({', '.join('?' * len(ids))})",
+            ids,
+        ).fetchall()
+    )
+    booked = dict(
+        conn.execute(
+            "SELECT item_id, SUM(quantity) FROM bookings GROUP BY item_id"
+        ).fetchall()
+    )
+    keys, rows = conn.execute(
+        "SELECT COUNT(DISTINCT idempotency_key), COUNT(*) FROM bookings"
+    ).fetchone()
+    conn.close()
+    by_key: Dict[str, set] = {}
+    for key, booking_id in replays:
+        by_key.setdefault(key, set()).add(booking_id)
+    oversold = [i for i in ids if left[i] < 0 or booked.get(i, 0) + left[i] != capacity]
+    return {
+        "seats_booked": sum(booked.values()),
+        "seats_left": sum(left.values()),
+        "oversold_offers": len(oversold),
+        "duplicate_bookings": rows - keys,
+        "replays_with_new_booking": sum(len(v) > 1 for v in by_key.values()),
+        "ok": not oversold
+        and rows == keys
+        and all(len(v) == 1 for v in by_key.values()),
+    }
+
+
+def run(args, concurrency: int, max_batch: int, workdir: str) -> Dict[str, Any]:
+    db_path = os.path.join(workdir, f"bookings-{concurrency}-{max_batch}.db")
+    capacity = args.capacity or math.ceil(
+        0.8 * 1.5 * concurrency * args.attempts / args.offers
+    )
+    ids = prepare(db_path, args.offers, capacity)
+    options = {
+        "synchronous": args.synchronous,
+        "max_batch": max_batch,
+        "attempts": args.attempts,
+        "retry_rate": args.retry_rate,
+    }
+    processes = max(1, min(args.processes, concurrency))
+    jobs = [
+        (
+            db_path,
+            ids,
+            w,
+            concurrency // processes + (w < concurrency % processes),
+            options,
+        )
+        for w in range(processes)
+    ]
+
+    if processes == 1:
+        results = [asyncio.run(run_clients(*jobs[0]))]
+    else:
+        context = multiprocessing.get_context("spawn")
+        barrier, queue = context.Barrier(processes), context.Queue()
+        workers = [
+            context.Process(target=worker_main, args=(job, barrier, queue))
+            for job in jobs
+        ]
+        for worker in workers:
+            worker.start()
+        results = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+    wall = max(r["end"] for r in results) - min(r["start"] for r in results)
+
+    outcomes: Counter = Counter()
+    latency = LatencyRecorder(max_samples=10**7)
+    replays: List[Tuple[str, str]] = []
+    commits = 0
+    for result in results:
+        outcomes.update(result["outcomes"])
+        latency.samples["booking"].extend(result["samples"])
+        replays.extend(result["replays"])
+        commits += result["commits"]
+    attempts = sum(outcomes.values())
+    return {
+        "concurrency": concurrency,
+        "processes": processes,
+        "max_batch": max_batch,
+        "wall_s": round(wall, 3),
+        "bookings_per_s": round(outcomes["confirmed"] / wall, 1),
+        "attempts_per_s": round(attempts / wall, 1),
+        "latency": summarize(latency)["booking"],
+        "outcomes": dict(outcomes),
+        "commits": commits,
+        "mean_batch": round(attempts / max(1, commits), 2),
+        "capacity": capacity,
+        "check": verify(db_path, ids, capacity, replays),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent booking benchmark.")
+    parser.add_argument(
+        "--concurrency", default="1,10,100", help="Comma-separated numbers of clients"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=2, help="Processes sharing the database file"
+    )
+    parser.add_argument("--attempts", type=int, default=20, help="Bookings per client")
+    parser.add_argument("--offers", type=int, default=20)
+    parser.add_argument(
+        "--capacity", type=int, help="Seats per offer (default: 80%% of the demand)"
+    )
+    parser.add_argument("--retry-rate", type=float, default=0.2)
+    parser.add_argument("--synchronous", default="FULL", choices=("FULL", "NORMAL"))
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="travel-bench-")
+    runs = []
+    try:
+        for concurrency in (int(n) for n in args.concurrency.split(",")):
+            for max_batch in (BOOKING_MAX_BATCH, 1):
+                result = run(args, concurrency, max_batch, workdir)
+                runs.append(result)
+                print(
+                    f"{concurrency:5d} clients  max_batch {max_batch:<4d} "
+                    f"{result['bookings_per_s']:>8} bookings/s  "
+                    f"p99 {result['latency']['p99_ms']:.1f} ms  "
+                    f"batch {result['mean_batch']:>6}  "
+                    f"sold_out {result['outcomes'].get('sold_out', 0):>5}  "
+                    f"oversold {result['check']['oversold_offers']}  "
+                    f"{'ok' if result['check']['ok'] else 'FAILED'}",
+                    file=sys.stderr,
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "offers": args.offers,
+            "attempts_per_client": args.attempts,
+            "retry_rate": args.retry_rate,
+            "synchronous": args.synchronous,
+        },
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if not all(result["check"]["ok"] for result in runs):
+        sys.exit(1)
@@ -0,0 +1,162 @@
+"""
+Checkpoint I/O over a long conversation: stock in-memory layout vs. `SQLiteCheckpointer`.
+
+One thread runs `--turns` planner requests (cycling through corpus.jsonl with the scripted model
+from scripted_model.py), so `messages` keeps growing. For each checkpointer the benchmark
+reports the bytes written per turn (early, middle and last turns, to show growth), the total,
+and the latency of each checkpoint write (`aput` / `aput_writes`) as seen by the graph.
+
+- `memory`: `InMemorySaver`, which stores each new channel version in full like the stock
+  savers; its bytes are the serialized sizes it keeps.
+- `sqlite-full`: `SQLiteCheckpointer` with deltas and compression off.
+- `sqlite-delta`: `SQLiteCheckpointer` with its defaults (deltas, compression, group commit).
+
+History compaction is off unless TRAVEL_HISTORY_TOKEN_BUDGET is set, so the history grows
+unbounded as it would in a stock deployment.
+
+Usage:
+    python -m benchmarks.bench_checkpointer [--turns 40] [--output checkpoints.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("TRAVEL_HISTORY_TOKEN_BUDGET", "0")
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.bench_graph import CORPUS, load_corpus, summarize
+from benchmarks.scripted_model import install
+from src.metrics import LatencyRecorder
+
+
+def memory_bytes(saver) -> int:
+    """Serialized bytes held by an InMemorySaver."""
+
+    total = sum(len(b) for _, b in saver.blobs.values())
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            for (_, checkpoint), (_, metadata), _ in checkpoints.values():
+                total += len(checkpoint) + len(metadata)
+    for writes in saver.writes.values():
+        total += sum(len(value[2][1]) for value in writes.values())
+    return total
+
+
+def timed(recorder: LatencyRecorder, label: str, method: Callable) -> Callable:
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            recorder.record(label, time.perf_counter() - start)
+
+    return wrapper
+
+
+async def run_conversation(
+    name: str, saver, bytes_written: Callable[[], int], corpus, scripted, turns: int
+) -> Dict[str, Any]:
+    from src.graph import create_travel_planner
+
+    latency = LatencyRecorder(max_samples=100_000)
+    saver.aput = timed(latency, "aput", saver.aput)
+    saver.aput_writes = timed(latency, "aput_writes", saver.aput_writes)
+    planner = create_travel_planner(saver)
+    config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+
+    per_turn: List[int] = []
+    start = time.perf_counter()
+    for turn in range(turns):
+        entry = corpus[turn % len(corpus)]
+        scripted.use(entry["script"])
+        before = bytes_written()
+        await planner.ainvoke(
+            {"messages": [HumanMessage(content=entry["request"])]}, config
+        )
+        per_turn.append(bytes_written() - before)
+    wall = time.perf_counter() - start
+
+    state = await planner.aget_state(config)
+    return {
+        "messages": len(state.values["messages"]),
+        "wall_s": round(wall, 3),
+        "bytes_total": sum(per_turn),
+        "bytes_per_turn": {
+            "first": per_turn[0],
+            "middle": per_turn[len(per_turn) // 2],
+            "last": per_turn[-1],
+        },
+        "write_latency": summarize(latency),
+    }
+
+
+async def main(corpus_path: str, turns: int) -> Dict[str, Any]:
+    scripted = install()
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from src.checkpointer import SQLiteCheckpointer
+    from src.tools import close_inventory
+
+    corpus = load_corpus(corpus_path)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        memory = InMemorySaver()
+        results["memory"] = await run_conversation(
+            "memory", memory, lambda: memory_bytes(memory), corpus, scripted, turns
+        )
+        variants = {
+            "sqlite-full": dict(snapshot_every=1, compress_min_bytes=2**62),
+            "sqlite-delta": {},
+        }
+        for name, options in variants.items():
+            saver = SQLiteCheckpointer(
+                os.path.join(directory, f"{name}.db"), prune_seconds=0, **options
+            )
+            async with saver:
+                results[name] = await run_conversation(
+                    name,
+                    saver,
+                    lambda: saver.counters["bytes_written"],
+                    corpus,
+                    scripted,
+                    turns,
+                )
+                results[name]["stats"] = {
+                    key: round(value, 3) for key, value in saver.stats().items()
+                }
+    await close_inventory()
+    return {"meta": {"turns": turns, "corpus": os.path.relpath(corpus_path)}, **results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checkpointer I/O benchmark.")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args.corpus, args.turns))
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        for name in ("memory", "sqlite-full", "sqlite-delta"):
+            result = report[name]
+            per_turn = result["bytes_per_turn"]
+            aput = result["write_latency"].get("aput", {})
+            print(
+                f"{name:13s} total {result['bytes_total'] / 1024:9.1f} KiB  "
+                f"per turn {per_turn['first'] / 1024:6.1f} -> {per_turn['last'] / 1024:7.1f} KiB  "
+                f"aput p50 {aput.get('p50_ms', 0):.2f} ms p95 {aput.get('p95_ms', 0):.2f} ms",
+                file=sys.stderr,
+            )
+    else:
+        print(text)
@@ -0,0 +1,123 @@
+"""
+Cold-start benchmark: import `src.graph` and build `create_travel_planner` in fresh interpreters.
+
+Each run starts a new Python process (no warm module cache in memory) and measures the time to
+import the graph module (with the scripted model from scripted_model.py installed), to construct
+the planner, and to answer a first request, which includes anything built lazily on first use.
+Each run also starts without a runtime inventory database (TRAVEL_DB_PATH points into a fresh
+temporary directory), so copying and preparing it from the seed counts towards the first request.
+The import-time profile (`python -X importtime`) lists the modules with the largest cumulative
+import time.
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs 5] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs in the child interpreter; prints one JSON line of timings
+CHILD = """
+import json, os, time
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+start = time.perf_counter()
+from benchmarks.scripted_model import install
+scripted = install()
+import src.graph
+imported = time.perf_counter()
+planner = src.graph.create_travel_planner(None)
+created = time.perf_counter()
+
+import asyncio
+from langchain_core.messages import HumanMessage
+scripted.use({
+    "supervisor": [
+        {"tool_calls": [{"name": "RentCar", "args": {"instruction": "Cars in Paris"}}]},
+        {"content": "Here are the cars."},
+    ],
+    "car_rental_agent": [
+        {"tool_calls": [{"name": "search_cars", "args": {"pickup_city": "Paris"}}]},
+        {"content": "Found cars in Paris."},
+    ],
+})
+from src.tools import close_inventory
+async def first_request():
+    await planner.ainvoke({"messages": [HumanMessage(content="Rent a car in Paris")]})
+    answered = time.perf_counter()
+    await close_inventory()
+    return answered
+answered = asyncio.run(first_request())
+print(json.dumps({
+    "import_s": imported - start,
+    "create_s": created - imported,
+    "first_request_s": answered - created,
+    "total_s": answered - start,
+}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.getcwd(), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def run_once() -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        env = child_env()
+        env["TRAVEL_DB_PATH"] = os.path.join(directory, "travel_data.db")
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top: int):
+    """Modules with the largest cumulative import time (microseconds) for `import src.graph`."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.graph"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=child_env(),
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module>"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start benchmark.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"cold start over {args.runs} fresh interpreters (median):")
+    for key in ("import_s", "create_s", "first_request_s", "total_s"):
+        print(f"  {key:16s} {statistics.median(r[key] for r in runs) * 1000:8.1f} ms")
+
+    print(f"\nslowest imports for `import src.graph` (cumulative):")
+    for cumulative_us, self_us, name in import_profile(args.top):
+        print(
+            f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}"
+        )
@@ -0,0 +1,106 @@
+"""
+History compaction over a long conversation through the top-level planner graph.
+
+One thread runs `--turns` planner requests (cycling through corpus.jsonl with the scripted model
+from scripted_model.py) against `create_travel_planner` with an `InMemorySaver`, and a token
+budget small enough that most turns fold the older turns into the summary. After each turn the
+benchmark reads the saved state and reports its message count and estimated tokens.
+
+Compaction works when it reaches the saved state: the thread keeps the last
+TRAVEL_HISTORY_KEEP_TURNS turns plus whatever older digests fit the budget, and each message is
+summarized once. The process exits non-zero when the saved message count in the second half of
+the run exceeds its maximum in the first half (the history keeps growing) or a message is
+summarized twice.
+
+Usage:
+    python -m benchmarks.bench_compaction [--turns 12]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from collections import Counter
+from typing import Any, Dict, List
+
+os.environ.setdefault("TRAVEL_HISTORY_TOKEN_BUDGET", "150")
+os.environ.setdefault("TRAVEL_HISTORY_KEEP_TURNS", "1")
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.bench_graph import CORPUS, git_commit, load_corpus
+from benchmarks.scripted_model import install
+
+
+async def main(corpus_path: str, turns: int) -> Dict[str, Any]:
+    scripted = install()
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    import src.compaction
+    from src.config import HISTORY_KEEP_TURNS, HISTORY_TOKEN_BUDGET
+    from src.graph import create_travel_planner
+    from src.tokens import estimate_tokens
+    from src.tools import close_inventory
+
+    # Ids of every message folded into the summary, once per summarization
+    summarized: Counter = Counter()
+    summarize = src.compaction.summarize
+
+    async def counting_summarize(previous, messages):
+        summarized.update(m.id for m in messages)
+        return await summarize(previous, messages)
+
+    src.compaction.summarize = counting_summarize
+
+    corpus = load_corpus(corpus_path)
+    planner = create_travel_planner(InMemorySaver())
+    config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+    saved: List[Dict[str, int]] = []
+    for turn in range(turns):
+        entry = corpus[turn % len(corpus)]
+        scripted.use(entry["script"])
+        await planner.ainvoke(
+            {"messages": [HumanMessage(content=entry["request"])]}, config
+        )
+        messages = (await planner.aget_state(config)).values["messages"]
+        saved.append(
+            {
+                "messages": len(messages),
+                "user_turns": sum(isinstance(m, HumanMessage) for m in messages),
+                "tokens": estimate_tokens(messages),
+            }
+        )
+    await close_inventory()
+
+    repeated = sum(1 for count in summarized.values() if count > 1)
+    counts = [s["messages"] for s in saved]
+    half = len(counts) // 2
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "turns": turns,
+            "token_budget": HISTORY_TOKEN_BUDGET,
+            "keep_turns": HISTORY_KEEP_TURNS,
+            "corpus": os.path.relpath(corpus_path),
+        },
+        "saved_messages": counts,
+        "saved_tokens": [s["tokens"] for s in saved],
+        "max_user_turns": max(s["user_turns"] for s in saved),
+        "summarized_messages": len(summarized),
+        "summarized_twice": repeated,
+        "ok": max(counts[half:]) <= max(counts[:half]) and repeated == 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="History compaction benchmark.")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--turns", type=int, default=12)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args.corpus, args.turns))
+    print(json.dumps(report, indent=2, sort_keys=True))
+    if not report["ok"]:
+        sys.exit(1)
@@ -0,0 +1,66 @@
+"""
+Interpreter exit after a tool call that never closes the inventory.
+
+Starts a child interpreter that runs one `search_hotels` call under `asyncio.run` and then
+returns without `await close_inventory()`, the way a plain script would. The pool's aiosqlite
+worker threads are not daemon threads, so the child only exits if the pool closed them when its
+event loop shut down. The benchmark reports how long the child took, and exits non-zero if the
+child fails or is still running after `--timeout` seconds.
+
+Usage:
+    python -m benchmarks.bench_exit [--timeout 30]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+from benchmarks.bench_graph import git_commit
+
+CHILD = """
+import asyncio
+from src.tools import search_hotels
+
+asyncio.run(search_hotels.ainvoke({"location_city": "Paris"}))
+"""
+
+
+def main(timeout: float) -> Dict[str, Any]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": root}
+    start = time.perf_counter()
+    try:
+        child = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=root,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        returncode, stderr = child.returncode, child.stderr
+    except subprocess.TimeoutExpired:
+        returncode, stderr = None, ""
+    elapsed = time.perf_counter() - start
+    return {
+        "meta": {"commit": git_commit(), "timeout_s": timeout},
+        "exit_s": round(elapsed, 3),
+        "returncode": returncode,
+        "stderr": stderr[-2000:],
+        "ok": returncode == 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interpreter exit benchmark.")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    report = main(args.timeout)
+    print(json.dumps(report, indent=2, sort_keys=True))
+    if not report["ok"]:
+        sys.exit(1)
@@ -0,0 +1,259 @@
+"""
+Offline benchmark of the planner graph and each subagent graph with a scripted chat model.
+
+The shared chat model is replaced by `ScriptedChatModel` (see scripted_model.py), which replays the
+per-agent tool-call sequences in corpus.jsonl with `--latency-ms` of simulated model time per
+call. Tools run for real against the inventory database, so the numbers cover graph overhead,
+tool I/O and state handling but no provider time.
+
+For `create_travel_planner` and each subagent graph the benchmark reports per-node and per-tool
+wall time, request latency and throughput, plus peak and retained allocations from a separate
+tracemalloc pass. Results are written as sorted, indented JSON so runs can be diffed between
+commits.
+
+Usage:
+    python -m benchmarks.bench_graph [--repeat 5] [--latency-ms 0] [--output bench.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from benchmarks.scripted_model import install
+from src.metrics import LatencyRecorder
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus.jsonl")
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time of every graph node ("<agent>.<node>") and tool ("tool.<name>") run."""
+
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.latency = LatencyRecorder()
+        self.errors = 0
+        self._started: Dict[Any, tuple] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        # Only the node runnable itself, not the graphs and callables nested in it
+        if node is not None and kwargs.get("name") == node:
+            label = f"{metadata.get('subagent', self.agent)}.{node}"
+            self._started[run_id] = (label, time.perf_counter())
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._started[run_id] = (f"tool.{name}", time.perf_counter())
+
+    def _finish(self, run_id) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            label, start = started
+            self.latency.record(label, time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self.errors += 1
+        self._finish(run_id)
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def delegations(entry: Dict[str, Any], tool: str) -> List[str]:
+    """Instructions the supervisor script sends through `tool`."""
+
+    return [
+        call["args"]["instruction"]
+        for turn in entry["script"]["supervisor"]
+        for call in turn.get("tool_calls", ())
+        if call["name"] == tool
+    ]
+
+
+def count_errors(output: Dict[str, Any]) -> int:
+    return sum(
+        1
+        for message in output.get("messages", ())
+        if message.type == "tool"
+        and (
+            getattr(message, "status", None) == "error"
+            or str(message.content).startswith("Error executing")
+        )
+    )
+
+
+def summarize(recorder: LatencyRecorder) -> Dict[str, Dict[str, float]]:
+    return {
+        label: {key: round(value, 3) for key, value in stats.items()}
+        for label, stats in sorted(recorder.summary().items())
+    }
+
+
+async def run_target(
+    name: str,
+    runs: List[tuple],
+    invoke: Callable,
+    scripted,
+    repeat: int,
+) -> Dict[str, Any]:
+    """Time `repeat` passes over `runs` ((script, input) pairs), then measure allocations once."""
+
+    timer = NodeTimer(name)
+    requests = LatencyRecorder()
+    errors = 0
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for script, input in runs:
+            scripted.use(script)
+            request_start = time.perf_counter()
+            output = await invoke(input, {"callbacks": [timer]})
+            requests.record("request", time.perf_counter() - request_start)
+            errors += count_errors(output)
+    wall = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    for script, input in runs:
+        scripted.use(script)
+        await invoke(input, {})
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    total = repeat * len(runs)
+    return {
+        "requests": total,
+        "errors": errors + timer.errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(total / wall, 2) if wall else None,
+        "latency": summarize(requests)["request"] if total else {},
+        "nodes": summarize(timer.latency),
+        "allocations": {
+            "peak_kib": round(peak / 1024, 1),
+            "retained_kib": round(retained / 1024, 1),
+        },
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(corpus_path: str, repeat: int, latency_ms: float) -> Dict[str, Any]:
+    scripted = install(latency=latency_ms / 1000)
+
+    # Imported after install(), like an application that configures the model at startup
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from src.graph import create_travel_planner, subagent_names
+    from src.subagents import subagent_graph
+    from src.tools import close_inventory
+
+    corpus = load_corpus(corpus_path)
+    planner = create_travel_planner(InMemorySaver())
+
+    async def invoke_planner(input, config):
+        config = {**config, "configurable": {"thread_id": uuid.uuid4().hex}}
+        return await planner.ainvoke(input, config)
+
+    targets = {
+        "planner": (
+            [
+                (e["script"], {"messages": [HumanMessage(content=e["request"])]})
+                for e in corpus
+            ],
+            invoke_planner,
+        )
+    }
+    for tool, agent in subagent_names.items():
+        runs = [
+            (e["script"], {"messages": [HumanMessage(content=instruction)]})
+            for e in corpus
+            if agent in e["script"]
+            for instruction in delegations(e, tool)[:1]
+        ]
+        targets[agent] = (runs, subagent_graph(agent).ainvoke)
+
+    results = {}
+    try:
+        for name, (runs, invoke) in targets.items():
+            # Warm-up pass: imports, city index, connection pool, snapshot
+            for script, input in runs:
+                scripted.use(script)
+                await invoke(input, {})
+            results[name] = await run_target(name, runs, invoke, scripted, repeat)
+    finally:
+        await close_inventory()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "corpus": os.path.relpath(corpus_path),
+            "corpus_size": len(corpus),
+            "repeat": repeat,
+            "latency_ms": latency_ms,
+            "model_calls": scripted.calls,
+        },
+        "targets": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline planner graph benchmark.")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args.corpus, args.repeat, args.latency_ms))
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        for name, result in report["targets"].items():
+            print(
+                f"{name:22s} {result['throughput_rps']:>9} req/s  "
+                f"p50 {result['latency'].get('p50_ms', 0):.2f} ms  "
+                f"errors {result['errors']}",
+                file=sys.stderr,
+            )
+    else:
+        print(text)
@@ -0,0 +1,121 @@
+"""
+Hedge delay stability under simulated model latency.
+
+Runs `--calls` hedged calls through `src.deadlines.Hedger`, `--concurrency` at a time. Primary
+and backup requests sleep for independent draws from a long-tailed latency distribution
+(lognormal around `--median-ms`, plus a `--stall-rate` share of stalls), so backups win most of
+the races they enter. After every wave the benchmark reads the hedge delay. It reports the
+delay over time against the p95 of the distribution itself, and the share of calls hedged.
+
+The delay is stable when it settles near the true p95 and stays there: hedging must not pull
+it down, which would make hedging more frequent and pull it down further. The process exits
+non-zero when, in the second half of the run, the delay falls below `--tolerance` times the
+true p95 or more than twice the expected share of calls is hedged.
+
+Usage:
+    python -m benchmarks.bench_hedging [--calls 1000] [--concurrency 20] [--median-ms 20]
+                                       [--stall-rate 0.03] [--tolerance 0.7] [--seed 1]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.bench_graph import git_commit
+from src.deadlines import Hedger
+
+KEY = "model:tools"
+
+
+def make_latency(rng: random.Random, median_s: float, stall_rate: float):
+    def latency() -> float:
+        seconds = median_s * math.exp(rng.gauss(0.0, 0.5))
+        if rng.random() < stall_rate:
+            seconds += 10 * median_s
+        return seconds
+
+    return latency
+
+
+async def request(seconds: float) -> float:
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+async def main(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    latency = make_latency(rng, args.median_ms / 1000, args.stall_rate)
+    reference = sorted(latency() for _ in range(100_000))
+    true_p95 = reference[int(len(reference) * 0.95)]
+
+    hedger = Hedger(min_samples=20)
+    delays: List[float] = []
+    hedged: List[int] = []
+    for start in range(0, args.calls, args.concurrency):
+        before = hedger.counters["hedged"]
+        wave = min(args.concurrency, args.calls - start)
+        await asyncio.gather(
+            *(
+                hedger.run(
+                    KEY,
+                    lambda s=latency(): request(s),
+                    lambda s=latency(): request(s),
+                )
+                for _ in range(wave)
+            )
+        )
+        delay = hedger.delay(KEY)
+        if delay is not None:
+            delays.append(delay)
+            hedged.append(hedger.counters["hedged"] - before)
+
+    half = len(delays) // 2
+    late_delays, late_hedged = delays[half:], hedged[half:]
+    hedge_rate = sum(late_hedged) / max(1, len(late_hedged) * args.concurrency)
+    expected_rate = 1 - hedger.quantile
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "calls": args.calls,
+            "concurrency": args.concurrency,
+            "median_ms": args.median_ms,
+            "stall_rate": args.stall_rate,
+            "seed": args.seed,
+        },
+        "true_p95_ms": round(true_p95 * 1000, 2),
+        "delay_ms": {
+            "first": round(delays[0] * 1000, 2),
+            "min_second_half": round(min(late_delays) * 1000, 2),
+            "max_second_half": round(max(late_delays) * 1000, 2),
+            "last": round(delays[-1] * 1000, 2),
+        },
+        "hedge_rate_second_half": round(hedge_rate, 4),
+        "counters": dict(hedger.counters),
+        "ok": min(late_delays) >= args.tolerance * true_p95
+        and hedge_rate <= 2 * expected_rate,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hedge delay stability benchmark.")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--median-ms", type=float, default=20.0)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.7,
+        help="Lowest acceptable delay as a share of the true p95",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    print(json.dumps(report, indent=2, sort_keys=True))
+    if not report["ok"]:
+        sys.exit(1)
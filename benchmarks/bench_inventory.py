@@ -0,0 +1,174 @@
+"""
+Scaling of dated inventory searches: date windows, budgets and cheapest-k at up to 10^6 rows.
+
+Loads synthetic flight offers (1000 routes, a year of departure dates, prices and seat counts)
+into a scratch copy of the inventory database in steps of `--sizes`, and after each step times
+the `inventory_query` shapes the search tools send:
+
+- `route`: every offer on a route (no filter)
+- `week`: a 7-day departure window
+- `month_budget`: a 30-day window under a maximum fare
+- `cheapest_week` / `cheapest_year`: the 5 cheapest offers in a week / over the whole year
+
+Each shape runs with the range-scan index and, for comparison, `NOT INDEXED` (full table scan).
+With `--snapshot`, the same filters also run through `filter_rows` on in-memory rows, the path
+used with `TRAVEL_INVENTORY_SNAPSHOT=true`. The query plan of each shape is printed once.
+
+Usage:
+    python -m benchmarks.bench_inventory [--sizes 10000,100000,1000000] [--lookups 500]
+                                         [--snapshot] [--output inventory.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from src.config import DB_SEED_PATH
+from src.db.loader import bulk_load
+from src.db.pool import ensure_database
+from src.db.query import SearchFilter, TABLES, filter_rows, inventory_query
+
+CITIES = [f"City {i:03d}" for i in range(100)]
+ROUTES = 1000
+PLANES = ["Boeing 777", "Boeing 787", "Airbus A350", "Airbus A320"]
+YEAR_START = datetime.date(2026, 1, 1)
+
+
+def route(index: int) -> tuple:
+    # 1000 distinct routes: each origin flies to the next 10 cities
+    r = index % ROUTES
+    return CITIES[r % 100], CITIES[(r % 100 + r // 100 + 1) % 100]
+
+
+def day(offset: int) -> str:
+    return (YEAR_START + datetime.timedelta(days=offset % 365)).isoformat()
+
+
+def synthetic_offers(start: int, stop: int):
+    for i in range(start, stop):
+        origin_city, destination_city = route(i)
+        yield {
+            "id": f"SYN{i:08d}",
+            "origin_city": origin_city,
+            "destination_city": destination_city,
+            "plane_type": PLANES[i % len(PLANES)],
+            "travel_date": day(i * 37),
+            "price": float(50 + i * 7919 % 1950),
+            # Every tenth offer is sold out
+            "available": i % 10,
+        }
+
+
+def shapes(i: int) -> Dict[str, SearchFilter]:
+    first = i * 11 % 330
+    return {
+        "route": SearchFilter(),
+        "week": SearchFilter(day(first), day(first + 6)),
+        "month_budget": SearchFilter(day(first), day(first + 29), max_price=600),
+        "cheapest_week": SearchFilter(day(first), day(first + 6), cheapest=5),
+        "cheapest_year": SearchFilter(cheapest=5),
+    }
+
+
+def time_queries(
+    conn: sqlite3.Connection, lookups: int, scan: bool
+) -> Dict[str, float]:
+    """Mean microseconds per query for each shape."""
+
+    totals: Dict[str, float] = defaultdict(float)
+    for i in range(lookups):
+        for name, search in shapes(i).items():
+            sql, params = inventory_query("flights", route(i * 7), search)
+            if scan:
+                sql = sql.replace("FROM flights", "FROM flights NOT INDEXED")
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            totals[name] += time.perf_counter() - start
+    return {name: round(total / lookups * 1e6, 1) for name, total in totals.items()}
+
+
+def time_snapshot(conn: sqlite3.Connection, lookups: int) -> Dict[str, float]:
+    by_route: Dict[tuple, List[tuple]] = defaultdict(list)
+    for row in conn.execute(f"SELECT {TABLES['flights'][0]} FROM flights"):
+        by_route[(row[1], row[2])].append(row)
+    totals: Dict[str, float] = defaultdict(float)
+    for i in range(lookups):
+        rows = by_route[route(i * 7)]
+        for name, search in shapes(i).items():
+            start = time.perf_counter()
+            if search.active:
+                filter_rows(rows, search)
+            totals[name] += time.perf_counter() - start
+    return {name: round(total / lookups * 1e6, 1) for name, total in totals.items()}
+
+
+def main(sizes: List[int], lookups: int, snapshot: bool) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="travel-bench-")
+    db_path = os.path.join(workdir, "inventory.db")
+    ensure_database(db_path, DB_SEED_PATH)
+    results = []
+    try:
+        loaded = 0
+        for size in sizes:
+            stats = bulk_load(db_path, "flights", synthetic_offers(loaded, size))
+            loaded = size
+
+            conn = sqlite3.connect(db_path)
+            if not results:
+                for name, search in shapes(0).items():
+                    sql, params = inventory_query("flights", route(0), search)
+                    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+                    print(
+                        f"plan {name:14s} {'; '.join(step[-1] for step in plan)}",
+                        file=sys.stderr,
+                    )
+            result = {
+                "rows": size,
+                "load_rows_per_second": round(stats["rows_per_second"]),
+                "indexed_us": time_queries(conn, lookups, scan=False),
+                "scan_us": time_queries(conn, max(1, lookups // 50), scan=True),
+            }
+            if snapshot:
+                result["snapshot_us"] = time_snapshot(conn, lookups)
+            conn.close()
+            results.append(result)
+
+            print(
+                f"{size:>9} rows  "
+                + "  ".join(
+                    f"{name} {us:.0f} us (scan {result['scan_us'][name]:.0f})"
+                    for name, us in result["indexed_us"].items()
+                ),
+                file=sys.stderr,
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"meta": {"routes": ROUTES, "lookups": lookups}, "sizes": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dated inventory search benchmark.")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument(
+        "--snapshot", action="store_true", help="Also time in-memory filtering"
+    )
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    sizes = sorted(int(n) for n in args.sizes.split(","))
+    report = main(sizes, args.lookups, args.snapshot)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,215 @@
+"""
+Offline load test: how many concurrent conversations one worker process can hold.
+
+For each concurrency level N, `create_travel_planner` is built with an `InMemorySaver` and the
+scripted model from scripted_model.py (`--latency-ms` of simulated model time per call, so turns
+spend their time waiting like they would on the provider). N conversations, each with its own
+thread_id, then run `--turns` turns concurrently; conversation i replays corpus.jsonl from entry
+i, so the levels mix every script. Tools run for real against the inventory database.
+
+Per level the benchmark reports:
+
+- turn latency p50/p95/p99 and throughput (turns/s)
+- event-loop lag: how late a 10 ms sleep wakes up while the load runs (p50/p99/max); growing
+  lag means CPU work on the loop, not model time, is what limits concurrency
+- resident memory before and after the level, and the growth per conversation, with every
+  conversation's checkpoints still held by the saver
+
+Each level runs in a fresh interpreter so its memory figures do not inherit the previous
+level's heap; `--in-process` runs a single level in this process instead.
+
+Usage:
+    python -m benchmarks.bench_load [--concurrency 1,10,50,100] [--turns 4] [--latency-ms 200]
+                                    [--output load.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Dict, List
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.bench_graph import CORPUS, git_commit, load_corpus, summarize
+from benchmarks.scripted_model import install, use_in_task
+from src.metrics import LatencyRecorder
+
+LAG_INTERVAL = 0.01
+
+
+def rss_bytes() -> int:
+    """Current resident set size; the peak where /proc is unavailable."""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+async def monitor_lag(recorder: LatencyRecorder, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        recorder.record("lag", time.perf_counter() - start - LAG_INTERVAL)
+
+
+async def conversation(
+    planner, corpus: List[Dict[str, Any]], first: int, turns: int, latency
+) -> int:
+    """Run `turns` turns on a new thread; returns the number of failed turns."""
+
+    config = {"configurable": {"thread_id": uuid.uuid4().hex}}
+    failures = 0
+    for turn in range(turns):
+        entry = corpus[(first + turn) % len(corpus)]
+        use_in_task(entry["script"])
+        start = time.perf_counter()
+        try:
+            await planner.ainvoke(
+                {"messages": [HumanMessage(content=entry["request"])]}, config
+            )
+        except Exception:
+            failures += 1
+        latency.record("turn", time.perf_counter() - start)
+    return failures
+
+
+async def run_level(
+    corpus_path: str, concurrency: int, turns: int, latency_ms: float
+) -> Dict[str, Any]:
+    install(latency=latency_ms / 1000)
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from src.graph import create_travel_planner
+    from src.tools import close_inventory
+
+    corpus = load_corpus(corpus_path)
+    planner = create_travel_planner(InMemorySaver())
+
+    # Warm-up on a throwaway thread: imports, connection pool, city index, bound models
+    await conversation(planner, corpus, 0, len(corpus), LatencyRecorder())
+    planner = create_travel_planner(InMemorySaver())
+    gc.collect()
+    rss_before = rss_bytes()
+
+    latency = LatencyRecorder(max_samples=10**6)
+    lag = LatencyRecorder(max_samples=10**6)
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    start = time.perf_counter()
+    failures = await asyncio.gather(
+        *(conversation(planner, corpus, i, turns, latency) for i in range(concurrency))
+    )
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    gc.collect()
+    rss_after = rss_bytes()
+    await close_inventory()
+    total = concurrency * turns
+    lag_samples = lag.samples["lag"]
+    return {
+        "concurrency": concurrency,
+        "turns": total,
+        "failed_turns": sum(failures),
+        "wall_s": round(wall, 3),
+        "throughput_turns_per_s": round(total / wall, 2) if wall else None,
+        "turn_latency": summarize(latency)["turn"],
+        "loop_lag": {
+            **{
+                key: value
+                for key, value in summarize(lag)["lag"].items()
+                if key in ("p50_ms", "p99_ms")
+            },
+            "max_ms": round(max(lag_samples) * 1000, 3),
+        },
+        "rss_mib": {
+            "before": round(rss_before / 2**20, 1),
+            "after": round(rss_after / 2**20, 1),
+        },
+        "rss_per_thread_kib": round((rss_after - rss_before) / concurrency / 1024, 1),
+    }
+
+
+def run_level_subprocess(args, concurrency: int) -> Dict[str, Any]:
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.bench_load",
+        "--in-process",
+        "--concurrency",
+        str(concurrency),
+        "--turns",
+        str(args.turns),
+        "--latency-ms",
+        str(args.latency_ms),
+        "--corpus",
+        args.corpus,
+    ]
+    output = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)["levels"][0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline concurrent load test.")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument(
+        "--concurrency",
+        default="1,10,50,100",
+        help="Comma-separated numbers of concurrent conversations",
+    )
+    parser.add_argument("--turns", type=int, default=4, help="Turns per conversation")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run the levels in this process instead of one interpreter each",
+    )
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    levels = []
+    for concurrency in (int(n) for n in args.concurrency.split(",")):
+        if args.in_process:
+            result = asyncio.run(
+                run_level(args.corpus, concurrency, args.turns, args.latency_ms)
+            )
+        else:
+            result = run_level_subprocess(args, concurrency)
+        levels.append(result)
+        if args.output:
+            print(
+                f"{concurrency:5d} threads  {result['throughput_turns_per_s']:>8} turns/s  "
+                f"p50 {result['turn_latency']['p50_ms']:.0f} ms  "
+                f"p99 {result['turn_latency']['p99_ms']:.0f} ms  "
+                f"lag p99 {result['loop_lag']['p99_ms']:.1f} ms  "
+                f"{result['rss_per_thread_kib']:.0f} KiB/thread",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "corpus": os.path.relpath(args.corpus),
+            "turns_per_thread": args.turns,
+            "latency_ms": args.latency_ms,
+        },
+        "levels": levels,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,83 @@
+"""
+Bulk-load throughput and indexed lookup latency on a synthetic inventory.
+
+Generates `--rows` synthetic flights into a scratch copy of the inventory database,
+reports loader rows/second, then times the search_flights query with and without
+the route index.
+
+Usage:
+    python -m benchmarks.bench_loader [--rows 1000000]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from src.config import DB_SEED_PATH
+from src.db.loader import bulk_load
+from src.db.pool import ensure_database
+
+CITIES = [f"City {i:04d}" for i in range(2000)]
+PLANES = ["Boeing 777", "Boeing 787", "Airbus A350", "Airbus A320"]
+QUERY = """
+    SELECT id, origin_city, destination_city, plane_type
+    FROM flights
+    WHERE origin_city = ? AND destination_city = ?
+"""
+
+
+def synthetic_flights(n: int):
+    for i in range(n):
+        yield {
+            "id": f"SYN{i:08d}",
+            "origin_city": CITIES[i % len(CITIES)],
+            "destination_city": CITIES[(i * 7 + 3) % len(CITIES)],
+            "plane_type": PLANES[i % len(PLANES)],
+        }
+
+
+def time_lookups(conn: sqlite3.Connection, lookups: int) -> float:
+    start = time.perf_counter()
+    for i in range(lookups):
+        conn.execute(
+            QUERY, (CITIES[i % len(CITIES)], CITIES[(i * 7 + 3) % len(CITIES)])
+        ).fetchall()
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main(rows: int, lookups: int):
+    workdir = tempfile.mkdtemp(prefix="travel-bench-")
+    db_path = os.path.join(workdir, "inventory.db")
+    ensure_database(db_path, DB_SEED_PATH)
+    try:
+        stats = bulk_load(db_path, "flights", synthetic_flights(rows))
+        print(
+            f"load     {stats['rows']} rows in {stats['total_seconds']:.2f}s "
+            f"= {stats['rows_per_second']:.0f} rows/s "
+            f"(insert {stats['load_seconds']:.2f}s, index build {stats['index_seconds']:.2f}s)"
+        )
+
+        conn = sqlite3.connect(db_path)
+        plan = conn.execute("EXPLAIN QUERY PLAN " + QUERY, ("a", "b")).fetchall()
+        print(f"plan     {plan[0][-1]}")
+        indexed = time_lookups(conn, lookups)
+        conn.execute("DROP INDEX idx_flights_route_date")
+        scan = time_lookups(conn, max(1, lookups // 100))
+        conn.close()
+
+        print(
+            f"lookup   indexed {indexed:.1f} us   full scan {scan:.1f} us   ({scan / indexed:.0f}x)"
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load and index benchmark.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.rows, args.lookups)
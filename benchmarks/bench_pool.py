@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: per-call aiosqlite.connect vs. the pooled inventory connections.
+
+Usage:
+    python -m benchmarks.bench_pool [--calls 2000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiosqlite
+
+from src.config import DB_PATH, DB_SEED_PATH
+from src.db.pool import ConnectionPool, ensure_database
+
+QUERY = """
+    SELECT id, origin_city, destination_city, plane_type
+    FROM flights
+    WHERE origin_city = ? AND destination_city = ?
+"""
+PARAMS = ("New York", "Paris")
+
+
+async def per_call_connect():
+    async with aiosqlite.connect(DB_PATH) as conn:
+        cursor = await conn.cursor()
+        await cursor.execute(QUERY, PARAMS)
+        return await cursor.fetchall()
+
+
+def make_pooled(pool: ConnectionPool):
+    async def pooled():
+        return await pool.fetchall(QUERY, PARAMS)
+
+    return pooled
+
+
+async def run(fn, calls: int, concurrency: int):
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            await fn()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls/s": calls / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def report(name: str, stats: dict):
+    print(
+        f"{name:<12} {stats['calls/s']:>10.0f} calls/s   "
+        f"p50 {stats['p50_ms']:>7.3f} ms   p99 {stats['p99_ms']:>7.3f} ms"
+    )
+
+
+async def main(calls: int, concurrency: int):
+    ensure_database(DB_PATH, DB_SEED_PATH)
+    pool = ConnectionPool(DB_PATH, size=min(concurrency, 8))
+    async with pool:
+        pooled = make_pooled(pool)
+        # Warm up both paths
+        await run(per_call_connect, 20, concurrency)
+        await run(pooled, 20, concurrency)
+
+        report("connect", await run(per_call_connect, calls, concurrency))
+        report("pooled", await run(pooled, calls, concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,116 @@
+"""
+In-memory inventory snapshot: memory per 100k rows and lookup speedup over pooled SQLite.
+
+Loads `--rows` synthetic rows into each table of a scratch copy of the inventory database,
+measures the snapshot's memory with tracemalloc, compares lookup latency against the pooled
+aiosqlite query and verifies that a single-table write reloads only that table.
+
+Usage:
+    python -m benchmarks.bench_snapshot [--rows 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from src.config import DB_SEED_PATH
+from src.db.loader import bulk_load
+from src.db.pool import ConnectionPool, ensure_database
+from src.db.snapshot import InventorySnapshot
+
+CITIES = [f"City {i:04d}" for i in range(1000)]
+QUERY = "SELECT id, pickup_city, make, color FROM cars WHERE pickup_city = ?"
+
+
+def synthetic(table: str, n: int):
+    for i in range(n):
+        city = CITIES[i % len(CITIES)]
+        if table == "flights":
+            yield {
+                "id": f"F{i:08d}",
+                "origin_city": city,
+                "destination_city": CITIES[(i * 7 + 3) % len(CITIES)],
+                "plane_type": "Airbus A350",
+            }
+        elif table == "hotels":
+            yield {
+                "id": f"H{i:08d}",
+                "location_city": city,
+                "name": f"Hotel {i}",
+                "description": "Modern hotel with city views",
+            }
+        else:
+            yield {
+                "id": f"C{i:08d}",
+                "pickup_city": city,
+                "make": "Toyota",
+                "color": "Blue",
+            }
+
+
+async def time_lookups(fn, lookups: int) -> float:
+    start = time.perf_counter()
+    for i in range(lookups):
+        await fn(CITIES[i % len(CITIES)])
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+async def main(rows: int, lookups: int):
+    workdir = tempfile.mkdtemp(prefix="travel-bench-")
+    db_path = os.path.join(workdir, "inventory.db")
+    ensure_database(db_path, DB_SEED_PATH)
+    try:
+        for table in ("flights", "hotels", "cars"):
+            bulk_load(db_path, table, synthetic(table, rows))
+
+        snapshot = InventorySnapshot(db_path, refresh_interval=0.0)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        snapshot.check()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        total_rows = sum(snapshot.stats()["rows"].values())
+        print(
+            f"memory    {(after - before) / total_rows * 100_000 / 2**20:.1f} MiB per 100k rows "
+            f"({total_rows} rows across 3 tables)"
+        )
+
+        pool = ConnectionPool(db_path, size=1)
+        async with pool:
+            pooled = await time_lookups(
+                lambda city: pool.fetchall(QUERY, (city,)), lookups
+            )
+        snapshot.refresh_interval = 3600.0
+        cached = await time_lookups(lambda city: snapshot.lookup("cars", city), lookups)
+        print(
+            f"lookup    pooled {pooled:.1f} us   snapshot {cached:.2f} us   ({pooled / cached:.0f}x)"
+        )
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "INSERT INTO hotels (id, location_city, name, description) VALUES ('HNEW', ?, 'New', 'New')",
+            (CITIES[0],),
+        )
+        conn.commit()
+        conn.close()
+        start = time.perf_counter()
+        reloaded = snapshot.check()
+        print(
+            f"refresh   reloaded {reloaded} in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        snapshot.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory snapshot benchmark.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.lookups))
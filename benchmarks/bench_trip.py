@@ -0,0 +1,111 @@
+"""
+Bookable offers only in `search_trip`, through the pooled query and the inventory snapshot.
+
+Builds a scratch runtime database from the seed, then sells out one flight and one hotel offer
+on the New York -> Paris trip and moves one Paris car offer into the past. `search_trip` runs
+`--calls` times over the pooled UNION ALL query and again over the inventory snapshot; the
+benchmark reports its latency on each path and the offers it returned. The process exits
+non-zero if either path returns a sold-out or past-dated offer, or returns nothing.
+
+Usage:
+    python -m benchmarks.bench_trip [--calls 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+# The tools read TRAVEL_DB_PATH on import: point them at a scratch copy
+_scratch = tempfile.TemporaryDirectory()
+os.environ["TRAVEL_DB_PATH"] = os.path.join(_scratch.name, "travel_data.db")
+
+import src.tools
+from benchmarks.bench_graph import git_commit, summarize
+from src.metrics import LatencyRecorder
+from src.tools import close_inventory, inventory_database, search_trip
+
+SOLD_OUT = {"flights": "FL012", "hotels": "HTL001"}
+PAST = {"cars": "CAR014"}
+ID_FIELDS = {"flights": "flight_id", "hotels": "hotel_id", "cars": "car_id"}
+
+
+def prepare(db_path: str) -> None:
+    conn = sqlite3.connect(db_path)
+    for table, offer in SOLD_OUT.items():
+        conn.execute(f"UPDATE {table} SET available = 0 WHERE id = ?", (offer,))
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    for table, offer in PAST.items():
+        conn.execute(
+            f"UPDATE {table} SET travel_date = ? WHERE id = ?", (yesterday, offer)
+        )
+    conn.commit()
+    conn.close()
+
+
+async def run(
+    label: str, calls: int, recorder: LatencyRecorder
+) -> Dict[str, List[str]]:
+    call = {
+        "name": search_trip.name,
+        "args": {"origin_city": "NYC", "destination_city": "paris"},
+        "id": "trip",
+        "type": "tool_call",
+    }
+    for _ in range(calls):
+        start = time.perf_counter()
+        message = await search_trip.ainvoke(call)
+        recorder.record(label, time.perf_counter() - start)
+    return {
+        kind: [getattr(item, ID_FIELDS[kind]) for item in page.items]
+        for kind, page in message.artifact.items()
+    }
+
+
+async def main(calls: int) -> Dict[str, Any]:
+    prepare(inventory_database())
+    recorder = LatencyRecorder(max_samples=100_000)
+    offers = {"pool": await run("pool", calls, recorder)}
+
+    # Same tools over the in-memory snapshot
+    src.tools.INVENTORY_SNAPSHOT = True
+    src.tools.inventory_snapshot.cache_clear()
+    offers["snapshot"] = await run("snapshot", calls, recorder)
+    await close_inventory()
+
+    excluded = {**SOLD_OUT, **PAST}
+    leaked = {
+        path: sorted(
+            offer
+            for ids in found.values()
+            for offer in ids
+            if offer in excluded.values()
+        )
+        for path, found in offers.items()
+    }
+    return {
+        "meta": {"commit": git_commit(), "calls": calls},
+        "excluded": excluded,
+        "offers": offers,
+        "leaked": leaked,
+        "latency": summarize(recorder),
+        "ok": not any(leaked.values())
+        and all(all(ids for ids in found.values()) for found in offers.values()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trip search filter benchmark.")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args.calls))
+    print(json.dumps(report, indent=2, sort_keys=True))
+    if not report["ok"]:
+        sys.exit(1)
@@ -0,0 +1,155 @@
+"""
+Deterministic chat model that replays scripted turns instead of calling OpenAI.
+
+A script maps each agent ("supervisor" and every registered subagent, e.g.
+"flight_booking_agent") to its list of turns; a turn is `{"content": str, "tool_calls":
+[{"name", "args"}], "latency_ms": float}` with everything optional. The calling agent is
+recognized from the system prompt, and the turn to replay is the number of AI messages since
+the last user message, so concurrent subagents replay their own scripts without shared state.
+Concurrent conversations with different scripts call `use_in_task(script)` at the start of each
+conversation's task; the script then follows that task's context into every node it runs.
+
+Install it with `install()` before the first model call: agents bind the shared model
+(`src.model.get_model()`) on their first turn.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from src.prompts import HISTORY_SUMMARY_PROMPT, SUPERVISOR_PROMPT
+from src.subagents import SUBAGENTS
+
+AGENT_PROMPTS = {
+    SUPERVISOR_PROMPT: "supervisor",
+    HISTORY_SUMMARY_PROMPT: "summarizer",
+    **{spec.prompt: name for name, spec in SUBAGENTS.items()},
+}
+
+# Script of the current task's conversation; falls back to `ScriptedChatModel.script`
+_task_script: contextvars.ContextVar[Optional[Dict[str, List[Dict[str, Any]]]]] = (
+    contextvars.ContextVar("scripted_model_script", default=None)
+)
+
+
+def use_in_task(script: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Replay `script` for model calls made from the current task and the tasks it starts."""
+
+    _task_script.set(script)
+
+
+def agent_of(messages: Sequence[BaseMessage]) -> str:
+    if messages and messages[0].type == "system":
+        return AGENT_PROMPTS.get(messages[0].content, "unknown")
+    return "unknown"
+
+
+def turn_index(messages: Sequence[BaseMessage]) -> int:
+    """AI messages since the last user message."""
+
+    turns = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if message.type == "ai":
+            turns += 1
+    return turns
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Replays the current script's turns with `latency` seconds of simulated model time per call."""
+
+    latency: float = 0.0
+    script: Dict[str, List[Dict[str, Any]]] = {}
+    _ids: Any = PrivateAttr(default_factory=itertools.count)
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # Tools are already encoded in the script; keep the binding shape of a real model
+        return self.bind(tools=[getattr(tool, "name", str(tool)) for tool in tools])
+
+    def use(self, script: Dict[str, List[Dict[str, Any]]]) -> None:
+        self.script = script
+
+    def respond(self, messages: Sequence[BaseMessage]) -> Dict[str, Any]:
+        agent = agent_of(messages)
+        if agent == "summarizer":
+            return {"content": "Earlier turns covered trip searches."}
+        turns = (_task_script.get() or self.script).get(agent)
+        if turns is None:
+            raise ValueError(f"No script for agent {agent!r}")
+        index = turn_index(messages)
+        if index >= len(turns):
+            raise ValueError(f"Script for {agent!r} has no turn {index}")
+        return turns[index]
+
+    def _message(self, turn: Dict[str, Any]) -> AIMessage:
+        tool_calls = [
+            {
+                "name": call["name"],
+                "args": call.get("args", {}),
+                "id": f"call_{next(self._ids)}",
+                "type": "tool_call",
+            }
+            for call in turn.get("tool_calls", ())
+        ]
+        content = turn.get("content", "")
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": 0,
+                "output_tokens": len(content) // 4,
+                "total_tokens": len(content) // 4,
+            },
+        )
+
+    def _latency(self, turn: Dict[str, Any]) -> float:
+        latency_ms = turn.get("latency_ms")
+        return self.latency if latency_ms is None else latency_ms / 1000
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        turn = self.respond(messages)
+        time.sleep(self._latency(turn))
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self._message(turn))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        turn = self.respond(messages)
+        await asyncio.sleep(self._latency(turn))
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self._message(turn))])
+
+
+def install(latency: float = 0.0) -> ScriptedChatModel:
+    """Replace the shared chat model with a scripted model and disable the response cache."""
+
+    import src.model
+
+    scripted = ScriptedChatModel(latency=latency)
+    src.model.set_model(scripted)
+    src.model.llm_cache = None
+    return scripted
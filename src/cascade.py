@@ -0,0 +1,148 @@
+"""
+Model cascade for subagent turns.
+
+Most subagent turns only pull a city or route out of the instruction into a search call, which a
+small model does as well as a frontier one at a fraction of the latency and cost. With
+`TRAVEL_MODEL_CASCADE=true`, each subagent turn goes to the fast model
+(`TRAVEL_MODEL_CASCADE_FAST`) first and is escalated to the agent's own model (`TRAVEL_MODEL` or
+its `TRAVEL_NODE_MODELS` override) when the fast model falls short:
+
+- `malformed_args`: a tool call the provider could not parse, an unknown tool, arguments that
+  fail the tool's schema or an empty required string.
+- `no_tool_call`: the fast model answered without searching on a turn that has no results yet.
+  Tool-call turns carry no usable token confidence, so declining to call a tool is the
+  low-confidence signal.
+- `empty_results`: the previous turn's searches all came back empty, or one failed; the fast
+  model's arguments were probably wrong, so the retry goes straight to the stronger model.
+
+The fast attempt of an escalated turn is discarded (its tokens are still paid for, and any text
+it produced has already streamed). `Cascade.stats()` reports the outcome counts, escalation rate,
+latency and cost per agent; with `TRAVEL_METRICS=true` the same outcomes are exported as
+`travel_cascade_outcomes_total`.
+"""
+
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+from pydantic import ValidationError
+
+from src.config import METRICS
+from src.metrics import LatencyRecorder, cascade_outcomes
+from src.model import ainvoke_model, model_cost, model_name
+
+
+def _turn_results(messages: Sequence[BaseMessage]) -> list:
+    """Tool messages after the last AI message: the results the next turn works from."""
+
+    results = []
+    for message in reversed(messages):
+        if message.type != "tool":
+            break
+        results.append(message)
+    return results
+
+
+def _empty(message: BaseMessage) -> bool:
+    # Search tools attach a SearchPage (or a dict of them) with the matched row count
+    artifact = getattr(message, "artifact", None)
+    if isinstance(artifact, dict):
+        return all(getattr(page, "total", 1) == 0 for page in artifact.values())
+    return getattr(artifact, "total", 1) == 0
+
+
+def skip_reason(messages: Sequence[BaseMessage]) -> Optional[str]:
+    """Why the turn should go straight to the strong model, or None to try the fast one."""
+
+    results = _turn_results(messages)
+    if results and (
+        any(getattr(m, "status", None) == "error" for m in results)
+        or all(_empty(m) for m in results)
+    ):
+        return "empty_results"
+    return None
+
+
+def escalation_reason(
+    response: BaseMessage, tools_by_name: Dict[str, Any], has_results: bool
+) -> Optional[str]:
+    """Why a fast-model response is not good enough, or None to accept it."""
+
+    if getattr(response, "invalid_tool_calls", None):
+        return "malformed_args"
+    for call in response.tool_calls:
+        tool = tools_by_name.get(call["name"])
+        if tool is None or any(value == "" for value in call["args"].values()):
+            return "malformed_args"
+        try:
+            # The model-facing schema: injected arguments (config, tool-call id) are not its job
+            tool.tool_call_schema.model_validate(call["args"])
+        except ValidationError:
+            return "malformed_args"
+    if not response.tool_calls and not has_results:
+        return "no_tool_call"
+    return None
+
+
+class Cascade:
+    """Fast-model-first policy for subagent turns, with outcome, latency and cost counters."""
+
+    def __init__(self, fast_model: str):
+        self.fast_model = fast_model
+        self.counters: Counter = Counter()
+        self.cost: Counter = Counter()
+        self.latency = LatencyRecorder()
+
+    async def _call(self, agent: str, tier: str, runnable, messages) -> BaseMessage:
+        start = time.perf_counter()
+        response = await ainvoke_model(runnable, messages)
+        self.latency.record(f"{agent}.{tier}", time.perf_counter() - start)
+        self.cost[agent] += model_cost(response, model_name(runnable))
+        return response
+
+    def _outcome(self, agent: str, outcome: str) -> None:
+        self.counters[agent, outcome] += 1
+        if METRICS:
+            cascade_outcomes.inc(agent, outcome)
+
+    async def ainvoke(
+        self,
+        agent: str,
+        messages: Sequence[BaseMessage],
+        fast,
+        strong,
+        tools_by_name: Dict[str, Any],
+    ) -> BaseMessage:
+        """Answer one subagent turn with `fast`, escalating to `strong` when it falls short."""
+
+        reason = skip_reason(messages)
+        if reason is None:
+            response = await self._call(agent, "fast", fast, messages)
+            has_results = bool(_turn_results(messages))
+            reason = escalation_reason(response, tools_by_name, has_results)
+            if reason is None:
+                self._outcome(agent, "accepted")
+                return response
+        self._outcome(agent, reason)
+        return await self._call(agent, "strong", strong, messages)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per agent: turns, outcome counts, escalation rate, latency percentiles and USD cost."""
+
+        result: Dict[str, Dict[str, float]] = {}
+        for (agent, outcome), count in self.counters.items():
+            entry = result.setdefault(agent, {"turns": 0})
+            entry["turns"] += count
+            entry[outcome] = count
+        latency = self.latency.summary()
+        for agent, entry in result.items():
+            entry["escalation_rate"] = 1 - entry.get("accepted", 0) / entry["turns"]
+            entry["cost_usd"] = self.cost[agent]
+            for tier in ("fast", "strong"):
+                summary = latency.get(f"{agent}.{tier}")
+                if summary:
+                    entry[f"{tier}_calls"] = summary["count"]
+                    entry[f"{tier}_p50_ms"] = summary["p50_ms"]
+                    entry[f"{tier}_p95_ms"] = summary["p95_ms"]
+        return result
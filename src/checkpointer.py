@@ -0,0 +1,778 @@
+"""
+SQLite checkpointer tuned for the planner's message-heavy state.
+
+Stock checkpointers store every new channel version in full. `messages` gets a new version at
+nearly every super-step, so a thread of n messages rewrites O(n) messages per step and O(n^2)
+over the conversation. `SQLiteCheckpointer` stores list channels as append-only deltas instead:
+when the new list extends the previous version of the channel, only the appended items are
+written, pointing at the previous version. Every `snapshot_every` versions (and whenever the
+list was edited rather than extended, e.g. by history compaction) a full snapshot starts a new
+chain, which bounds the work needed to rebuild a value on read.
+
+Writes from all threads go through one writer task that commits whatever has queued up in a
+single transaction (group commit) on a WAL database with `synchronous=NORMAL`; `aput` returns
+once its transaction has committed. Blobs over `compress_min_bytes` (in practice large
+ToolMessage search results) are zlib-compressed. A background task prunes each thread to its
+last `keep` checkpoints, keeping every blob that a remaining checkpoint's delta chain needs.
+
+The checkpointer is async-only, like the rest of the graph. Close it on shutdown (`async with`
+or `await close()`): its aiosqlite worker threads are not daemon threads. Usage:
+
+    async with SQLiteCheckpointer(CHECKPOINT_PATH) as checkpointer:
+        graph = create_travel_planner(checkpointer)
+        await graph.ainvoke(input, {"configurable": {"thread_id": "..."}})
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from src.config import (
+    CHECKPOINT_COMPRESS_MIN_BYTES,
+    CHECKPOINT_KEEP,
+    CHECKPOINT_PRUNE_SECONDS,
+    CHECKPOINT_SNAPSHOT_EVERY,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL,
+        checkpoint_id TEXT NOT NULL,
+        parent_id TEXT,
+        type TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        checkpoint BLOB NOT NULL,
+        metadata_type TEXT NOT NULL,
+        metadata BLOB NOT NULL,
+        -- channel_versions as JSON, so pruning can find live blobs without decoding checkpoints
+        versions TEXT NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        type TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        data BLOB,
+        -- delta blobs: the version they extend and the full snapshot their chain starts at
+        prev TEXT,
+        base TEXT NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL,
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        data BLOB,
+        task_path TEXT NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )
+    """,
+]
+
+# Blob kinds
+FULL = "full"
+DELTA = "delta"
+EMPTY = "empty"
+
+# Threads/namespaces whose latest list values are kept in memory to compute the next delta
+TAIL_CACHE_SIZE = 1024
+# zlib level: search results compress well even at the fastest level
+ZLIB_LEVEL = 1
+
+Job = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+class Tail(NamedTuple):
+    # Latest stored version of a list channel and its value
+    version: str
+    value: List[Any]
+    # Deltas since the chain's full snapshot, and that snapshot's version
+    chain: int
+    base: str
+
+
+def extends(previous: Sequence[Any], current: Sequence[Any]) -> bool:
+    """Whether `current` starts with every item of `previous`, unchanged."""
+
+    if len(current) < len(previous):
+        return False
+    return all(a is b or a == b for a, b in zip(previous, current))
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    Async LangGraph checkpointer on a local SQLite file (see module docstring).
+
+    `keep` is the number of checkpoints kept per thread (0 keeps everything); subgraph
+    namespaces keep only their latest checkpoint. Pruning runs every `prune_seconds`
+    for the threads written since the previous pass.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        keep: int = CHECKPOINT_KEEP,
+        prune_seconds: float = CHECKPOINT_PRUNE_SECONDS,
+        snapshot_every: int = CHECKPOINT_SNAPSHOT_EVERY,
+        compress_min_bytes: int = CHECKPOINT_COMPRESS_MIN_BYTES,
+        max_batch: int = 256,
+        serde: Any = None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.keep = keep
+        self.prune_seconds = prune_seconds
+        self.snapshot_every = snapshot_every
+        self.compress_min_bytes = compress_min_bytes
+        self.max_batch = max_batch
+        self.counters: Counter = Counter()
+        self._tails: "OrderedDict[Tuple[str, str, str], Tail]" = OrderedDict()
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._write: Optional[aiosqlite.Connection] = None
+        self._read: Optional[aiosqlite.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._opening: Optional[asyncio.Future] = None
+
+    ## CONNECTIONS AND GROUP COMMIT
+    ## ------------------------------------------------------------------------
+
+    async def _ensure_open(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections and tasks belong to the loop that opened them
+            self._stop()
+            self._loop = loop
+            self._opening = loop.create_task(self._open())
+        await asyncio.shield(self._opening)
+
+    async def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._write = await aiosqlite.connect(self.path)
+        await self._write.execute("PRAGMA journal_mode = WAL")
+        await self._write.execute("PRAGMA synchronous = NORMAL")
+        for statement in SCHEMA:
+            await self._write.execute(statement)
+        await self._write.commit()
+        self._read = await aiosqlite.connect(self.path)
+        await self._read.execute("PRAGMA query_only = ON")
+
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._writer())]
+        if self.keep > 0 and self.prune_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._pruner()))
+
+    async def _run(self, job: Job) -> None:
+        """Queue `job` for the writer and wait until its transaction has committed."""
+
+        await self._ensure_open()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        await future
+
+    async def _writer(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Everything queued while the previous commit ran shares this transaction
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                for job, _ in batch:
+                    await job(self._write)
+                await self._write.commit()
+                outcomes = [None] * len(batch)
+                self.counters["commits"] += 1
+            except Exception:
+                await self._write.rollback()
+                # Retry one job per transaction so a bad write fails only its caller
+                outcomes = []
+                for job, _ in batch:
+                    try:
+                        await job(self._write)
+                        await self._write.commit()
+                        outcomes.append(None)
+                        self.counters["commits"] += 1
+                    except Exception as e:
+                        await self._write.rollback()
+                        outcomes.append(e)
+            self.counters["batched_jobs"] += len(batch)
+            for (_, future), error in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    async def _pruner(self) -> None:
+        while True:
+            await asyncio.sleep(self.prune_seconds)
+            if self._dirty:
+                try:
+                    await self.aprune_dirty()
+                except Exception:
+                    # Pruning is best effort; the next pass retries
+                    logger.exception("Checkpoint pruning failed; retrying next pass")
+
+    def _stop(self) -> None:
+        # Synchronous stop: safe to call without a running loop
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for conn in (self._write, self._read):
+            if conn is not None:
+                conn.stop()
+        self._write = self._read = None
+        self._loop = None
+
+    async def close(self) -> None:
+        """Wait for queued writes, then close both connections."""
+
+        if self._loop is not asyncio.get_running_loop() or self._write is None:
+            self._stop()
+            return
+        # Drain: a no-op job commits after everything queued before it
+        await self._run(_noop)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._write.close()
+        await self._read.close()
+        self._write = self._read = None
+        self._loop = None
+
+    async def __aenter__(self) -> "SQLiteCheckpointer":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    ## ENCODING
+    ## ------------------------------------------------------------------------
+
+    def _dumps(self, value: Any) -> Tuple[str, str, bytes]:
+        """(serializer type, codec, bytes), compressing payloads over the threshold."""
+
+        type_, data = self.serde.dumps_typed(value)
+        self.counters["bytes_serialized"] += len(data)
+        codec = ""
+        if len(data) >= self.compress_min_bytes:
+            compressed = zlib.compress(data, ZLIB_LEVEL)
+            if len(compressed) < len(data):
+                data, codec = compressed, "zlib"
+        self.counters["bytes_written"] += len(data)
+        return type_, codec, data
+
+    def _loads(self, type_: str, codec: str, data: bytes) -> Any:
+        if codec == "zlib":
+            data = zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _blob_row(
+        self, thread_id: str, ns: str, channel: str, version: str, value: Any
+    ) -> Tuple[tuple, Optional[Tail]]:
+        """Row for one channel version, and the channel's new tail if it is a list."""
+
+        key = (thread_id, ns, channel)
+        tail = self._tails.get(key) if isinstance(value, list) else None
+        if (
+            tail is not None
+            and tail.chain + 1 < self.snapshot_every
+            and extends(tail.value, value)
+        ):
+            type_, codec, data = self._dumps(value[len(tail.value) :])
+            row = (DELTA, type_, codec, data, tail.version, tail.base)
+            new_tail = Tail(version, list(value), tail.chain + 1, tail.base)
+            self.counters["blobs_delta"] += 1
+        else:
+            type_, codec, data = self._dumps(value)
+            row = (FULL, type_, codec, data, None, version)
+            new_tail = (
+                Tail(version, list(value), 0, version)
+                if isinstance(value, list)
+                else None
+            )
+            self.counters["blobs_full"] += 1
+        return (thread_id, ns, channel, version, *row), new_tail
+
+    def _remember(self, key: Tuple[str, str, str], tail: Tail) -> None:
+        self._tails[key] = tail
+        self._tails.move_to_end(key)
+        while len(self._tails) > TAIL_CACHE_SIZE:
+            self._tails.popitem(last=False)
+
+    ## WRITES
+    ## ------------------------------------------------------------------------
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        c = checkpoint.copy()
+        values: Dict[str, Any] = c.pop("channel_values")
+
+        blob_rows = []
+        tails = {}
+        for channel, version in new_versions.items():
+            if channel not in values:
+                blob_rows.append(
+                    (
+                        thread_id,
+                        ns,
+                        channel,
+                        version,
+                        EMPTY,
+                        "",
+                        "",
+                        None,
+                        None,
+                        version,
+                    )
+                )
+                continue
+            row, tail = self._blob_row(thread_id, ns, channel, version, values[channel])
+            blob_rows.append(row)
+            if tail is not None:
+                tails[(thread_id, ns, channel)] = tail
+
+        type_, codec, data = self._dumps(c)
+        metadata_type, metadata_data = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        self.counters["bytes_serialized"] += len(metadata_data)
+        self.counters["bytes_written"] += len(metadata_data)
+        checkpoint_row = (
+            thread_id,
+            ns,
+            checkpoint["id"],
+            parent_id,
+            type_,
+            codec,
+            data,
+            metadata_type,
+            metadata_data,
+            json.dumps(c["channel_versions"]),
+        )
+
+        async def job(conn: aiosqlite.Connection) -> None:
+            await conn.executemany(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                blob_rows,
+            )
+            await conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                checkpoint_row,
+            )
+
+        try:
+            await self._run(job)
+        except BaseException:
+            # The deltas computed for this write never landed; start the next from a snapshot
+            for key in tails:
+                self._tails.pop(key, None)
+            raise
+        for key, tail in tails.items():
+            self._remember(key, tail)
+        self._dirty.add((thread_id, ns))
+        self.counters["checkpoints"] += 1
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # Special writes (errors, interrupts) replace; regular writes are idempotent per index
+        replace, ignore = [], []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, codec, data = self._dumps(value)
+            row = (
+                thread_id,
+                ns,
+                checkpoint_id,
+                task_id,
+                idx,
+                channel,
+                type_,
+                codec,
+                data,
+                task_path,
+            )
+            (replace if idx < 0 else ignore).append(row)
+
+        async def job(conn: aiosqlite.Connection) -> None:
+            for verb, rows in (("REPLACE", replace), ("IGNORE", ignore)):
+                if rows:
+                    await conn.executemany(
+                        f"INSERT OR {verb} INTO writes "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+
+        await self._run(job)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        async def job(conn: aiosqlite.Connection) -> None:
+            for table in ("checkpoints", "blobs", "writes"):
+                await conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)
+                )
+
+        await self._run(job)
+        for key in [key for key in self._tails if key[0] == thread_id]:
+            del self._tails[key]
+        self._dirty = {key for key in self._dirty if key[0] != thread_id}
+
+    ## READS
+    ## ------------------------------------------------------------------------
+
+    async def _load_values(
+        self, thread_id: str, ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        wanted = {}
+        for channel, version in versions.items():
+            tail = self._tails.get((thread_id, ns, channel))
+            if tail is not None and tail.version == version:
+                values[channel] = list(tail.value)
+            else:
+                wanted[channel] = version
+        if not wanted:
+            return values
+
+        pairs = ", ".join("(?, ?)" for _ in wanted)
+        params = [item for pair in wanted.items() for item in pair]
+        rows = await self._read.execute_fetchall(
+            "SELECT channel, version, kind, type, codec, data, base FROM blobs "
+            f"WHERE thread_id = ? AND checkpoint_ns = ? AND (channel, version) IN (VALUES {pairs})",
+            [thread_id, ns, *params],
+        )
+        for channel, version, kind, type_, codec, data, base in rows:
+            if kind == FULL:
+                values[channel] = self._loads(type_, codec, data)
+            elif kind == DELTA:
+                values[channel] = await self._load_chain(
+                    thread_id, ns, channel, version, base
+                )
+        return values
+
+    async def _load_chain(
+        self, thread_id: str, ns: str, channel: str, version: str, base: str
+    ) -> List[Any]:
+        """Rebuild a delta-encoded list: the chain's full snapshot plus every delta up to `version`."""
+
+        rows = await self._read.execute_fetchall(
+            "SELECT version, kind, type, codec, data, prev FROM blobs "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? "
+            "AND version >= ? AND version <= ?",
+            (thread_id, ns, channel, base, version),
+        )
+        by_version = {row[0]: row for row in rows}
+        chain = []
+        current: Optional[str] = version
+        while current is not None:
+            row = by_version.get(current)
+            if row is None:
+                raise ValueError(
+                    f"Checkpoint blob {channel}@{current} of thread {thread_id!r} is missing"
+                )
+            chain.append(row)
+            current = row[5] if row[1] == DELTA else None
+        value: List[Any] = []
+        for _, _, type_, codec, data, _ in reversed(chain):
+            value.extend(self._loads(type_, codec, data))
+        return value
+
+    async def _tuple(self, row: tuple) -> CheckpointTuple:
+        (
+            thread_id,
+            ns,
+            checkpoint_id,
+            parent_id,
+            type_,
+            codec,
+            data,
+            metadata_type,
+            metadata,
+        ) = row
+        checkpoint = self._loads(type_, codec, data)
+        writes = await self._read.execute_fetchall(
+            "SELECT task_id, idx, channel, type, codec, data, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, ns, checkpoint_id),
+        )
+        writes = sorted(writes, key=lambda w: writes_sort_key(w[6], w[0], w[1]))
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": await self._load_values(
+                    thread_id, ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self._loads(type_, codec, data))
+                for task_id, _, channel, type_, codec, data, _ in writes
+            ],
+        )
+
+    _COLUMNS = (
+        "thread_id, checkpoint_ns, checkpoint_id, parent_id, type, codec, checkpoint, "
+        "metadata_type, metadata"
+    )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self._ensure_open()
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            rows = await self._read.execute_fetchall(
+                f"SELECT {self._COLUMNS} FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, ns, checkpoint_id),
+            )
+        else:
+            rows = await self._read.execute_fetchall(
+                f"SELECT {self._COLUMNS} FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, ns),
+            )
+        rows = list(rows)
+        return await self._tuple(rows[0]) if rows else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self._ensure_open()
+        where, params = [], []
+        if config is not None:
+            configurable = config["configurable"]
+            where.append("thread_id = ?")
+            params.append(configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(configurable["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before is not None and get_checkpoint_id(before):
+            where.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        sql = f"SELECT {self._COLUMNS} FROM checkpoints"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY checkpoint_id DESC"
+
+        rows = await self._read.execute_fetchall(sql, params)
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[7], row[8]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            yield await self._tuple(row)
+
+    ## PRUNING
+    ## ------------------------------------------------------------------------
+
+    async def aprune_dirty(self) -> None:
+        """Prune the threads written since the last pass (runs in the background)."""
+
+        dirty, self._dirty = self._dirty, set()
+        start = time.perf_counter()
+
+        async def job(conn: aiosqlite.Connection) -> None:
+            for thread_id, ns in dirty:
+                await self._prune_namespace(conn, thread_id, ns)
+
+        try:
+            await self._run(job)
+        except BaseException:
+            self._dirty |= dirty
+            raise
+        self.counters["prune_passes"] += 1
+        self.counters["prune_ms"] += int((time.perf_counter() - start) * 1000)
+
+    async def _prune_namespace(
+        self, conn: aiosqlite.Connection, thread_id: str, ns: str
+    ) -> None:
+        # Subgraph namespaces are only needed to resume their latest step
+        keep = self.keep if ns == "" else 1
+        key = (thread_id, ns)
+        rows = await conn.execute_fetchall(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+            (*key, keep),
+        )
+        rows = list(rows)
+        if not rows:
+            return
+        newest_pruned = rows[0][0]
+        for table in ("checkpoints", "writes"):
+            cursor = await conn.execute(
+                f"DELETE FROM {table} "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id <= ?",
+                (*key, newest_pruned),
+            )
+            if table == "checkpoints":
+                self.counters["pruned_checkpoints"] += cursor.rowcount
+
+        # Oldest blob each channel still needs: the chain base of every referenced version
+        referenced: Dict[str, Set[str]] = {}
+        for (versions,) in await conn.execute_fetchall(
+            "SELECT versions FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            key,
+        ):
+            for channel, version in json.loads(versions).items():
+                referenced.setdefault(channel, set()).add(str(version))
+        blobs = await conn.execute_fetchall(
+            "SELECT channel, version, base FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+            key,
+        )
+        floor: Dict[str, str] = {}
+        for channel, version, base in blobs:
+            if version in referenced.get(channel, ()):
+                floor[channel] = min(floor.get(channel, base), base)
+        # Chains only reach back to their base, so everything older is unreachable
+        stale = [
+            (*key, channel, version)
+            for channel, version, _ in blobs
+            if channel not in floor or version < floor[channel]
+        ]
+        await conn.executemany(
+            "DELETE FROM blobs "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            stale,
+        )
+        self.counters["pruned_blobs"] += len(stale)
+
+    ## VERSIONS AND STATS
+    ## ------------------------------------------------------------------------
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Zero-padded so versions sort as text (delta chains and pruning rely on it)
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.counters)
+        if self.counters["bytes_serialized"]:
+            stats["compression_ratio"] = (
+                self.counters["bytes_written"] / self.counters["bytes_serialized"]
+            )
+        if self.counters["commits"]:
+            stats["jobs_per_commit"] = (
+                self.counters["batched_jobs"] / self.counters["commits"]
+            )
+        return stats
+
+
+async def _noop(conn: aiosqlite.Connection) -> None:
+    return None
@@ -0,0 +1,204 @@
+"""
+City and airport normalization for the search tools.
+
+The inventory stores canonical city names ("New York", "Paris") and the tools match them exactly,
+so inputs like "NYC", "JFK", "new york" or "Paris, France" used to return nothing and send the
+subagent back to the model for another guess. `CityIndex` resolves such inputs to the canonical
+city with a precomputed lookup table (case and accent folding, airport and metro codes, common
+aliases) and falls back to trigram similarity for misspellings.
+"""
+
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.model import Destination
+
+# fmt: off
+# Reference data for the cities served by the inventory
+DESTINATIONS: List[Destination] = [
+    Destination(destination_id="DST001", city="New York", country="United States", airport_code="JFK", description="Major US hub on the East Coast"),
+    Destination(destination_id="DST002", city="Los Angeles", country="United States", airport_code="LAX", description="West Coast gateway to Asia-Pacific"),
+    Destination(destination_id="DST003", city="Chicago", country="United States", airport_code="ORD", description="Midwest hub"),
+    Destination(destination_id="DST004", city="Miami", country="United States", airport_code="MIA", description="Gateway to Latin America and Europe"),
+    Destination(destination_id="DST005", city="Seattle", country="United States", airport_code="SEA", description="Pacific Northwest hub"),
+    Destination(destination_id="DST006", city="Boston", country="United States", airport_code="BOS", description="New England hub"),
+    Destination(destination_id="DST007", city="San Francisco", country="United States", airport_code="SFO", description="Bay Area gateway"),
+    Destination(destination_id="DST008", city="Denver", country="United States", airport_code="DEN", description="Rocky Mountain hub"),
+    Destination(destination_id="DST009", city="Atlanta", country="United States", airport_code="ATL", description="Southeast hub"),
+    Destination(destination_id="DST010", city="Houston", country="United States", airport_code="IAH", description="Gulf Coast hub"),
+    Destination(destination_id="DST011", city="Paris", country="France", airport_code="CDG", description="Capital of France"),
+    Destination(destination_id="DST012", city="Tokyo", country="Japan", airport_code="HND", description="Capital of Japan"),
+    Destination(destination_id="DST013", city="London", country="United Kingdom", airport_code="LHR", description="Capital of the United Kingdom"),
+    Destination(destination_id="DST014", city="Barcelona", country="Spain", airport_code="BCN", description="Catalan capital on the Mediterranean"),
+    Destination(destination_id="DST015", city="Amsterdam", country="Netherlands", airport_code="AMS", description="Capital of the Netherlands"),
+    Destination(destination_id="DST016", city="Rome", country="Italy", airport_code="FCO", description="Capital of Italy"),
+    Destination(destination_id="DST017", city="Sydney", country="Australia", airport_code="SYD", description="Largest city in Australia"),
+    Destination(destination_id="DST018", city="Dubai", country="United Arab Emirates", airport_code="DXB", description="Middle East hub"),
+    Destination(destination_id="DST019", city="Bangkok", country="Thailand", airport_code="BKK", description="Capital of Thailand"),
+    Destination(destination_id="DST020", city="Frankfurt", country="Germany", airport_code="FRA", description="Financial center and European hub"),
+]
+
+# Secondary airports, metro codes and common names (normalized form -> canonical city)
+ALIASES: Dict[str, str] = {
+    "nyc": "New York", "new york city": "New York", "manhattan": "New York", "big apple": "New York",
+    "lga": "New York", "ewr": "New York", "newark": "New York",
+    "la": "Los Angeles", "l a": "Los Angeles",
+    "chi": "Chicago", "mdw": "Chicago",
+    "mia": "Miami",
+    "sf": "San Francisco", "san fran": "San Francisco", "frisco": "San Francisco",
+    "hou": "Houston",
+    "par": "Paris", "ory": "Paris",
+    "tyo": "Tokyo", "nrt": "Tokyo", "narita": "Tokyo", "haneda": "Tokyo",
+    "lon": "London", "lgw": "London", "stn": "London", "ltn": "London", "lcy": "London", "heathrow": "London", "gatwick": "London",
+    "roma": "Rome", "rom": "Rome", "cia": "Rome",
+    "tokio": "Tokyo", "londres": "London", "londra": "London", "parigi": "Paris", "barcelone": "Barcelona",
+    "dmk": "Bangkok", "krung thep": "Bangkok",
+    "frankfurt am main": "Frankfurt",
+}
+# fmt: on
+
+# Words that qualify a place without changing which city it is
+_NOISE_WORDS = {
+    "airport",
+    "intl",
+    "international",
+    "city",
+    "center",
+    "centre",
+    "downtown",
+}
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+# Minimum trigram Jaccard similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.45
+# Resolved inputs kept in the memo before it is reset
+MEMO_SIZE = 10_000
+
+
+def normalize(text: str) -> str:
+    """Fold case and accents, drop a trailing ", Country" and punctuation, collapse whitespace."""
+
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().split(",")[0]
+    return " ".join(_NON_ALNUM.sub(" ", text).split())
+
+
+def _strip_noise(key: str) -> str:
+    words = [word for word in key.split() if word not in _NOISE_WORDS]
+    return " ".join(words)
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class CityIndex:
+    """
+    Precomputed mapping from free-form city/airport input to canonical inventory cities.
+
+    Built lazily on first use from `DESTINATIONS`, `ALIASES` and the distinct cities in the
+    inventory database. `resolve` returns the input unchanged when nothing matches.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self.counters: Counter = Counter()
+        self._keys: Dict[str, str] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._memo: Dict[str, Tuple[str, str]] = {}
+        self._built = False
+
+    def _inventory_cities(self) -> List[str]:
+        if self.db_path is None:
+            return []
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("""
+                SELECT origin_city FROM flights
+                UNION SELECT destination_city FROM flights
+                UNION SELECT pickup_city FROM cars
+                UNION SELECT location_city FROM hotels
+            """).fetchall()
+        except sqlite3.Error:
+            return []
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def build(self, extra_cities: Iterable[str] = ()) -> None:
+        keys: Dict[str, str] = {}
+        for city in [*self._inventory_cities(), *extra_cities]:
+            keys[normalize(city)] = city
+        for destination in DESTINATIONS:
+            keys[normalize(destination.city)] = destination.city
+            keys[normalize(destination.airport_code)] = destination.city
+        for alias, city in ALIASES.items():
+            keys.setdefault(alias, city)
+
+        grams: Dict[str, Set[str]] = {}
+        for key in keys:
+            for gram in trigrams(key):
+                grams.setdefault(gram, set()).add(key)
+
+        self._keys, self._trigrams, self._memo = keys, grams, {}
+        self._built = True
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        query = trigrams(key)
+        shared: Counter = Counter()
+        for gram in query:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] += 1
+        best, best_score = None, FUZZY_THRESHOLD
+        for candidate, overlap in shared.items():
+            score = overlap / (len(query) + len(trigrams(candidate)) - overlap)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self._keys[best] if best is not None else None
+
+    def _lookup(self, text: str) -> Tuple[str, str]:
+        """Canonical city for `text` and how it matched: exact, normalized, alias, fuzzy."""
+
+        key = normalize(text)
+        stripped = _strip_noise(key) or key
+        city = self._keys.get(key) or self._keys.get(stripped)
+        if city is not None:
+            if city == text:
+                kind = "exact"
+            elif normalize(city) in (key, stripped):
+                # Only case, accents, punctuation or qualifiers differed
+                kind = "normalized"
+            else:
+                kind = "alias"
+        else:
+            city = self._fuzzy(stripped)
+            kind = "fuzzy" if city is not None else "unresolved"
+        self.counters[kind] += 1
+        return (city, kind) if city is not None else (text, kind)
+
+    def resolve(self, text: str) -> str:
+        """Return the canonical city for `text`, or `text` itself when no city matches."""
+
+        if not self._built:
+            self.build()
+        match = self._memo.get(text)
+        if match is None:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            match = self._memo[text] = self._lookup(text)
+        else:
+            self.counters["memo"] += 1
+        city, kind = match
+        if kind in ("alias", "fuzzy"):
+            # A code, alias or misspelling: the model's first guess would have come back
+            # empty and the subagent would have spent another model call retrying
+            self.counters["retries_saved"] += 1
+        return city
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counters)
@@ -0,0 +1,152 @@
+"""
+Token-budgeted history compaction for the supervisor.
+
+The supervisor sends its whole conversation to the model every turn, so prompt size (and latency)
+grows with thread length. At the start of each turn the top-level graph fits the saved history to
+a token budget (`compact_history_node` in `src/graph.py`):
+
+1. The most recent turns (from the N-th last user message on) are always kept verbatim.
+2. Older ToolMessage payloads are collapsed to short digests.
+3. If that is still over budget, the older messages are folded into a running summary and removed
+   from state. Each summarization only covers messages added since the previous one.
+
+Token counts are estimated from message text (see `src/tokens.py`).
+"""
+
+import logging
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from langchain_core.messages import (
+    AnyMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+)
+
+from src.model import ainvoke_model, get_model, node_model
+from src.prompts import HISTORY_SUMMARY_PROMPT
+from src.scheduler import PRIORITY_INTERACTIVE
+from src.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def digest_tool_message(message: AnyMessage, max_chars: int) -> AnyMessage:
+    """
+    Cut a ToolMessage payload to `max_chars`.
+    The copy keeps the message id, so writing it to state replaces the original.
+    """
+
+    content = (
+        message.content if isinstance(message.content, str) else str(message.content)
+    )
+    if len(content) <= max_chars:
+        return message
+    digest = f"{content[:max_chars]}... [{len(content) - max_chars} chars omitted]"
+    return message.model_copy(update={"content": digest})
+
+
+def recent_window_start(messages: Sequence[AnyMessage], keep_turns: int) -> int:
+    """Index of the user message that opens the last `keep_turns` turns (0 if there are fewer)."""
+
+    seen = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            seen += 1
+            if seen == keep_turns:
+                return i
+    return 0
+
+
+def summary_message(summary: str) -> SystemMessage:
+    return SystemMessage(
+        content=f"<conversation_summary>\n{summary}\n</conversation_summary>"
+    )
+
+
+class Compaction(NamedTuple):
+    # History to send to the model, after the system prompt
+    messages: List[AnyMessage]
+    # State update: message replacements/removals and the new summary
+    update: Dict[str, Any]
+    tokens_before: int
+    tokens_after: int
+
+
+async def summarize(previous: Optional[str], messages: Sequence[AnyMessage]) -> str:
+    transcript = "\n".join(
+        f"{message.type}: {message.content}" for message in messages if message.content
+    )
+    request = (
+        f"<previous_summary>\n{previous or '(none)'}\n</previous_summary>\n"
+        f"<new_messages>\n{transcript}\n</new_messages>"
+    )
+    response = await ainvoke_model(
+        get_model(node_model("summarizer")),
+        [SystemMessage(content=HISTORY_SUMMARY_PROMPT), HumanMessage(content=request)],
+        priority=PRIORITY_INTERACTIVE,
+    )
+    return str(response.content)
+
+
+async def compact_history(
+    messages: Sequence[AnyMessage],
+    summary: Optional[str],
+    token_budget: int,
+    keep_turns: int = 2,
+    tool_digest_chars: int = 240,
+) -> Compaction:
+    """Fit `messages` (plus any existing summary) into `token_budget` tokens."""
+
+    prefix = [summary_message(summary)] if summary else []
+    tokens_before = estimate_tokens(prefix) + estimate_tokens(messages)
+    if token_budget <= 0 or tokens_before <= token_budget:
+        return Compaction([*prefix, *messages], {}, tokens_before, tokens_before)
+
+    boundary = recent_window_start(messages, keep_turns)
+    old, recent = list(messages[:boundary]), list(messages[boundary:])
+
+    # Step 1: collapse old tool payloads in place
+    digested = [
+        digest_tool_message(m, tool_digest_chars) if m.type == "tool" else m
+        for m in old
+    ]
+    replacements = [new for new, original in zip(digested, old) if new is not original]
+    tokens = (
+        estimate_tokens(prefix) + estimate_tokens(digested) + estimate_tokens(recent)
+    )
+    if tokens <= token_budget or not old:
+        return Compaction(
+            [*prefix, *digested, *recent],
+            {"messages": replacements} if replacements else {},
+            tokens_before,
+            tokens,
+        )
+
+    # Step 2: fold the old messages into the running summary and drop them from state
+    new_summary = await summarize(summary, digested)
+    prefix = [summary_message(new_summary)]
+    tokens = estimate_tokens(prefix) + estimate_tokens(recent)
+    return Compaction(
+        [*prefix, *recent],
+        {
+            "summary": new_summary,
+            "messages": [RemoveMessage(id=m.id) for m in old if m.id],
+        },
+        tokens_before,
+        tokens,
+    )
+
+
+# Prompt token estimates for recent supervisor turns: (before, after) compaction
+turn_tokens: deque = deque(maxlen=1000)
+
+
+def record_turn(compaction: Compaction) -> None:
+    turn_tokens.append((compaction.tokens_before, compaction.tokens_after))
+    logger.info(
+        "supervisor prompt tokens: %d before compaction, %d sent",
+        compaction.tokens_before,
+        compaction.tokens_after,
+    )
@@ -0,0 +1,106 @@
+"""
+Runtime settings for the Travel Planner.
+Values are read from the environment (see .env.example) so deployments can tune them without code changes.
+"""
+
+import os
+
+# Inventory database: the runtime copy that searches read and bookings write, created from
+# the committed seed database (never written) when it does not exist yet
+DB_PATH = os.getenv("TRAVEL_DB_PATH", ".cache/travel_data.db")
+DB_SEED_PATH = os.getenv("TRAVEL_DB_SEED_PATH", "src/db/travel_data.db")
+DB_POOL_SIZE = int(os.getenv("TRAVEL_DB_POOL_SIZE", "4"))
+DB_AUTO_MIGRATE = os.getenv("TRAVEL_DB_AUTO_MIGRATE", "true").lower() == "true"
+
+# In-memory inventory snapshot (zero-I/O search lookups)
+INVENTORY_SNAPSHOT = os.getenv("TRAVEL_INVENTORY_SNAPSHOT", "false").lower() == "true"
+INVENTORY_SNAPSHOT_REFRESH_SECONDS = float(
+    os.getenv("TRAVEL_INVENTORY_SNAPSHOT_REFRESH_SECONDS", "1.0")
+)
+
+# Search results shown to the model
+RESULT_TOP_K = int(os.getenv("TRAVEL_RESULT_TOP_K", "10"))
+RESULT_FORMAT = os.getenv("TRAVEL_RESULT_FORMAT", "table")  # "table" or "json"
+
+# Subagents
+TOOL_CONCURRENCY = int(os.getenv("TRAVEL_TOOL_CONCURRENCY", "8"))
+
+# In-flight coalescing of identical concurrent searches and (optionally) subagent runs
+SEARCH_COALESCE = os.getenv("TRAVEL_SEARCH_COALESCE", "true").lower() == "true"
+SUBAGENT_COALESCE = os.getenv("TRAVEL_SUBAGENT_COALESCE", "false").lower() == "true"
+
+# Chat models: the default, and per-node overrides as "node=model" pairs, where a node is
+# "supervisor", "summarizer" or a subagent name (e.g. "car_rental_agent=gpt-4.1-mini")
+MODEL_NAME = os.getenv("TRAVEL_MODEL", "gpt-4.1")
+NODE_MODELS = {
+    node.strip(): model.strip()
+    for node, _, model in (
+        pair.partition("=") for pair in os.getenv("TRAVEL_NODE_MODELS", "").split(",")
+    )
+    if node.strip() and model.strip()
+}
+# Subagent cascade: turns try the fast model first and escalate to the node's model
+MODEL_CASCADE = os.getenv("TRAVEL_MODEL_CASCADE", "false").lower() == "true"
+MODEL_CASCADE_FAST = os.getenv("TRAVEL_MODEL_CASCADE_FAST", "gpt-4.1-mini")
+
+# Speculative prefetch of hotels and cars at a BookFlight destination
+PREFETCH = os.getenv("TRAVEL_PREFETCH", "true").lower() == "true"
+PREFETCH_CONCURRENCY = int(os.getenv("TRAVEL_PREFETCH_CONCURRENCY", "2"))
+PREFETCH_TTL_SECONDS = float(os.getenv("TRAVEL_PREFETCH_TTL_SECONDS", "120"))
+PREFETCH_MAX_ENTRIES = int(os.getenv("TRAVEL_PREFETCH_MAX_ENTRIES", "256"))
+
+# Model response cache
+LLM_CACHE = os.getenv("TRAVEL_LLM_CACHE", "false").lower() == "true"
+LLM_CACHE_PATH = os.getenv("TRAVEL_LLM_CACHE_PATH", ".cache/llm_cache.db")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("TRAVEL_LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("TRAVEL_LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("TRAVEL_LLM_CACHE_MAX_BYTES", str(100 * 2**20)))
+
+# Model call scheduler (provider rate limits); 0 means unlimited
+MODEL_RPM = int(os.getenv("TRAVEL_MODEL_RPM", "0"))
+MODEL_TPM = int(os.getenv("TRAVEL_MODEL_TPM", "0"))
+# Completion tokens assumed per call until the response reports actual usage
+MODEL_EXPECTED_COMPLETION_TOKENS = int(
+    os.getenv("TRAVEL_MODEL_EXPECTED_COMPLETION_TOKENS", "500")
+)
+MODEL_MAX_RETRIES = int(os.getenv("TRAVEL_MODEL_MAX_RETRIES", "4"))
+MODEL_BACKOFF_SECONDS = float(os.getenv("TRAVEL_MODEL_BACKOFF_SECONDS", "0.5"))
+MODEL_BACKOFF_MAX_SECONDS = float(os.getenv("TRAVEL_MODEL_BACKOFF_MAX_SECONDS", "30"))
+
+# Deadlines: per-delegation limit (0 = none) and time kept for the supervisor's answer
+SUBAGENT_TIMEOUT_SECONDS = float(os.getenv("TRAVEL_SUBAGENT_TIMEOUT_SECONDS", "0"))
+DEADLINE_RESERVE_SECONDS = float(os.getenv("TRAVEL_DEADLINE_RESERVE_SECONDS", "5"))
+# Hedged model calls: duplicate a request still running after the p95 of recent calls
+MODEL_HEDGE = os.getenv("TRAVEL_MODEL_HEDGE", "false").lower() == "true"
+MODEL_HEDGE_MIN_SAMPLES = int(os.getenv("TRAVEL_MODEL_HEDGE_MIN_SAMPLES", "20"))
+
+# Supervisor
+FLIGHT_FAST_PATH = os.getenv("TRAVEL_FLIGHT_FAST_PATH", "false").lower() == "true"
+# Prompt token budget for supervisor history; 0 disables compaction
+HISTORY_TOKEN_BUDGET = int(os.getenv("TRAVEL_HISTORY_TOKEN_BUDGET", "8000"))
+HISTORY_KEEP_TURNS = int(os.getenv("TRAVEL_HISTORY_KEEP_TURNS", "2"))
+HISTORY_TOOL_DIGEST_CHARS = int(os.getenv("TRAVEL_HISTORY_TOOL_DIGEST_CHARS", "240"))
+
+# Instrumentation (Prometheus text format)
+METRICS = os.getenv("TRAVEL_METRICS", "false").lower() == "true"
+# Serve /metrics on this port when set; 0 leaves export to the host
+METRICS_PORT = int(os.getenv("TRAVEL_METRICS_PORT", "0"))
+
+# Conversation checkpoints (src/checkpointer.py)
+CHECKPOINT_PATH = os.getenv("TRAVEL_CHECKPOINT_PATH", ".cache/checkpoints.db")
+# Checkpoints kept per thread by background pruning; 0 keeps everything
+CHECKPOINT_KEEP = int(os.getenv("TRAVEL_CHECKPOINT_KEEP", "20"))
+CHECKPOINT_PRUNE_SECONDS = float(os.getenv("TRAVEL_CHECKPOINT_PRUNE_SECONDS", "60"))
+# Longest delta chain before a list channel is written in full again
+CHECKPOINT_SNAPSHOT_EVERY = int(os.getenv("TRAVEL_CHECKPOINT_SNAPSHOT_EVERY", "32"))
+CHECKPOINT_COMPRESS_MIN_BYTES = int(
+    os.getenv("TRAVEL_CHECKPOINT_COMPRESS_MIN_BYTES", "1024")
+)
+
+# Bookings (src/db/bookings.py), written to the inventory database
+# FULL syncs every group commit to disk; NORMAL may lose the last commits on power loss
+BOOKING_SYNCHRONOUS = os.getenv("TRAVEL_BOOKING_SYNCHRONOUS", "FULL").upper()
+# Bookings committed together in one transaction at most
+BOOKING_MAX_BATCH = int(os.getenv("TRAVEL_BOOKING_MAX_BATCH", "256"))
+# How long a write waits for another process holding the database write lock
+BOOKING_BUSY_TIMEOUT_MS = int(os.getenv("TRAVEL_BOOKING_BUSY_TIMEOUT_MS", "5000"))
@@ -0,0 +1 @@
+# Inventory database package
@@ -0,0 +1,358 @@
+"""
+Transactional booking writes on the inventory database.
+
+The search tools only read. `BookingStore.book` reserves `quantity` seats, rooms or cars of one
+offer and records the booking in the same transaction:
+
+- Optimistic concurrency: searches take no locks, so by the time the agent books, the offer may
+  have sold out or been repriced. The decrement re-checks what the agent relied on as part of
+  the write, `UPDATE ... SET available = available - q WHERE id = ? AND available >= q` (plus
+  the price the agent saw, when given); a booking that matches no row fails with `BookingError`
+  instead of overselling. Check and decrement are one statement under SQLite's write lock, so
+  they also hold between processes sharing the file, and a trigger from schema migration 4
+  rejects any write that would still take availability below zero.
+- Idempotency: every booking carries a key (the tools use thread and tool-call id). A key that
+  is already in `bookings` returns the original booking without touching inventory, so a tool
+  call replayed after a retry or a resumed run cannot book twice.
+- Group commit: bookings from all conversations go through one writer task that runs whatever
+  has queued up in a single `BEGIN IMMEDIATE` transaction on the WAL database, each booking in
+  its own savepoint so a failed one leaves the others in place. The batch runs as one call on
+  the thread that owns the write connection, so a booking costs a few SQLite statements rather
+  than an event-loop round trip per statement. `book` returns once the transaction has
+  committed; with `synchronous=FULL` a batch costs one fsync, not one per booking.
+
+Counters (`stats()`, and `travel_booking_outcomes_total` / `travel_booking_batch_size` with
+`TRAVEL_METRICS=true`): `confirmed`, `replayed`, failures by reason, commits and batch sizes.
+"""
+
+import asyncio
+import sqlite3
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.config import METRICS
+from src.db.pool import prepare_database
+from src.db.query import DATE, PRICE, TABLES
+from src.metrics import booking_batch_size, booking_outcomes
+from src.model import TravelBooking
+
+
+class Bookable(NamedTuple):
+    table: str
+    # Column naming the city the booking is for
+    destination: str
+    # What `quantity` counts
+    unit: str
+
+
+BOOKABLE: Dict[str, Bookable] = {
+    "flight": Bookable("flights", "destination_city", "seat"),
+    "hotel": Bookable("hotels", "location_city", "room"),
+    "car": Bookable("cars", "pickup_city", "car"),
+}
+
+BOOKING_COLUMNS = (
+    "booking_id, booking_type, item_id, destination, travel_date, quantity, price, "
+    "details, created_at, idempotency_key"
+)
+
+
+class BookingError(ValueError):
+    """A booking that was not made; the message is meant for the model."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class BookingRequest(NamedTuple):
+    booking_type: str
+    item_id: str
+    quantity: int
+    idempotency_key: str
+    expected_price: Optional[float] = None
+
+
+def _units(quantity: int, unit: str) -> str:
+    return f"{quantity} {unit}{'' if quantity == 1 else 's'}"
+
+
+def _details(booking_type: str, row: Sequence[Any], quantity: int) -> str:
+    """One-line description of the booked offer from its inventory row."""
+
+    units = _units(quantity, BOOKABLE[booking_type].unit)
+    if booking_type == "flight":
+        return (
+            f"Flight {row[0]} {row[1]} -> {row[2]} ({row[3]}) on {row[DATE]}, {units}"
+        )
+    if booking_type == "hotel":
+        return f"{row[2]} ({row[0]}) in {row[1]}, night of {row[DATE]}, {units}"
+    return f"{row[2]} {row[3]} ({row[0]}) in {row[1]} on {row[DATE]}, {units}"
+
+
+def _booking(row: Sequence[Any]) -> TravelBooking:
+    booking_id, booking_type, item_id, destination, travel_date, quantity = row[:6]
+    return TravelBooking(
+        booking_id=booking_id,
+        destination=destination,
+        booking_type=booking_type,
+        details=row[7],
+        price=row[6],
+        booking_date=datetime.fromisoformat(row[8]),
+        item_id=item_id,
+        travel_date=travel_date,
+        quantity=quantity,
+    )
+
+
+class BookingStore:
+    """
+    Booking writer on the inventory database (see module docstring).
+
+    The write connection lives on a dedicated thread. The queue and writer task are bound to
+    the event loop that first books; on a new loop (e.g. a second `asyncio.run`) they are
+    replaced.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        synchronous: str = "FULL",
+        max_batch: int = 256,
+        busy_timeout_ms: int = 5000,
+        auto_migrate: bool = True,
+    ):
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.max_batch = max(1, max_batch)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.auto_migrate = auto_migrate
+        self.counters: Counter = Counter()
+        # One thread owns the write connection and runs each batch start to finish
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="bookings")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    ## CONNECTION AND GROUP COMMIT
+    ## ------------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # Runs on the writer thread, which then owns the connection
+        prepare_database(self.db_path, self.auto_migrate)
+        # Autocommit mode: the writer issues BEGIN / SAVEPOINT / COMMIT itself
+        conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        return conn
+
+    async def _ensure_open(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # The queue and writer task belong to the loop that started them
+            if self._writer_task is not None:
+                self._writer_task.cancel()
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._writer())
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Everything queued while the previous commit ran shares this transaction
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # The whole batch is one call on the writer thread, not a thread hop per statement
+            committed, outcomes = await loop.run_in_executor(
+                self._executor, self._commit, [request for request, _ in batch]
+            )
+            if committed:
+                self.counters["commits"] += 1
+                self.counters["batched_bookings"] += len(batch)
+                if METRICS:
+                    booking_batch_size.observe(len(batch))
+            for (request, future), outcome in zip(batch, outcomes):
+                self._count(request.booking_type, outcome)
+                if not future.done():
+                    if isinstance(outcome, Exception):
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(outcome[0])
+                self._queue.task_done()
+
+    def _commit(self, batch: List[BookingRequest]) -> Tuple[bool, List[Any]]:
+        """
+        Run `batch` in one transaction on the writer thread. Returns whether it committed and,
+        per request, (booking, outcome) or the exception.
+        """
+
+        outcomes: List[Any] = []
+        try:
+            if self._conn is None:
+                self._conn = self._connect()
+            self._conn.execute("BEGIN IMMEDIATE")
+            for request in batch:
+                self._conn.execute("SAVEPOINT booking")
+                try:
+                    outcomes.append(self._book(request))
+                except Exception as e:
+                    self._conn.execute("ROLLBACK TO booking")
+                    outcomes.append(e)
+                self._conn.execute("RELEASE booking")
+            self._conn.execute("COMMIT")
+        except Exception as e:
+            # No write lock, or the commit failed: nothing in the batch was written
+            if self._conn is not None and self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            return False, [e] * len(batch)
+        return True, outcomes
+
+    def _count(self, booking_type: str, outcome: Any) -> None:
+        if isinstance(outcome, BookingError):
+            name = outcome.reason
+        elif isinstance(outcome, Exception):
+            name = "error"
+        else:
+            name = outcome[1]
+        self.counters[name] += 1
+        if METRICS:
+            booking_outcomes.inc(booking_type, name)
+
+    async def close(self) -> None:
+        """Wait for queued bookings to commit, then close the connection."""
+
+        if self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self._writer_task = self._queue = self._loop = None
+        if self._conn is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._conn.close
+            )
+            self._conn = None
+
+    ## BOOKING
+    ## ------------------------------------------------------------------------
+
+    def _book(self, request: BookingRequest) -> Tuple[TravelBooking, str]:
+        booking_type, item_id, quantity, key, expected_price = request
+        existing = self._conn.execute(
+            f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE idempotency_key = ?", (key,)
+        ).fetchone()
+        if existing is not None:
+            if (existing[1], existing[2], existing[5]) != (
+                booking_type,
+                item_id,
+                quantity,
+            ):
+                raise BookingError(
+                    "key_reused",
+                    f"Idempotency key {key!r} already booked {existing[1]} {existing[2]}",
+                )
+            return _booking(existing), "replayed"
+
+        bookable = BOOKABLE[booking_type]
+        columns = TABLES[bookable.table][0]
+        # Compare-and-decrement: succeeds only if the offer still is what the agent saw
+        sql = (
+            f"UPDATE {bookable.table} SET available = available - ? "
+            "WHERE id = ? AND available >= ? AND price IS NOT NULL"
+        )
+        params: List[Any] = [quantity, item_id, quantity]
+        if expected_price is not None:
+            sql += " AND ROUND(price, 2) = ROUND(?, 2)"
+            params.append(expected_price)
+        row = self._conn.execute(f"{sql} RETURNING {columns}", params).fetchone()
+        if row is None:
+            self._reject(request, bookable)
+
+        booking = (
+            f"BK{uuid.uuid4().hex[:10].upper()}",
+            booking_type,
+            item_id,
+            row[columns.split(", ").index(bookable.destination)],
+            row[DATE],
+            quantity,
+            round(row[PRICE] * quantity, 2),
+            _details(booking_type, row, quantity),
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            key,
+        )
+        self._conn.execute(
+            f"INSERT INTO bookings ({BOOKING_COLUMNS}) VALUES ({', '.join('?' * 10)})",
+            booking,
+        )
+        return _booking(booking), "confirmed"
+
+    def _reject(self, request: BookingRequest, bookable: Bookable) -> None:
+        """Raise the BookingError explaining why the decrement matched no row."""
+
+        booking_type, item_id, quantity, _, expected_price = request
+        current = self._conn.execute(
+            f"SELECT available, price FROM {bookable.table} WHERE id = ?", (item_id,)
+        ).fetchone()
+        if current is None:
+            raise BookingError("unknown_item", f"No {booking_type} with id {item_id}")
+        available, price = current
+        if available is None or price is None:
+            raise BookingError(
+                "not_bookable", f"{item_id} has no dated offer that can be booked"
+            )
+        if available < quantity:
+            left = _units(available, bookable.unit) if available else "none"
+            raise BookingError(
+                "sold_out",
+                f"Not enough availability on {item_id}: "
+                f"{_units(quantity, bookable.unit)} requested, {left} left",
+            )
+        raise BookingError(
+            "price_changed",
+            f"Price of {item_id} is now {price:.2f}, not {expected_price:.2f}; "
+            "confirm the new price before booking",
+        )
+
+    async def book(
+        self,
+        booking_type: str,
+        item_id: str,
+        quantity: int = 1,
+        idempotency_key: Optional[str] = None,
+        expected_price: Optional[float] = None,
+    ) -> TravelBooking:
+        """
+        Reserve `quantity` units of offer `item_id` and record the booking; returns it once
+        committed. Raises BookingError when the offer is unknown, sold out or repriced.
+        A repeated `idempotency_key` returns the original booking (default: a fresh key).
+        """
+
+        if booking_type not in BOOKABLE:
+            raise ValueError(f"Unknown booking type: {booking_type}")
+        if quantity < 1:
+            raise BookingError("invalid", "quantity must be at least 1")
+        request = BookingRequest(
+            booking_type,
+            item_id,
+            quantity,
+            idempotency_key or uuid.uuid4().hex,
+            expected_price,
+        )
+        await self._ensure_open()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        return await future
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **self.counters,
+            "mean_batch": self.counters["batched_bookings"]
+            / max(1, self.counters["commits"]),
+        }
@@ -0,0 +1,239 @@
+"""
+Bulk importer for the flights, hotels and cars inventory tables.
+
+Rows are streamed from CSV (header row required) or JSONL files and inserted with `executemany`
+in large batches inside a single transaction. Secondary indexes and change-tracking triggers on the
+target table are dropped before the load and rebuilt afterwards, which is much faster than
+maintaining them row by row; the table's change counter is bumped once at the end.
+
+`seed_offers` turns rows without a `travel_date` (the committed seed inventory, or loads that
+carry no offer columns) into dated offers: a travel date within `days` from today, a price and
+a capacity, derived from the row id so the same inventory always gets the same offers.
+
+Usage:
+    python -m src.db.loader flights data/flights.csv [--db ...] [--batch-size 50000] [--replace]
+    python -m src.db.loader --seed-offers [--db ...] [--days 42] [--redate]
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import time
+import zlib
+from datetime import date, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.db.migrations import INVENTORY_TABLES, migrate
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per input row from a .csv or .jsonl/.ndjson file."""
+
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported inventory file type: {path}")
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _derived_objects(
+    conn: sqlite3.Connection, table: str
+) -> List[Tuple[str, str, str]]:
+    # Autoindexes (PRIMARY KEY / UNIQUE) have no SQL and cannot be dropped
+    return conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+
+
+def bulk_load(
+    db_path: str,
+    table: str,
+    records: Iterable[Dict[str, Any]],
+    batch_size: int = 50_000,
+    replace: bool = False,
+) -> Dict[str, Any]:
+    """
+    Insert `records` into `table` and rebuild its indexes.
+
+    Records are dicts keyed by column name; columns missing from a record are inserted as NULL
+    and unknown keys are ignored. Returns load statistics including rows per second.
+    """
+
+    if table not in INVENTORY_TABLES:
+        raise ValueError(f"Unknown inventory table: {table}")
+
+    migrate(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    start = time.perf_counter()
+    rows = 0
+    try:
+        # The load is a single transaction; durability is restored when it commits
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")  # 256 MiB
+        columns = table_columns(conn, table)
+        derived = _derived_objects(conn, table)
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        sql = (
+            f"{verb} INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for kind, name, _ in derived:
+                conn.execute(f"DROP {kind.upper()} {name}")
+
+            it = iter(records)
+            while True:
+                batch = [
+                    tuple(record.get(column) for column in columns)
+                    for record in islice(it, batch_size)
+                ]
+                if not batch:
+                    break
+                conn.executemany(sql, batch)
+                rows += len(batch)
+            load_seconds = time.perf_counter() - start
+
+            for _, _, ddl in derived:
+                conn.execute(ddl)
+            conn.execute(
+                "UPDATE inventory_changes SET version = version + 1 WHERE table_name = ?",
+                (table,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute(f"ANALYZE {table}")
+    finally:
+        conn.close()
+
+    total_seconds = time.perf_counter() - start
+    return {
+        "table": table,
+        "rows": rows,
+        "load_seconds": load_seconds,
+        "index_seconds": total_seconds - load_seconds,
+        "total_seconds": total_seconds,
+        "rows_per_second": rows / total_seconds if total_seconds else 0.0,
+    }
+
+
+# table -> (lowest price, price step, price steps, most units per offer)
+OFFER_PRICES: Dict[str, Tuple[float, float, int, int]] = {
+    "flights": (139.99, 15.0, 72, 9),
+    "hotels": (73.0, 4.0, 84, 6),
+    "cars": (28.0, 2.0, 41, 5),
+}
+
+
+def seed_offers(
+    db_path: str,
+    start: Optional[date] = None,
+    days: int = 42,
+    redate: bool = False,
+) -> Dict[str, int]:
+    """
+    Give undated rows (every row with `redate`) a travel date in `[start, start + days)`, a price
+    and availability. Values are derived from a hash of the row id. Returns rows updated per
+    table; empty if the offer columns (schema migration 3) are missing.
+    """
+
+    start = start or date.today()
+    conn = sqlite3.connect(db_path)
+    updated: Dict[str, int] = {}
+    try:
+        for table in INVENTORY_TABLES:
+            if "travel_date" not in table_columns(conn, table):
+                return {}
+            low, step, steps, units = OFFER_PRICES[table]
+            where = "" if redate else " WHERE travel_date IS NULL"
+            offers = []
+            for (row_id,) in conn.execute(f"SELECT id FROM {table}{where}"):
+                h = zlib.crc32(row_id.encode())
+                offers.append(
+                    (
+                        (start + timedelta(days=h % days)).isoformat(),
+                        round(low + step * (h // days % steps), 2),
+                        1 + h // (days * steps) % units,
+                        row_id,
+                    )
+                )
+            conn.executemany(
+                f"UPDATE {table} SET travel_date = ?, price = ?, available = ? WHERE id = ?",
+                offers,
+            )
+            updated[table] = len(offers)
+        conn.commit()
+    finally:
+        conn.close()
+    return updated
+
+
+def load_file(db_path: str, table: str, path: str, **kwargs) -> Dict[str, Any]:
+    """Bulk load a CSV or JSONL file into `table`."""
+
+    return bulk_load(db_path, table, read_records(path), **kwargs)
+
+
+if __name__ == "__main__":
+    from src.config import DB_PATH, DB_SEED_PATH
+    from src.db.pool import ensure_database
+
+    parser = argparse.ArgumentParser(description="Bulk load inventory rows.")
+    parser.add_argument("table", nargs="?", choices=INVENTORY_TABLES)
+    parser.add_argument("path", nargs="?", help="CSV or JSONL file")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument(
+        "--replace", action="store_true", help="Overwrite rows with existing ids"
+    )
+    parser.add_argument(
+        "--seed-offers",
+        action="store_true",
+        help="Date, price and stock undated rows instead of loading a file",
+    )
+    parser.add_argument("--days", type=int, default=42, help="Offer window from today")
+    parser.add_argument(
+        "--redate", action="store_true", help="With --seed-offers: re-seed every row"
+    )
+    args = parser.parse_args()
+    if not args.seed_offers and not (args.table and args.path):
+        parser.error("table and path are required unless --seed-offers is given")
+    if args.db == DB_PATH:
+        # The runtime copy; create it from the seed rather than as an empty database
+        ensure_database(DB_PATH, DB_SEED_PATH)
+
+    if args.seed_offers:
+        migrate(args.db)
+        updated = seed_offers(args.db, days=args.days, redate=args.redate)
+        print(
+            "Seeded offers: "
+            + ", ".join(f"{table} {rows}" for table, rows in updated.items())
+        )
+    else:
+        stats = load_file(
+            args.db,
+            args.table,
+            args.path,
+            batch_size=args.batch_size,
+            replace=args.replace,
+        )
+        print(
+            f"Loaded {stats['rows']} rows into {stats['table']} in {stats['total_seconds']:.2f}s "
+            f"({stats['rows_per_second']:.0f} rows/s; indexes {stats['index_seconds']:.2f}s)"
+        )
@@ -0,0 +1,219 @@
+"""
+Versioned schema migrations for the inventory database.
+
+The applied version is stored in SQLite's `PRAGMA user_version`. Each migration runs in its own
+transaction together with the version bump, so a failed migration leaves the schema untouched.
+
+Usage:
+    python -m src.db.migrations [--db .cache/travel_data.db]
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+INVENTORY_TABLES = ("flights", "hotels", "cars")
+
+# (version, description, statements). Append new migrations; never edit applied ones.
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "covering indexes for the search tool access paths",
+        [
+            # search_flights: WHERE origin_city = ? AND destination_city = ?
+            "CREATE INDEX IF NOT EXISTS idx_flights_route "
+            "ON flights (origin_city, destination_city, id, plane_type)",
+            # search_cars: WHERE pickup_city = ?
+            "CREATE INDEX IF NOT EXISTS idx_cars_pickup "
+            "ON cars (pickup_city, id, make, color)",
+            # search_hotels: WHERE location_city = ?
+            "CREATE INDEX IF NOT EXISTS idx_hotels_location "
+            "ON hotels (location_city, id, name, description)",
+        ],
+    ),
+    (
+        2,
+        "per-table change counters for snapshot invalidation",
+        [
+            "CREATE TABLE IF NOT EXISTS inventory_changes ("
+            "table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)",
+            "INSERT OR IGNORE INTO inventory_changes (table_name) "
+            "VALUES ('flights'), ('hotels'), ('cars')",
+        ]
+        + [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()} "
+            f"AFTER {event} ON {table} BEGIN "
+            f"UPDATE inventory_changes SET version = version + 1 WHERE table_name = '{table}'; "
+            "END"
+            for table in INVENTORY_TABLES
+            for event in ("INSERT", "UPDATE", "DELETE")
+        ],
+    ),
+    (
+        3,
+        "dated, priced offers with availability and range-scan indexes",
+        [
+            f"ALTER TABLE {table} ADD COLUMN {column}"
+            for table in INVENTORY_TABLES
+            for column in ("travel_date TEXT", "price REAL", "available INTEGER")
+        ]
+        + [
+            # Date-window / budget / cheapest-k searches: equality on the search key, range on
+            # travel_date; price and availability are read from the index entries
+            "CREATE INDEX IF NOT EXISTS idx_flights_route_date "
+            "ON flights (origin_city, destination_city, travel_date, price, available, id, plane_type)",
+            "CREATE INDEX IF NOT EXISTS idx_cars_pickup_date "
+            "ON cars (pickup_city, travel_date, price, available, id, make, color)",
+            "CREATE INDEX IF NOT EXISTS idx_hotels_location_date "
+            "ON hotels (location_city, travel_date, price, available, id, name, description)",
+        ],
+    ),
+    (
+        4,
+        "booking records with idempotency keys and an oversell guard",
+        [
+            "CREATE TABLE IF NOT EXISTS bookings ("
+            "booking_id TEXT PRIMARY KEY, "
+            "idempotency_key TEXT NOT NULL UNIQUE, "
+            "booking_type TEXT NOT NULL, "
+            "item_id TEXT NOT NULL, "
+            "destination TEXT NOT NULL, "
+            "travel_date TEXT, "
+            "quantity INTEGER NOT NULL CHECK (quantity > 0), "
+            "price REAL NOT NULL, "
+            "details TEXT NOT NULL, "
+            "created_at TEXT NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_bookings_item ON bookings (booking_type, item_id)",
+        ]
+        + [
+            # Last line of defence: no write may take availability below zero
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_oversell "
+            f"BEFORE UPDATE OF available ON {table} "
+            "WHEN NEW.available < 0 BEGIN SELECT RAISE(ABORT, 'oversold'); END"
+            for table in INVENTORY_TABLES
+        ],
+    ),
+    (
+        5,
+        "change counters ignore availability-only updates",
+        [f"DROP TRIGGER IF EXISTS trg_{table}_update" for table in INVENTORY_TABLES]
+        + [
+            # A booking only decrements `available`; it must not invalidate whole-table
+            # snapshots and cached model responses. Bookings update snapshot rows directly.
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_update "
+            f"AFTER UPDATE OF {columns} ON {table} BEGIN "
+            f"UPDATE inventory_changes SET version = version + 1 WHERE table_name = '{table}'; "
+            "END"
+            for table, columns in (
+                (
+                    "flights",
+                    "id, origin_city, destination_city, plane_type, travel_date, price",
+                ),
+                ("hotels", "id, location_city, name, description, travel_date, price"),
+                ("cars", "id, pickup_city, make, color, travel_date, price"),
+            )
+        ],
+    ),
+    (
+        6,
+        "drop the route and city indexes the dated covering indexes replace",
+        [
+            # Every idx_*_date index from migration 3 starts with the same key columns and covers
+            # the same selected columns, so it serves the undated lookups too
+            "DROP INDEX IF EXISTS idx_flights_route",
+            "DROP INDEX IF EXISTS idx_cars_pickup",
+            "DROP INDEX IF EXISTS idx_hotels_location",
+        ],
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# Read-only connections kept open by inventory_version, by database path
+_version_conns: Dict[str, sqlite3.Connection] = {}
+_version_lock = threading.Lock()
+
+
+def inventory_version(db_path: str) -> str:
+    """
+    Fingerprint of the inventory contents built from the per-table change counters.
+    Changes whenever any flights, hotels or cars row is written, except for availability-only
+    updates (bookings; schema migration 5). Empty if the database or the counters are missing.
+    """
+
+    with _version_lock:
+        conn = _version_conns.get(db_path)
+        if conn is None:
+            if not os.path.exists(db_path):
+                return ""
+            conn = sqlite3.connect(
+                f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+            _version_conns[db_path] = conn
+        try:
+            rows = conn.execute(
+                "SELECT table_name, version FROM inventory_changes ORDER BY table_name"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # Not migrated yet, or the file is gone: reconnect on the next call
+            conn.close()
+            del _version_conns[db_path]
+            return ""
+    return ",".join(f"{table}:{version}" for table, version in rows)
+
+
+def migrate(db_path: str, target: int = LATEST_VERSION) -> List[int]:
+    """
+    Apply all pending migrations up to `target`.
+    Returns the versions that were applied (empty if the schema was already current).
+    """
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    applied = []
+    try:
+        version = current_version(conn)
+        for number, _, statements in MIGRATIONS:
+            if number <= version or number > target:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA does not accept bound parameters
+                conn.execute(f"PRAGMA user_version = {int(number)}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(number)
+        if applied:
+            conn.execute("ANALYZE")
+        return applied
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    from src.config import DB_PATH, DB_SEED_PATH
+    from src.db.pool import ensure_database
+
+    parser = argparse.ArgumentParser(description="Apply inventory schema migrations.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--target", type=int, default=LATEST_VERSION)
+    args = parser.parse_args()
+    if args.db == DB_PATH:
+        # The runtime copy; create it from the seed rather than as an empty database
+        ensure_database(DB_PATH, DB_SEED_PATH)
+
+    applied = migrate(args.db, args.target)
+    if applied:
+        print(f"Applied migrations: {', '.join(map(str, applied))}")
+    else:
+        print("No pending migrations")
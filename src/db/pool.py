@@ -0,0 +1,193 @@
+"""
+Shared pool of long-lived, read-only SQLite connections for the inventory search tools.
+
+Opening an aiosqlite connection starts a worker thread, opens the file and parses the schema.
+The pool pays that cost once per connection and reuses the connections across tool calls.
+sqlite3 keeps a per-connection cache of prepared statements, so the fixed SQL issued by the
+tools is compiled once per connection instead of once per call.
+
+aiosqlite worker threads are not daemon threads, so the interpreter cannot exit while a
+connection is open. Close the pool (`await pool.close()` or `async with pool:`) on shutdown; as a
+fallback the pool closes its connections when its event loop shuts down, since `asyncio.run`
+cancels the pending tasks (including the pool's watcher) before it closes the loop.
+"""
+
+import asyncio
+import os
+import shutil
+import sqlite3
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, List, Optional
+
+import aiosqlite
+
+from src.db.loader import seed_offers
+from src.db.migrations import migrate
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+def ensure_wal(db_path: str) -> str:
+    """
+    Switch the database to WAL journaling so readers never block on writers.
+    The journal mode is persistent, so this is a no-op after the first call.
+    Returns the resulting journal mode.
+    """
+
+    conn = sqlite3.connect(db_path)
+    mode = "unknown"
+    try:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.lower() != "wal":
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        return mode
+    except sqlite3.OperationalError:
+        # Read-only filesystem: keep the existing journal mode
+        return mode
+    finally:
+        conn.close()
+
+
+def prepare_database(db_path: str, auto_migrate: bool = True) -> None:
+    """Enable WAL and, optionally, apply pending schema migrations before the first read."""
+
+    ensure_wal(db_path)
+    if auto_migrate:
+        try:
+            migrate(db_path)
+        except sqlite3.OperationalError:
+            # Read-only deployment: serve the schema as shipped
+            pass
+
+
+def ensure_database(db_path: str, seed_path: str, auto_migrate: bool = True) -> bool:
+    """
+    Create `db_path` from `seed_path` if it does not exist; returns whether it was created.
+
+    The copy is prepared (WAL, migrations, offers dated from today) under a temporary name and
+    then published with a hard link, which fails if another process got there first, so readers never see a
+    half-prepared database and the seed itself is never written.
+    """
+
+    if os.path.exists(db_path):
+        return False
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    staging = f"{db_path}.{os.getpid()}.tmp"
+    try:
+        shutil.copyfile(seed_path, staging)
+        prepare_database(staging, auto_migrate)
+        seed_offers(staging)
+        try:
+            os.link(staging, db_path)
+        except FileExistsError:
+            return False
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(staging + suffix):
+                os.remove(staging + suffix)
+    return True
+
+
+class ConnectionPool:
+    """
+    Bounded pool of read-only aiosqlite connections.
+
+    Connections are opened lazily, up to `size`, and handed out one caller at a time.
+    The pool is bound to the running event loop; if it is used from a new loop
+    (e.g. a second `asyncio.run`) the stale connections are stopped and reopened.
+    A watcher task on the bound loop closes the connections when the loop cancels it at shutdown.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, auto_migrate: bool = True):
+        self.db_path = db_path
+        self.size = size
+        self.auto_migrate = auto_migrate
+        self._idle: List[aiosqlite.Connection] = []
+        self._all: List[aiosqlite.Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._prepared = False
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._stop_all()
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.size)
+            self._watcher = loop.create_task(self._close_on_shutdown())
+
+    async def _close_on_shutdown(self) -> None:
+        # Waits until cancelled: by close(), or by asyncio.run cancelling pending tasks at exit
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if self._watcher is asyncio.current_task():
+                self._watcher = None
+                await self._close_connections()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        if not self._prepared:
+            prepare_database(self.db_path, self.auto_migrate)
+            self._prepared = True
+
+        conn = await aiosqlite.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        await conn.execute("PRAGMA query_only = ON")
+        self._all.append(conn)
+        return conn
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection for the duration of the block."""
+
+        self._bind_loop()
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield conn
+            finally:
+                if conn in self._all:
+                    self._idle.append(conn)
+
+    async def fetchall(
+        self, sql: str, parameters: Iterable[Any] = ()
+    ) -> List[sqlite3.Row]:
+        """Run a read query on a pooled connection and return all rows."""
+
+        async with self.acquire() as conn:
+            return list(await conn.execute_fetchall(sql, parameters))
+
+    def _stop_all(self) -> None:
+        # Synchronous stop: safe to call without a running loop
+        for conn in self._all:
+            conn.stop()
+        self._all.clear()
+        self._idle.clear()
+
+    async def close(self) -> None:
+        """Close every pooled connection. The pool reopens connections on next use."""
+
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.cancel()
+        await self._close_connections()
+
+    async def _close_connections(self) -> None:
+        conns, self._all, self._idle = self._all, [], []
+        for conn in conns:
+            await conn.close()
+        self._loop = None
+        self._slots = None
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
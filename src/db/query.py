@@ -0,0 +1,182 @@
+"""
+Inventory search queries: key lookups plus date-window, budget and cheapest-k filters.
+
+Since schema migration 3 every inventory row is an offer for one `travel_date` (departure day,
+hotel night, rental day) with a `price` and `available` capacity. `inventory_query` builds the
+SQL for one search key. With a `SearchFilter` it constrains the key columns by equality and
+`travel_date` by range, which is exactly the prefix of the table's
+`(key..., travel_date, price, available, ...)` covering index: SQLite reads only the index entries
+inside the date window, checks budget and availability on them without touching the table, and
+with `cheapest=k` keeps a k-row sorter instead of ordering every match.
+
+`filter_rows` applies the same filter to rows already in memory (inventory snapshot, prefetched
+lookups), so every access path returns the same offers in the same order.
+"""
+
+import heapq
+from datetime import date
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+# Positions of the offer columns in every inventory row, after id, key and descriptive columns
+DATE, PRICE, AVAILABLE = 4, 5, 6
+
+# table -> (selected columns, key columns); rows are shaped like the snapshot's
+TABLES = {
+    "flights": (
+        "id, origin_city, destination_city, plane_type, travel_date, price, available",
+        ("origin_city", "destination_city"),
+    ),
+    "cars": (
+        "id, pickup_city, make, color, travel_date, price, available",
+        ("pickup_city",),
+    ),
+    "hotels": (
+        "id, location_city, name, description, travel_date, price, available",
+        ("location_city",),
+    ),
+}
+
+
+class SearchFilter(NamedTuple):
+    # Inclusive ISO dates (YYYY-MM-DD)
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    max_price: Optional[float] = None
+    # Keep only the k cheapest offers
+    cheapest: Optional[int] = None
+
+    @property
+    def active(self) -> bool:
+        return any(value is not None for value in self)
+
+
+NO_FILTER = SearchFilter()
+
+
+def search_filter(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    max_price: Optional[float] = None,
+    cheapest: Optional[int] = None,
+) -> SearchFilter:
+    """Validated filter from tool arguments; raises ValueError with a message for the model."""
+
+    for name, value in (("date_from", date_from), ("date_to", date_to)):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"{name} must be a YYYY-MM-DD date, got {value!r}")
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise ValueError(f"date_from {date_from} is after date_to {date_to}")
+    if max_price is not None and max_price < 0:
+        raise ValueError("max_price must not be negative")
+    if cheapest is not None and cheapest < 1:
+        raise ValueError("cheapest must be at least 1")
+    return SearchFilter(date_from, date_to, max_price, cheapest)
+
+
+def filter_conditions(search: SearchFilter) -> Tuple[List[str], List[Any]]:
+    """WHERE conditions and parameters for an active filter, to AND with the key columns."""
+
+    where: List[str] = []
+    params: List[Any] = []
+    # Range on travel_date (IS NOT NULL is an open range), then checks on the index entries
+    if search.date_from is not None:
+        where.append("travel_date >= ?")
+        params.append(search.date_from)
+    if search.date_to is not None:
+        where.append("travel_date <= ?")
+        params.append(search.date_to)
+    if search.date_from is None and search.date_to is None:
+        where.append("travel_date IS NOT NULL")
+    if search.max_price is not None:
+        where.append("price <= ?")
+        params.append(search.max_price)
+    else:
+        where.append("price IS NOT NULL")
+    where.append("available > 0")
+    return where, params
+
+
+def inventory_query(
+    table: str, keys: Sequence[Any], search: SearchFilter = NO_FILTER
+) -> Tuple[str, List[Any]]:
+    """SQL and parameters for the offers under one search key (a route or a city)."""
+
+    columns, key_columns = TABLES[table]
+    where = [f"{column} = ?" for column in key_columns]
+    params = list(keys)
+    if not search.active:
+        # A stable order, so offset pages neither repeat nor skip rows
+        return (
+            f"SELECT {columns} FROM {table} WHERE {' AND '.join(where)} ORDER BY id",
+            params,
+        )
+
+    conditions, filter_params = filter_conditions(search)
+    where += conditions
+    params += filter_params
+    sql = (
+        f"SELECT {columns} FROM {table} WHERE {' AND '.join(where)} "
+        "ORDER BY price, travel_date, id"
+    )
+    if search.cheapest is not None:
+        sql += " LIMIT ?"
+        params.append(search.cheapest)
+    return sql, params
+
+
+def trip_query(
+    origin: str, destination: str, search: SearchFilter
+) -> Tuple[str, List[Any]]:
+    """
+    One UNION ALL query for a trip: flights on the route plus hotels and cars at the
+    destination, each branch filtered by `search` (only bookable offers, even when it sets no
+    bounds). Rows start with the table name and are ordered like `filter_rows` orders them.
+    """
+
+    conditions, filter_params = filter_conditions(search)
+    branches, params = [], []
+    for table, keys in (
+        ("flights", (origin, destination)),
+        ("hotels", (destination,)),
+        ("cars", (destination,)),
+    ):
+        columns, key_columns = TABLES[table]
+        where = [f"{column} = ?" for column in key_columns] + conditions
+        branch = f"SELECT '{table}', {columns} FROM {table} WHERE {' AND '.join(where)}"
+        params += [*keys, *filter_params]
+        if search.cheapest is not None:
+            branch = f"SELECT * FROM ({branch} ORDER BY price, travel_date, id LIMIT ?)"
+            params.append(search.cheapest)
+        branches.append(branch)
+    # Price, travel_date, id: the row columns shift by one after the table name
+    sql = " UNION ALL ".join(branches) + " ORDER BY 7, 6, 2"
+    return sql, params
+
+
+def _matches(row: Sequence[Any], search: SearchFilter) -> bool:
+    travel_date, price, available = row[DATE], row[PRICE], row[AVAILABLE]
+    if travel_date is None or price is None or (available or 0) <= 0:
+        return False
+    if search.date_from is not None and travel_date < search.date_from:
+        return False
+    if search.date_to is not None and travel_date > search.date_to:
+        return False
+    return search.max_price is None or price <= search.max_price
+
+
+def _price_order(row: Sequence[Any]) -> Tuple[Any, ...]:
+    return (row[PRICE], row[DATE], row[0])
+
+
+def filter_rows(rows: Sequence[Sequence[Any]], search: SearchFilter) -> List[Any]:
+    """`inventory_query`'s filter and order applied to in-memory rows of one search key."""
+
+    if not search.active:
+        return sorted(rows, key=lambda row: row[0])
+    matches = [row for row in rows if _matches(row, search)]
+    if search.cheapest is not None:
+        return heapq.nsmallest(search.cheapest, matches, key=_price_order)
+    return sorted(matches, key=_price_order)
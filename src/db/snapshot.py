@@ -0,0 +1,214 @@
+"""
+In-process snapshot of the inventory tables for lookups without a database round-trip.
+
+Each table is held as a dict from its search key (route or city) to a list of row tuples shaped
+exactly like the rows the search tools read from SQLite. Lookups are plain dict reads.
+
+Freshness is checked in the background at most once per `refresh_interval`: the database file
+signature (inode, mtime) and `PRAGMA data_version` tell whether anything was committed, and the
+per-table counters in `inventory_changes` (schema migration 2) tell which tables to reload.
+Only changed tables are re-read; readers keep using the previous dict until the new one is swapped in.
+Availability-only updates (bookings) do not move the counters (schema migration 5); a booking
+made in this process re-reads just the booked row with `refresh_row`.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.db.migrations import INVENTORY_TABLES
+from src.db.pool import prepare_database
+from src.db.query import TABLES
+
+logger = logging.getLogger(__name__)
+
+# table -> (query, positions of the key columns in each row)
+TABLE_QUERIES: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "flights": (f"SELECT {TABLES['flights'][0]} FROM flights ORDER BY id", (1, 2)),
+    "cars": (f"SELECT {TABLES['cars'][0]} FROM cars ORDER BY id", (1,)),
+    "hotels": (f"SELECT {TABLES['hotels'][0]} FROM hotels ORDER BY id", (1,)),
+}
+
+
+class InventorySnapshot:
+    """
+    Read-mostly in-memory copy of the flights, hotels and cars tables.
+
+    Keys are `(origin_city, destination_city)` for flights and the city name for hotels and cars.
+    """
+
+    def __init__(
+        self, db_path: str, refresh_interval: float = 1.0, auto_migrate: bool = True
+    ):
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.auto_migrate = auto_migrate
+        self.reloads: Dict[str, int] = {table: 0 for table in INVENTORY_TABLES}
+        self._tables: Dict[str, Dict[Any, List[tuple]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._data_version: Optional[int] = None
+        self._signature: Optional[Tuple[int, ...]] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._refresh: Optional[asyncio.Future] = None
+
+    def _file_signature(self) -> Tuple[int, ...]:
+        st = os.stat(self.db_path)
+        return (st.st_dev, st.st_ino, st.st_mtime_ns)
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            self._conn.close()
+        prepare_database(self.db_path, self.auto_migrate)
+        self._conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        return self._conn
+
+    def _read_versions(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        try:
+            return dict(
+                conn.execute("SELECT table_name, version FROM inventory_changes")
+            )
+        except sqlite3.OperationalError:
+            # Unmigrated database: no per-table counters, every change reloads everything
+            return {}
+
+    def _load_table(
+        self, conn: sqlite3.Connection, table: str
+    ) -> Dict[Any, List[tuple]]:
+        sql, key_columns = TABLE_QUERIES[table]
+        index: Dict[Any, List[tuple]] = {}
+        for row in conn.execute(sql):
+            # Cities repeat across many rows; intern them so rows and keys share one object
+            row = tuple(
+                sys.intern(value) if i in key_columns else value
+                for i, value in enumerate(row)
+            )
+            if len(key_columns) == 1:
+                key = row[key_columns[0]]
+            else:
+                key = tuple(row[i] for i in key_columns)
+            bucket = index.get(key)
+            if bucket is None:
+                index[key] = [row]
+            else:
+                bucket.append(row)
+        return index
+
+    def check(self) -> List[str]:
+        """Reload any tables that changed since the last check. Returns the reloaded tables."""
+
+        with self._lock:
+            signature = self._file_signature()
+            reopened = (
+                self._conn is None
+                or self._signature is None
+                or signature[:2] != self._signature[:2]
+            )
+            conn = self._open() if reopened else self._conn
+
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if (
+                not reopened
+                and signature == self._signature
+                and data_version == self._data_version
+            ):
+                return []
+
+            conn.execute("BEGIN")
+            try:
+                versions = self._read_versions(conn)
+                stale = [
+                    table
+                    for table in INVENTORY_TABLES
+                    if reopened
+                    or not versions
+                    or versions.get(table) != self._versions.get(table)
+                ]
+                for table in stale:
+                    self._tables[table] = self._load_table(conn, table)
+                    self.reloads[table] += 1
+            finally:
+                conn.execute("COMMIT")
+
+            self._versions = versions
+            self._data_version = data_version
+            self._signature = signature
+            return stale
+
+    def refresh_row(self, table: str, row_id: str) -> None:
+        """Re-read one row, e.g. after a booking changed its availability."""
+
+        with self._lock:
+            index = self._tables.get(table)
+            if index is None or self._conn is None:
+                return
+            sql, key_columns = TABLE_QUERIES[table]
+            row = self._conn.execute(
+                sql.replace(" ORDER BY id", " WHERE id = ?"), (row_id,)
+            ).fetchone()
+            if row is None:
+                return
+            key = (
+                row[key_columns[0]]
+                if len(key_columns) == 1
+                else tuple(row[i] for i in key_columns)
+            )
+            # Readers may hold the old bucket; swap in a new list instead of editing it
+            index[key] = [
+                row if old[0] == row_id else old for old in index.get(key, [])
+            ]
+
+    def _background_check(self) -> None:
+        try:
+            reloaded = self.check()
+            if reloaded:
+                logger.info("Inventory snapshot reloaded: %s", ", ".join(reloaded))
+        except Exception:
+            logger.exception(
+                "Inventory snapshot refresh failed; serving previous snapshot"
+            )
+
+    async def lookup(self, table: str, key: Any) -> List[tuple]:
+        """Return the rows stored under `key`, loading the snapshot on first use."""
+
+        if not self._tables:
+            await asyncio.to_thread(self.check)
+            self._next_check = time.monotonic() + self.refresh_interval
+        elif time.monotonic() >= self._next_check and (
+            self._refresh is None or self._refresh.done()
+        ):
+            self._next_check = time.monotonic() + self.refresh_interval
+            self._refresh = asyncio.get_running_loop().run_in_executor(
+                None, self._background_check
+            )
+        return self._tables[table].get(key, [])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": {
+                table: sum(len(rows) for rows in index.values())
+                for table, index in self._tables.items()
+            },
+            "keys": {table: len(index) for table, index in self._tables.items()},
+            "reloads": dict(self.reloads),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._tables = {}
+            self._versions = {}
+            self._signature = None
@@ -0,0 +1,184 @@
+"""
+Request deadlines and hedged model calls.
+
+A request deadline is an absolute `time.time()` stored in `config["configurable"]["deadline"]`
+(set it with `with_deadline`). LangGraph passes the configurable section to every node and
+subgraph, and `ainvoke_model` reads it from the current runnable config, so one deadline bounds
+the supervisor, every subagent and every model call of the request. Work still running at the
+deadline is cancelled and raises `DeadlineExceeded`.
+
+`invoke_with_budget` runs a subagent graph for at most a given number of seconds and returns
+the state it had reached, so the supervisor can report partial results instead of waiting.
+
+With hedging on, a model call that has not answered after the p95 latency of its recent calls
+gets a duplicate request; the first answer wins and the other request is cancelled.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ensure_config, merge_configs
+
+from src.metrics import LatencyRecorder
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request deadline passed before the work finished."""
+
+
+def with_deadline(config: Optional[RunnableConfig], seconds: float) -> RunnableConfig:
+    """Return `config` with a deadline `seconds` from now (the earlier one if already set)."""
+
+    deadline = time.time() + seconds
+    existing = (config or {}).get("configurable", {}).get("deadline")
+    if existing is not None:
+        deadline = min(deadline, existing)
+    return merge_configs(config, {"configurable": {"deadline": deadline}})
+
+
+def current_deadline(config: Optional[RunnableConfig] = None) -> Optional[float]:
+    """Deadline of `config`, or of the runnable config of the running node."""
+
+    config = config if config is not None else ensure_config()
+    return config.get("configurable", {}).get("deadline")
+
+
+def remaining(config: Optional[RunnableConfig] = None) -> Optional[float]:
+    """Seconds left before the deadline (may be negative), or None without a deadline."""
+
+    deadline = current_deadline(config)
+    return None if deadline is None else deadline - time.time()
+
+
+async def within_deadline(
+    awaitable: Awaitable[Any], config: Optional[RunnableConfig] = None
+) -> Any:
+    """Await `awaitable`, cancelling it and raising `DeadlineExceeded` at the deadline."""
+
+    left = remaining(config)
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("request deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded("request deadline exceeded") from e
+
+
+async def invoke_with_budget(
+    graph: Any,
+    input: Dict[str, Any],
+    config: Optional[RunnableConfig],
+    budget: Optional[float],
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Run `graph` on `input` for at most `budget` seconds (no limit if None).
+    Returns the last state the graph reached and whether it was cut off.
+    """
+
+    latest: Dict[str, Any] = input
+
+    async def consume():
+        nonlocal latest
+        async for values in graph.astream(input, config, stream_mode="values"):
+            latest = values
+
+    if budget is None:
+        await consume()
+        return latest, False
+    if budget <= 0:
+        return latest, True
+    try:
+        await asyncio.wait_for(consume(), budget)
+    except asyncio.TimeoutError:
+        # Includes DeadlineExceeded raised by a model call inside the graph
+        return latest, True
+    return latest, False
+
+
+class Hedger:
+    """
+    Sends a backup request when a call runs longer than the p95 of recent calls with the same key.
+    Hedging starts once a key has `min_samples` latencies.
+
+    Only the primary request's latency is recorded. When the backup wins, the primary is
+    cancelled and counts with the time it had run, a lower bound that is never below the hedge
+    delay. The share of samples at or above the delay is then the share of primaries that take
+    that long, whether they were hedged or not, so the delay stays at the primaries' p95
+    instead of drifting down to the backups' latency as hedging wins more races.
+    """
+
+    def __init__(self, min_samples: int = 20, quantile: float = 0.95):
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.latency = LatencyRecorder(max_samples=1000)
+        self.counters: Dict[str, int] = {"calls": 0, "hedged": 0, "backup_won": 0}
+
+    def delay(self, key: str) -> Optional[float]:
+        samples = self.latency.samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+    async def run(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[Any]],
+        backup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Run `primary`; after the hedge delay also run `backup`. Returns the first result."""
+
+        self.counters["calls"] += 1
+        start = time.perf_counter()
+        delay = self.delay(key)
+        first = asyncio.ensure_future(primary())
+        finished: List[float] = []
+        first.add_done_callback(lambda _: finished.append(time.perf_counter()))
+        tasks = {first}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.counters["hedged"] += 1
+                    tasks.add(asyncio.ensure_future(backup()))
+            while True:
+                done, pending = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = next(
+                    (t for t in done if not t.cancelled() and t.exception() is None),
+                    None,
+                )
+                if winner is not None or not pending:
+                    break
+                # One request failed; keep waiting for the other
+                tasks = pending
+            if winner is first:
+                self.latency.record(key, finished[0] - start)
+            elif not first.done():
+                # Cancelled below; it would have taken at least this long
+                self.latency.record(key, time.perf_counter() - start)
+            # A failed primary says nothing about how long an answer takes
+            if winner is not None and winner is not first:
+                self.counters["backup_won"] += 1
+            return (winner or next(iter(done))).result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "delay_ms": {
+                key: self.delay(key) * 1000
+                for key in self.latency.samples
+                if self.delay(key) is not None
+            },
+        }
@@ -0,0 +1,86 @@
+"""
+Compact, model-facing encoding of search results.
+
+Search tools used to return `str(list_of_dicts)`, repeating every key on every row and sending the
+full result set to the model. Results are now rendered as a header row plus one delimited line per
+row (or compact JSON with a single column list), capped at `limit` rows with a "more available"
+cursor, optionally projected to a subset of fields.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config import RESULT_FORMAT, RESULT_TOP_K
+
+
+def _cell(value: Any) -> str:
+    # Keep one row per line and the delimiter unambiguous
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def project(
+    rows: Sequence[Dict[str, Any]], fields: Optional[Sequence[str]]
+) -> List[str]:
+    """Columns to emit: the requested fields that exist, in request order (all columns if none match)."""
+
+    columns = list(rows[0].keys()) if rows else []
+    if fields:
+        selected = [field for field in fields if field in columns]
+        if selected:
+            return selected
+    return columns
+
+
+def page_bounds(total: int, offset: int, limit: int = RESULT_TOP_K) -> Optional[int]:
+    """Next page offset, or None when the page starting at `offset` is the last one."""
+
+    end = max(0, offset) + limit
+    return end if end < total else None
+
+
+def encode_results(
+    rows: Sequence[Dict[str, Any]],
+    fields: Optional[Sequence[str]] = None,
+    offset: int = 0,
+    limit: int = RESULT_TOP_K,
+    fmt: str = RESULT_FORMAT,
+    noun: str = "results",
+    more_hint: str = "call again with offset={next_offset}",
+) -> str:
+    """
+    Render one page of `rows` for the model, in the order given (the inventory queries sort).
+
+    The footer tells the model how many rows exist in total and, through `more_hint`, how to
+    fetch the next page.
+    """
+
+    total = len(rows)
+    if total == 0:
+        return f"No {noun} found."
+    offset = max(0, offset)
+    page = rows[offset : offset + limit]
+    columns = project(rows, fields)
+    next_offset = page_bounds(total, offset, limit)
+
+    if fmt == "json":
+        return json.dumps(
+            {
+                "columns": columns,
+                "rows": [[row[c] for c in columns] for row in page],
+                "total": total,
+                "next_offset": next_offset,
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+
+    if not page:
+        return f"No {noun} at offset {offset}; {total} in total."
+
+    lines = ["|".join(columns)]
+    lines.extend("|".join(_cell(row[c]) for c in columns) for row in page)
+    footer = f"({noun} {offset + 1}-{offset + len(page)} of {total}"
+    if next_offset is not None:
+        footer += "; more available: " + more_hint.format(next_offset=next_offset)
+    lines.append(footer + ")")
+    return "\n".join(lines)
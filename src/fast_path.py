@@ -0,0 +1,94 @@
+"""
+Deterministic fast path for `BookFlight` delegations.
+
+When the supervisor already supplies `origin` and `destination` and the instruction carries no
+preference that needs the flight agent's judgement, the flight agent's ReAct loop would only
+call `search_flights` and list the results. The fast path queries the inventory directly and
+renders the same first page (the top `TRAVEL_RESULT_TOP_K` offers still available, with date,
+fare and seats left, in the search tools' encoding) from a template, saving two model calls.
+Dates, budgets and "cheapest" need a filtered search, and further pages need `offset`, so
+instructions mentioning them fall back to the subagent, as does anything else.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from src.encoding import encode_results
+from src.metrics import LatencyRecorder
+from src.tools import find_flights
+
+# Instructions mentioning any of these need the subagent to reason over the options
+_PREFERENCE_PATTERN = re.compile(
+    r"\$|\b("
+    r"cheap\w*|price\w*|cost\w*|budget|fare\w*|under|below|usd|eur"
+    r"|business|first|economy|premium|class|seat\w*|aisle|window|legroom"
+    r"|direct|non-?stop|layover\w*|connect\w*|airline\w*|carrier"
+    r"|boeing|airbus|embraer|bombardier|\d{3}|a3\d\d|fl\d+"
+    r"|prefer\w*|rather|instead|avoid|only|must|specific|that one|this one"
+    r"|morning|afternoon|evening|night|red-?eye|earliest|latest|fastest|shortest"
+    # Dates and date windows: the subagent turns them into date_from / date_to
+    r"|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?|\d{1,2}(?:st|nd|rd|th)"
+    r"|jan(?:uary)?|feb(?:ruary)?|march|apr(?:il)?|may \d+|june?|july?|aug(?:ust)?"
+    r"|sep(?:t|tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+    r"|(?:mon|tues|wednes|thurs|fri|satur|sun)days?"
+    r"|today|tonight|tomorrow|next|week\w*|month\w*|days?|dates?|between|until"
+    # Further pages: the subagent pages with offset
+    r"|more|others?|rest|remaining" r")\b",
+    re.IGNORECASE,
+)
+
+
+def needs_reasoning(instruction: Optional[str]) -> bool:
+    """True if the instruction expresses a preference or selection the template cannot honor."""
+
+    return bool(instruction) and bool(_PREFERENCE_PATTERN.search(instruction))
+
+
+# Columns of the rendered table: what search_flights returns, plus seats left
+FLIGHT_FIELDS = ["flight_id", "plane_type", "travel_date", "price", "available"]
+
+
+def render_flights(origin: str, destination: str, flights: List[dict]) -> str:
+    """First page of `flights`, capped at RESULT_TOP_K rows like the search tools."""
+
+    table = encode_results(
+        flights,
+        FLIGHT_FIELDS,
+        noun="flights",
+        more_hint="delegate BookFlight again asking for more flights",
+    )
+    return "\n".join(
+        [
+            f"Flights from {origin} to {destination}:",
+            table,
+            "Which flight would you like to book?",
+        ]
+    )
+
+
+async def flight_fast_path(args: Dict[str, Any]) -> Optional[str]:
+    """
+    Answer a `BookFlight` call without the flight agent when the structured arguments suffice.
+    Returns None when the call should go to the subagent.
+    """
+
+    origin, destination = args.get("origin"), args.get("destination")
+    if not origin or not destination or needs_reasoning(args.get("instruction")):
+        return None
+
+    # Sold-out offers cannot be booked; undated rows (available is None) are listed as before
+    flights = [
+        flight
+        for flight in await find_flights(origin, destination)
+        if flight["available"] is None or flight["available"] > 0
+    ]
+    if not flights:
+        # Let the agent explain the miss or look for alternatives
+        return None
+    return render_flights(
+        flights[0]["origin_city"], flights[0]["destination_city"], flights
+    )
+
+
+# BookFlight end-to-end latency by path ("fast_path" / "subagent")
+book_flight_latency = LatencyRecorder()
@@ -1,32 +1,100 @@
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
-from src.model import model
-from src.subagents.flight_booking import flight_booking_agent
-from src.subagents.hotel_booking import hotel_booking_agent
-from src.subagents.car_rental import car_rental_agent
+from src.model import get_model, ainvoke_model, node_model
 from src.state import TravelPlannerState
 from src.prompts import SUPERVISOR_PROMPT
-from src.tools import (
-    BookFlight,
-    BookHotel,
-    RentCar,
+from src.config import (
+    FLIGHT_FAST_PATH,
+    SUBAGENT_COALESCE,
+    SUBAGENT_TIMEOUT_SECONDS,
+    DEADLINE_RESERVE_SECONDS,
+    HISTORY_TOKEN_BUDGET,
+    HISTORY_KEEP_TURNS,
+    HISTORY_TOOL_DIGEST_CHARS,
 )
-from typing import Literal
+from src.compaction import compact_history, record_turn, summary_message
+from src.fast_path import flight_fast_path, book_flight_latency
+from src.streaming import emit_progress, subagent_config
+from src.metrics import instrument_node
+from src.scheduler import PRIORITY_INTERACTIVE
+from src.deadlines import invoke_with_budget, remaining, with_deadline
+from src.singleflight import SingleFlight
+from src.subagents import SUBAGENTS, subagent_for_tool, subagent_graph
+from src.tools import cancel_prefetch, prefetch_destinations, search_trip
+from typing import Literal, Optional
 from langchain_core.messages import SystemMessage, ToolMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 import asyncio
-
+import functools
+import time
 
 """
 Supervisor binds Pydantic schema tools. 
 These will be used to invoke the subagents as tools and pass an explicit instruction to the subagent as a HumanMessage.
+It also binds `search_trip`, which it runs itself to answer simple complete-trip requests in one query.
 """
-supervisor_tools = [BookFlight, BookHotel, RentCar]
-model_with_tools = model.bind_tools(supervisor_tools)
+# Search tools the supervisor runs itself, without a subagent
+supervisor_direct_tools = {search_trip.name: search_trip}
+supervisor_tools = [
+    *(spec.schema for spec in SUBAGENTS.values()),
+    *supervisor_direct_tools.values(),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def supervisor_model():
+    """Supervisor model with the delegate tools bound, built on the first supervisor turn."""
+
+    return get_model(node_model("supervisor")).bind_tools(supervisor_tools)
+
+
+# Subagent behind each delegate tool, by tool name; benchmarks/bench_graph.py uses it to run each
+# subagent on its own. Streamed output is labelled from the `subagent` metadata of subagent_config.
+subagent_names = {spec.schema.__name__: name for name, spec in SUBAGENTS.items()}
+
+# Identical concurrent delegations (same thread, agent and scoped request) share one subagent run;
+# never across threads, since a run may book on behalf of the thread that started it
+subagent_flight = SingleFlight("subagent") if SUBAGENT_COALESCE else None
+
+
+def lazy_subagent_node(agent: str):
+    """Top-level graph node that runs `agent`; the shared subagent graph compiles on first use."""
+
+    async def run(state: TravelPlannerState, config: RunnableConfig):
+        return await subagent_graph(agent).ainvoke(state, config)
+
+    run.__name__ = agent
+    return run
+
 
+def subagent_budget(config: RunnableConfig) -> Optional[float]:
+    """Seconds a delegation may run, or None when neither a timeout nor a deadline applies."""
 
-async def supervisor_tools_node(state: TravelPlannerState):
+    budgets = []
+    if SUBAGENT_TIMEOUT_SECONDS > 0:
+        budgets.append(SUBAGENT_TIMEOUT_SECONDS)
+    left = remaining(config)
+    if left is not None:
+        # Leave the supervisor time to answer with whatever came back
+        budgets.append(left - DEADLINE_RESERVE_SECONDS)
+    return min(budgets) if budgets else None
+
+
+def partial_result(agent: str, output: dict, budget: float) -> str:
+    """ToolMessage content for a subagent cut off by its budget: the tool results it had so far."""
+
+    header = f"Partial result: {agent} ran out of its {max(budget, 0):.1f}s time budget before finishing."
+    results = [str(m.content) for m in output.get("messages", []) if m.type == "tool"]
+    if not results:
+        return f"{header} No results were gathered yet."
+    return f"{header} Results gathered so far:\n" + "\n".join(results)
+
+
+@instrument_node("supervisor")
+async def supervisor_tools_node(state: TravelPlannerState, config: RunnableConfig):
     """
     Execute delegate tools by invoking subagent subgraphs (optionally in parallel) and returning ToolMessages.
+    Subagents run with this node's config so their tokens and tool results stream through the parent graph.
     """
 
     messages = state["messages"]
@@ -34,30 +102,72 @@ async def supervisor_tools_node(state: TravelPlannerState):
     if not getattr(last_message, "tool_calls", None):
         return Command(goto=END)
 
+    # Time each subagent may use: the per-delegation limit and what is left of the request deadline
+    budget = subagent_budget(config)
+
     # Build tasks for each tool call
     async def run_tool(tool_call):
         name = tool_call["name"]
         args = tool_call.get("args", {})
 
         # Map tool name to subagent invocation with scoped HumanMessage
+        spec = subagent_for_tool(name)
+        agent = spec.name if spec is not None else name
+        start = time.perf_counter()
+        emit_progress(agent, tool_call["id"], "started")
         try:
-            if name == "BookFlight":
-                scope_text = args.get("instruction")
-                if args.get("origin") and args.get("destination"):
-                    scope_text = f"Book flight from {args['origin']} to {args['destination']}. {scope_text}"
-                input = {"messages": [HumanMessage(content=scope_text)]}
-                subagent_output = await flight_booking_agent.ainvoke(input)
-            elif name == "BookHotel":
-                scope_text = args.get("instruction")
-                input = {"messages": [HumanMessage(content=scope_text)]}
-                subagent_output = await hotel_booking_agent.ainvoke(input)
-            elif name == "RentCar":
-                scope_text = args.get("instruction")
-                input = {"messages": [HumanMessage(content=scope_text)]}
-                subagent_output = await car_rental_agent.ainvoke(input)
-            else:
+            if name == "BookFlight" and FLIGHT_FAST_PATH:
+                # Structured origin/destination with no preferences: skip the flight agent
+                content = await flight_fast_path(args)
+                if content is not None:
+                    book_flight_latency.record("fast_path", time.perf_counter() - start)
+                    emit_progress(agent, tool_call["id"], "finished", path="fast_path")
+                    return ToolMessage(
+                        content=content, name=name, tool_call_id=tool_call["id"]
+                    )
+
+            direct_tool = supervisor_direct_tools.get(name)
+            if direct_tool is not None:
+                # One combined query instead of a fan-out to the subagents
+                message = await direct_tool.ainvoke({**tool_call, "type": "tool_call"})
+                emit_progress(
+                    agent,
+                    tool_call["id"],
+                    "finished",
+                    path="direct",
+                    elapsed_ms=(time.perf_counter() - start) * 1000,
+                )
+                return message
+
+            if spec is None:
                 raise ValueError(f"Unknown tool: {name}")
 
+            scope_text = spec.scope(args)
+            subagent = subagent_graph(agent)
+            input = {"messages": [HumanMessage(content=scope_text)]}
+            subagent_run_config = subagent_config(config, agent, tool_call["id"])
+            if budget is not None:
+                subagent_run_config = with_deadline(subagent_run_config, budget)
+
+            def run_subagent():
+                return invoke_with_budget(subagent, input, subagent_run_config, budget)
+
+            if subagent_flight is None:
+                subagent_output, timed_out = await run_subagent()
+            else:
+                # Followers get the first caller's result; its tokens stream to the first caller only
+                thread_id = config.get("configurable", {}).get("thread_id")
+                subagent_output, timed_out = await subagent_flight.run(
+                    (thread_id, agent, scope_text), run_subagent
+                )
+            if timed_out:
+                emit_progress(agent, tool_call["id"], "timed_out", budget_s=budget)
+                return ToolMessage(
+                    content=partial_result(agent, subagent_output, budget),
+                    name=name,
+                    tool_call_id=tool_call["id"],
+                )
+
             # Extract final content: take the content of the last AI message from the subagent
             content = ""
             if isinstance(subagent_output, dict) and "messages" in subagent_output:
@@ -69,32 +179,78 @@ async def supervisor_tools_node(state: TravelPlannerState):
                         content = str(m.content)
                         break
 
+            if name == "BookFlight":
+                book_flight_latency.record("subagent", time.perf_counter() - start)
+            emit_progress(
+                agent,
+                tool_call["id"],
+                "finished",
+                elapsed_ms=(time.perf_counter() - start) * 1000,
+            )
+
             return ToolMessage(
                 content=content or "No result produced.",
                 name=name,
                 tool_call_id=tool_call["id"],
             )
         except Exception as e:
+            emit_progress(agent, tool_call["id"], "failed", error=str(e))
             return ToolMessage(
                 content=f"Error executing {name}: {e}",
                 name=name,
                 tool_call_id=tool_call["id"],
             )
 
+    # Hotels and cars at a flight destination are usually asked for next: warm them meanwhile.
+    # Every BookFlight of the turn at once, so one destination does not release another.
+    prefetch_destinations(
+        config.get("configurable", {}).get("thread_id"),
+        [
+            tool_call["args"]["destination"]
+            for tool_call in last_message.tool_calls
+            if tool_call["name"] == "BookFlight"
+            and tool_call.get("args", {}).get("destination")
+        ],
+    )
+
     tasks = [run_tool(tc) for tc in last_message.tool_calls]
     results = await asyncio.gather(*tasks)
 
     return Command(goto="supervisor_llm", update={"messages": results})
 
 
+@instrument_node("supervisor")
+async def compact_history_node(state: TravelPlannerState):
+    """
+    Fit the saved history into the token budget before the supervisor's turn: digest old tool
+    results, summarize older turns. Runs in the top-level graph so removals reach the thread state.
+    """
+
+    compaction = await compact_history(
+        state["messages"],
+        state.get("summary"),
+        HISTORY_TOKEN_BUDGET,
+        keep_turns=HISTORY_KEEP_TURNS,
+        tool_digest_chars=HISTORY_TOOL_DIGEST_CHARS,
+    )
+    record_turn(compaction)
+    return compaction.update
+
+
+@instrument_node("supervisor")
 async def supervisor_llm(state: TravelPlannerState):
     """
     Supervisor LLM node that either generates tool calls to the subagents or responds to the user and ends the conversation.
     """
 
-    messages = state["messages"]
-    messages_with_system = [SystemMessage(content=SUPERVISOR_PROMPT)] + messages
-    response = await model_with_tools.ainvoke(messages_with_system)
+    summary = state.get("summary")
+    history = [summary_message(summary)] if summary else []
+    system_message = SystemMessage(content=SUPERVISOR_PROMPT)
+    messages_with_system = [system_message, *history, *state["messages"]]
+    response = await ainvoke_model(
+        supervisor_model(), messages_with_system, priority=PRIORITY_INTERACTIVE
+    )
+
     return Command(update={"messages": [response]})
 
 
@@ -140,23 +296,27 @@ def create_travel_planner(checkpointer):
     builder = StateGraph(TravelPlannerState)
     supervisor = create_supervisor(checkpointer)
 
+    builder.add_node("compact_history", compact_history_node)
     builder.add_node(
         "supervisor",
         supervisor,
-        destinations=(
-            "flight_booking_agent",
-            "hotel_booking_agent",
-            "car_rental_agent",
-            END,
-        ),
+        destinations=(*SUBAGENTS, END),
     )
-    builder.add_node("flight_booking_agent", flight_booking_agent)
-    builder.add_node("hotel_booking_agent", hotel_booking_agent)
-    builder.add_node("car_rental_agent", car_rental_agent)
+    for agent in SUBAGENTS:
+        builder.add_node(agent, lazy_subagent_node(agent))
+        builder.add_edge(agent, "supervisor")
 
-    builder.add_edge(START, "supervisor")
-    builder.add_edge("flight_booking_agent", "supervisor")
-    builder.add_edge("hotel_booking_agent", "supervisor")
-    builder.add_edge("car_rental_agent", "supervisor")
+    builder.add_edge(START, "compact_history")
+    builder.add_edge("compact_history", "supervisor")
 
     return builder.compile(checkpointer=checkpointer)
+
+
+async def delete_thread(checkpointer, thread_id: str) -> None:
+    """
+    End a conversation thread: delete its checkpoints and release its speculative hotel and
+    car lookups, which will not be read.
+    """
+
+    await checkpointer.adelete_thread(thread_id)
+    cancel_prefetch(thread_id)
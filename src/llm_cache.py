@@ -0,0 +1,298 @@
+"""
+Persistent exact-match cache for chat model responses.
+
+The key is a hash of the normalized request: message types and contents (whitespace collapsed,
+tool-call ids dropped), the tool schemas bound to the model and the model parameters.
+Entries live in a local SQLite file with TTL expiry and LRU eviction under an entry and byte cap.
+
+Responses to requests that contain tool results are tagged with the inventory version at write
+time; if the inventory has changed since, the entry is treated as stale and skipped.
+
+The event loop uses `aget` / `aput`, which run the SQLite work on a worker thread. The entry
+count and byte total for eviction are read once when the file is opened and kept up to date on
+every write, so a put never scans the table.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+# Model attributes that change the completion and therefore belong in the key
+_MODEL_PARAMS = ("temperature", "top_p", "max_tokens", "seed", "reasoning_effort")
+# How long an inventory version read stays valid before it is re-read
+_VERSION_TTL = 1.0
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+def normalize_messages(messages: Sequence[BaseMessage]) -> List[Dict[str, Any]]:
+    """Reduce messages to the fields that determine the model's answer."""
+
+    normalized = []
+    for message in messages:
+        entry: Dict[str, Any] = {
+            "type": message.type,
+            "content": _normalize_content(message.content),
+        }
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            # Tool-call ids are random per call and never affect the completion
+            entry["tool_calls"] = [
+                {"name": tc["name"], "args": tc["args"]} for tc in tool_calls
+            ]
+        if message.type == "tool":
+            entry["name"] = message.name
+        normalized.append(entry)
+    return normalized
+
+
+def describe_runnable(runnable: Any) -> Dict[str, Any]:
+    """Bound tools and model parameters of a chat model or a `bind_tools` binding."""
+
+    kwargs = getattr(runnable, "kwargs", {}) or {}
+    model = getattr(runnable, "bound", runnable)
+    params = dict(getattr(model, "_identifying_params", {}) or {})
+    for name in _MODEL_PARAMS:
+        value = getattr(model, name, None)
+        if value is not None:
+            params[name] = value
+    return {"params": params, "bind": kwargs}
+
+
+def cache_key(runnable: Any, messages: Sequence[BaseMessage]) -> str:
+    payload = json.dumps(
+        {
+            "model": describe_runnable(runnable),
+            "messages": normalize_messages(messages),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed response cache with TTL, LRU eviction and hit/miss metrics.
+
+    `inventory_version` returns the current inventory fingerprint; it is consulted only for
+    requests that carry tool results.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 86_400,
+        max_entries: int = 10_000,
+        max_bytes: int = 100 * 2**20,
+        inventory_version: Optional[Callable[[], str]] = None,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.inventory_version = inventory_version
+        self.counters: Counter = Counter()
+        self.latency_saved = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._version: Tuple[float, str] = (0.0, "")
+        # One connection shared by the worker threads; statements and totals change together
+        self._lock = threading.RLock()
+        self._entries = 0
+        self._bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    inventory_version TEXT,
+                    latency REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+            )
+            self._entries, self._bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            self._conn = conn
+        return self._conn
+
+    def _current_inventory_version(self) -> str:
+        if self.inventory_version is None:
+            return ""
+        checked_at, version = self._version
+        now = time.monotonic()
+        if now - checked_at > _VERSION_TTL:
+            version = self.inventory_version()
+            self._version = (now, version)
+        return version
+
+    @staticmethod
+    def _uses_tool_results(messages: Sequence[BaseMessage]) -> bool:
+        return any(message.type == "tool" for message in messages)
+
+    def get(self, key: str, messages: Sequence[BaseMessage]) -> Optional[BaseMessage]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, inventory_version, latency, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            now = time.time()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            response, version, latency, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._delete(conn, key)
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            if (
+                self._uses_tool_results(messages)
+                and version != self._current_inventory_version()
+            ):
+                self.counters["stale"] += 1
+                self.counters["misses"] += 1
+                return None
+
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.counters["hits"] += 1
+            self.latency_saved += latency
+        return _fresh_copy(messages_from_dict([json.loads(response)])[0])
+
+    async def aget(
+        self, key: str, messages: Sequence[BaseMessage]
+    ) -> Optional[BaseMessage]:
+        """`get` on a worker thread."""
+
+        return await asyncio.to_thread(self.get, key, messages)
+
+    def put(
+        self,
+        key: str,
+        messages: Sequence[BaseMessage],
+        response: BaseMessage,
+        latency: float,
+    ) -> None:
+        payload = json.dumps(message_to_dict(response))
+        with self._lock:
+            conn = self._connect()
+            version = (
+                self._current_inventory_version()
+                if self._uses_tool_results(messages)
+                else None
+            )
+            now = time.time()
+            self._delete(conn, key)
+            conn.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, payload, version, latency, len(payload), now, now),
+            )
+            self._entries += 1
+            self._bytes += len(payload)
+            self._evict(conn)
+
+    async def aput(
+        self,
+        key: str,
+        messages: Sequence[BaseMessage],
+        response: BaseMessage,
+        latency: float,
+    ) -> None:
+        """`put` on a worker thread."""
+
+        await asyncio.to_thread(self.put, key, messages, response, latency)
+
+    def _delete(self, conn: sqlite3.Connection, key: str) -> None:
+        row = conn.execute(
+            "DELETE FROM responses WHERE key = ? RETURNING size", (key,)
+        ).fetchone()
+        if row is not None:
+            self._entries -= 1
+            self._bytes -= row[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        # Drop least recently used entries until both caps hold
+        excess_rows = max(0, self._entries - self.max_entries)
+        excess_bytes = max(0, self._bytes - self.max_bytes)
+        freed_rows = freed_bytes = 0
+        victims = []
+        for key, entry_size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            if freed_rows >= excess_rows and freed_bytes >= excess_bytes:
+                break
+            victims.append((key,))
+            freed_rows += 1
+            freed_bytes += entry_size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._entries -= freed_rows
+        self._bytes -= freed_bytes
+        self.counters["evicted"] += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+            "latency_saved_seconds": self.latency_saved,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+            self._entries = self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _fresh_copy(message: BaseMessage) -> BaseMessage:
+    """
+    Give a cached response new message and tool-call ids so it can appear in a thread
+    alongside an earlier copy of itself without being merged or confusing tool routing.
+    """
+
+    message.id = None
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        message.tool_calls = [
+            {**tc, "id": f"call_{uuid.uuid4().hex[:24]}"} for tc in tool_calls
+        ]
+        message.additional_kwargs.pop("tool_calls", None)
+    return message
@@ -0,0 +1,377 @@
+"""
+In-process latency metrics and Prometheus instrumentation.
+
+`LatencyRecorder` keeps raw samples for ad-hoc percentile summaries (fast path, streaming).
+
+With `TRAVEL_METRICS=true`, `instrument_node` and `instrument_tool` wrap every graph node and
+search tool to record latency histograms, error counts, tool row counts and, through
+`record_model_call` in `ainvoke_model`, model latency, prompt/completion tokens and cost per
+node and model. `render()` returns the registry in Prometheus text format and `serve()` exposes it over HTTP. When disabled, the
+decorators return the function unchanged, so instrumentation costs nothing on the hot path.
+"""
+
+import bisect
+import contextvars
+import functools
+import logging
+import statistics
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables.config import ensure_config
+
+from src.config import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyRecorder:
+    """Wall-time samples per label (e.g. fast path vs. subagent) with summary percentiles."""
+
+    def __init__(self, max_samples: int = 10_000):
+        self.max_samples = max_samples
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, label: str, seconds: float) -> None:
+        samples = self.samples[label]
+        if len(samples) >= self.max_samples:
+            del samples[: len(samples) // 2]
+        samples.append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for label, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[label] = {
+                "count": len(ordered),
+                "mean_ms": statistics.fmean(ordered) * 1000,
+                "p50_ms": ordered[len(ordered) // 2] * 1000,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                * 1000,
+                "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+                * 1000,
+            }
+        return result
+
+
+## PROMETHEUS REGISTRY
+## ----------------------------------------------------------------------------
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# Each metric guards its values with a lock: the event loop updates them while the `serve()`
+# thread renders them.
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.values: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self.values[labels] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self.values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self.values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            values = sorted(self.values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label set: bucket counts (non-cumulative, last one is +Inf), sum
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = entry
+            counts[bucket] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            # Copy the bucket lists too, so a render never mixes counts from two moments
+            values = sorted(
+                (labels, (list(counts), list(total)))
+                for labels, (counts, total) in self.values.items()
+            )
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound:g}"' if bound != "+Inf" else 'le="+Inf"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}"
+                )
+            label_text = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {total[0]:g}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+node_latency = Histogram(
+    "travel_node_latency_seconds", "Graph node wall time.", ("agent", "node")
+)
+node_errors = Counter(
+    "travel_node_errors_total", "Graph node runs that raised.", ("agent", "node")
+)
+model_tokens = Counter(
+    "travel_model_tokens_total",
+    "Model tokens by calling node and kind (prompt/completion).",
+    ("agent", "node", "kind"),
+)
+model_latency = Histogram(
+    "travel_model_latency_seconds",
+    "Model call wall time by calling node and model.",
+    ("agent", "node", "model"),
+)
+model_cost = Counter(
+    "travel_model_cost_usd_total",
+    "Model spend in USD by calling node and model.",
+    ("agent", "node", "model"),
+)
+cascade_outcomes = Counter(
+    "travel_cascade_outcomes_total",
+    "Cascaded subagent turns: answered by the fast model, or escalated and why.",
+    ("agent", "outcome"),
+)
+tool_latency = Histogram("travel_tool_latency_seconds", "Tool wall time.", ("tool",))
+tool_rows = Counter(
+    "travel_tool_rows_total", "Inventory rows matched by tools.", ("tool",)
+)
+tool_errors = Counter("travel_tool_errors_total", "Tool calls that raised.", ("tool",))
+
+model_queue_depth = Gauge(
+    "travel_model_queue_depth", "Model calls waiting for rate-limit capacity."
+)
+model_queue_wait = Histogram(
+    "travel_model_queue_wait_seconds",
+    "Time model calls waited in the scheduler queue.",
+    ("priority",),
+)
+model_retries = Counter(
+    "travel_model_retries_total", "Model calls retried after an error.", ("reason",)
+)
+
+coalesced_calls = Counter(
+    "travel_coalesced_calls_total",
+    "Calls served by an identical call already in flight.",
+    ("group",),
+)
+prefetch_events = Counter(
+    "travel_prefetch_events_total",
+    "Speculative inventory prefetches and the lookups they served.",
+    ("event",),
+)
+booking_outcomes = Counter(
+    "travel_booking_outcomes_total",
+    "Booking attempts by type and outcome (confirmed, replayed or why they failed).",
+    ("booking_type", "outcome"),
+)
+booking_batch_size = Histogram(
+    "travel_booking_batch_size",
+    "Bookings committed per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+REGISTRY = [
+    node_latency,
+    node_errors,
+    model_tokens,
+    model_latency,
+    model_cost,
+    cascade_outcomes,
+    tool_latency,
+    tool_rows,
+    tool_errors,
+    model_queue_depth,
+    model_queue_wait,
+    model_retries,
+    coalesced_calls,
+    prefetch_events,
+    booking_outcomes,
+    booking_batch_size,
+]
+
+# (agent, node) of the graph node running in the current task, for token attribution
+current_node: contextvars.ContextVar[Optional[Tuple[str, str]]] = (
+    contextvars.ContextVar("current_node", default=None)
+)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+## INSTRUMENTATION
+## ----------------------------------------------------------------------------
+
+
+def instrument_node(agent: Optional[str] = None) -> Callable:
+    """
+    Record latency and errors of an async graph node under (`agent`, function name).
+    Without `agent`, nodes shared by several subagents are labelled with the `subagent` from
+    the node's config.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        if not METRICS:
+            return fn
+        node = fn.__name__
+
+        # functools.wraps keeps the signature LangGraph inspects to pass `config`
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any):
+            label = agent
+            if label is None:
+                config = kwargs.get("config") or ensure_config()
+                label = config.get("configurable", {}).get("subagent", "unknown")
+            token = current_node.set((label, node))
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                node_errors.inc(label, node)
+                raise
+            finally:
+                node_latency.observe(time.perf_counter() - start, label, node)
+                current_node.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+def _row_count(result: Any) -> int:
+    # Search tools return (content, artifact); the artifact is a SearchPage or a dict of them
+    artifact = result[1] if isinstance(result, tuple) and len(result) == 2 else result
+    if isinstance(artifact, dict):
+        return sum(getattr(page, "total", 0) for page in artifact.values())
+    return getattr(artifact, "total", 0)
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """Record latency, matched rows and errors of an async tool function."""
+
+    if not METRICS:
+        return fn
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any):
+        start = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            tool_errors.inc(name)
+            raise
+        finally:
+            tool_latency.observe(time.perf_counter() - start, name)
+        tool_rows.inc(name, amount=_row_count(result))
+        return result
+
+    return wrapper
+
+
+def record_model_call(response: Any, model: str, seconds: float, cost: float) -> None:
+    """Attribute a model response's latency, token usage and cost to the node that requested it."""
+
+    if not METRICS:
+        return
+    agent, node = current_node.get() or ("unknown", "unknown")
+    model_latency.observe(seconds, agent, node, model)
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return
+    model_tokens.inc(agent, node, "prompt", amount=usage.get("input_tokens", 0))
+    model_tokens.inc(agent, node, "completion", amount=usage.get("output_tokens", 0))
+    model_cost.inc(agent, node, model, amount=cost)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve `/metrics` from a daemon thread. Returns None if the port is unavailable."""
+
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning("metrics endpoint not started on port %d: %s", port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
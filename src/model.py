@@ -1,10 +1,176 @@
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
 from datetime import datetime
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import BaseMessage
 from pydantic import BaseModel
+from src.config import (
+    DB_PATH,
+    LLM_CACHE,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_BYTES,
+    MODEL_EXPECTED_COMPLETION_TOKENS,
+    MODEL_HEDGE,
+    MODEL_HEDGE_MIN_SAMPLES,
+    MODEL_NAME,
+    NODE_MODELS,
+)
+from src.db.migrations import inventory_version
+from src.llm_cache import LLMCache, cache_key
+from src.deadlines import Hedger, within_deadline
+from src.metrics import record_model_call
+from src.scheduler import PRIORITY_BACKGROUND, model_scheduler
+from src.tokens import estimate_tokens
 
-# Chat model
-model = ChatOpenAI(model="gpt-4.1")
+# Chat models by name, built on first use: importing langchain_openai/openai dominates cold start
+_models: Dict[str, Any] = {}
+# When set, serves every model name (offline benchmarks, tests)
+_override = None
+
+# USD per million (prompt, completion) tokens, matched on the longest prefix of the model name
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+
+def node_model(node: str) -> str:
+    """Model name for a node: "supervisor", "summarizer" or a subagent name."""
+
+    return NODE_MODELS.get(node, MODEL_NAME)
+
+
+def get_model(name: Optional[str] = None):
+    """
+    The chat model `name` (default `TRAVEL_MODEL`), shared by every node that uses it.
+    Retries are left to the scheduler so they respect the rate limits.
+    """
+
+    if _override is not None:
+        return _override
+    name = name or MODEL_NAME
+    model = _models.get(name)
+    if model is None:
+        from langchain_openai import ChatOpenAI
+
+        model = _models[name] = ChatOpenAI(model=name, max_retries=0)
+    return model
+
+
+def set_model(chat_model) -> None:
+    """Serve every model name with `chat_model` (offline benchmarks, tests). Call before any agent is built."""
+
+    global _override
+    _override = chat_model
+
+
+def model_name(runnable) -> str:
+    """Name of the chat model behind `runnable` (a model or a `bind_tools` binding of one)."""
+
+    model = getattr(runnable, "bound", runnable)
+    return getattr(model, "model_name", None) or getattr(model, "_llm_type", "unknown")
+
+
+def model_cost(response: Any, name: str) -> float:
+    """USD cost of a response from model `name`; 0 for models without a price."""
+
+    usage = getattr(response, "usage_metadata", None)
+    prefixes = [prefix for prefix in MODEL_PRICES if name.startswith(prefix)]
+    if not usage or not prefixes:
+        return 0.0
+    prompt, completion = MODEL_PRICES[max(prefixes, key=len)]
+    return (
+        usage.get("input_tokens", 0) * prompt
+        + usage.get("output_tokens", 0) * completion
+    ) / 1e6
+
+
+def __getattr__(name: str):
+    # `from src.model import model` keeps working and builds the model lazily
+    if name == "model":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Optional persistent response cache shared by the supervisor and all subagents
+llm_cache = (
+    LLMCache(
+        LLM_CACHE_PATH,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        max_entries=LLM_CACHE_MAX_ENTRIES,
+        max_bytes=LLM_CACHE_MAX_BYTES,
+        inventory_version=lambda: inventory_version(DB_PATH),
+    )
+    if LLM_CACHE
+    else None
+)
+
+# Optional hedging of slow model calls
+hedger = Hedger(min_samples=MODEL_HEDGE_MIN_SAMPLES) if MODEL_HEDGE else None
+
+
+def _hedge_key(runnable) -> str:
+    # Calls to the same model with the same bound tools come from the same agent and have
+    # similar latency
+    tools = (getattr(runnable, "kwargs", None) or {}).get("tools") or ()
+    names = [tool.get("function", {}).get("name", "") for tool in tools]
+    return f"{model_name(runnable)}:{','.join(names) or 'plain'}"
+
+
+async def _scheduled_call(
+    runnable, messages: Sequence[BaseMessage], priority: int
+) -> BaseMessage:
+    tokens = estimate_tokens(messages) + MODEL_EXPECTED_COMPLETION_TOKENS
+
+    def call(config=None):
+        return model_scheduler.run(
+            lambda: runnable.ainvoke(messages, config), tokens, priority
+        )
+
+    if hedger is None:
+        request = call()
+    else:
+        # The backup runs without callbacks so its tokens are not streamed twice
+        request = hedger.run(
+            _hedge_key(runnable), call, lambda: call({"callbacks": []})
+        )
+    # Bounded by the request deadline from the runnable config, if any
+    start = time.perf_counter()
+    response = await within_deadline(request)
+    name = model_name(runnable)
+    record_model_call(
+        response, name, time.perf_counter() - start, model_cost(response, name)
+    )
+    return response
+
+
+async def ainvoke_model(
+    runnable,
+    messages: Sequence[BaseMessage],
+    priority: int = PRIORITY_BACKGROUND,
+) -> BaseMessage:
+    """
+    Invoke a chat model (or a `bind_tools` binding of one) on `messages`.
+    Every graph node calls the model through here so caching, rate limiting and token
+    accounting apply uniformly. `priority` orders calls waiting for rate-limit capacity
+    (`PRIORITY_INTERACTIVE` for supervisor turns).
+    """
+
+    if llm_cache is None:
+        return await _scheduled_call(runnable, messages, priority)
+
+    key = cache_key(runnable, messages)
+    cached = await llm_cache.aget(key, messages)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    response = await _scheduled_call(runnable, messages, priority)
+    if not getattr(response, "invalid_tool_calls", None):
+        await llm_cache.aput(key, messages, response, time.perf_counter() - start)
+    return response
 
 
 class Destination(BaseModel):
@@ -26,3 +192,53 @@ class TravelBooking(BaseModel):
     details: str
     price: float
     booking_date: Optional[datetime] = None
+    # Booked offer (src/db/bookings.py): inventory id, date and seats/rooms/cars reserved
+    item_id: Optional[str] = None
+    travel_date: Optional[str] = None
+    quantity: int = 1
+
+
+class FlightOption(BaseModel):
+    """Flight returned by the inventory search"""
+
+    flight_id: str
+    origin_city: str
+    destination_city: str
+    plane_type: str
+    # Offer columns (schema migration 3); None in undated inventories
+    travel_date: Optional[str] = None
+    price: Optional[float] = None
+    available: Optional[int] = None
+
+
+class CarOption(BaseModel):
+    """Rental car returned by the inventory search"""
+
+    car_id: str
+    pickup_city: str
+    make: str
+    color: str
+    travel_date: Optional[str] = None
+    price: Optional[float] = None
+    available: Optional[int] = None
+
+
+class HotelOption(BaseModel):
+    """Hotel returned by the inventory search"""
+
+    hotel_id: str
+    location_city: str
+    name: str
+    description: str
+    travel_date: Optional[str] = None
+    price: Optional[float] = None
+    available: Optional[int] = None
+
+
+class SearchPage(BaseModel):
+    """Typed artifact attached to search tool results"""
+
+    items: List[Union[FlightOption, CarOption, HotelOption]]
+    total: int
+    offset: int = 0
+    next_offset: Optional[int] = None
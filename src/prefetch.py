@@ -0,0 +1,163 @@
+"""
+Speculative prefetch of inventory lookups.
+
+Some lookups are predictable: once the supervisor sends `BookFlight` with a destination, hotels
+and cars in that city are almost always asked for next. `Prefetcher.schedule(owner, key, query)`
+starts `query()` in the background and keeps its result for `ttl_seconds`; a later
+`get(key)` returns it (or joins the query still in flight) instead of querying again.
+
+Speculative work must never compete with real work, so at most `max_concurrency` prefetches run
+at once and further requests are dropped rather than queued. Entries are keyed by lookup and
+shared by the conversation threads that scheduled them: `cancel(owner)` releases a thread's hold
+on its entries when the thread ends or moves on to other destinations, and an entry is dropped
+(its query cancelled if still in flight) once no thread holds it. `discard(key)` drops one entry
+whose data went stale.
+
+Counters (`stats()`, and `travel_prefetch_events_total` with `TRAVEL_METRICS=true`):
+
+- `scheduled`, `dropped` (concurrency limit), `failed`, `cancelled`
+- `hits` / `misses`: lookups served from a prefetch or not
+- `used`: prefetches read at least once; `wasted`: expired or evicted unread
+"""
+
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Collection, Dict, Hashable, Optional
+
+from src.config import METRICS
+from src.metrics import prefetch_events
+
+
+class _Entry:
+    __slots__ = ("task", "owners", "expires", "used")
+
+    def __init__(self, task: asyncio.Future, owner: Any, expires: float):
+        self.task, self.owners, self.expires, self.used = task, {owner}, expires, False
+
+
+class Prefetcher:
+    """Background warming of lookups likely to be asked for next."""
+
+    def __init__(
+        self, max_concurrency: int = 2, ttl_seconds: float = 120, max_entries: int = 256
+    ):
+        self.max_concurrency = max_concurrency
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.counters: Counter = Counter()
+        # Insertion order is expiry order: every entry lives for ttl_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._running = 0
+
+    def _count(self, event: str) -> None:
+        self.counters[event] += 1
+        if METRICS:
+            prefetch_events.inc(event)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        if not entry.task.done():
+            entry.task.cancel()
+            self._count("cancelled")
+        elif (
+            not entry.used and not entry.task.cancelled() and not entry.task.exception()
+        ):
+            self._count("wasted")
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires > now:
+                break
+            self._discard(key)
+
+    def _finished(self, task: asyncio.Future) -> None:
+        self._running -= 1
+        if not task.cancelled() and task.exception() is not None:
+            self._count("failed")
+
+    def schedule(
+        self, owner: Any, key: Hashable, query: Callable[[], Awaitable[Any]]
+    ) -> bool:
+        """
+        Start `query()` for `key` unless it is already warm; returns whether it started.
+        `owner` holds the entry either way, until it is cancelled or expires.
+        """
+
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.owners.add(owner)
+            return False
+        if self._running >= self.max_concurrency:
+            self._count("dropped")
+            return False
+
+        self._running += 1
+        task = asyncio.ensure_future(query())
+        task.add_done_callback(self._finished)
+        self._entries[key] = _Entry(task, owner, now + self.ttl_seconds)
+        self._count("scheduled")
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+        return True
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        """Prefetched result for `key`, waiting for it if still in flight; None on a miss."""
+
+        self._expire(time.monotonic())
+        entry = self._entries.get(key)
+        if entry is None:
+            self._count("misses")
+            return None
+        try:
+            # Shielded: a cancelled caller must not cancel the entry other lookups may use
+            result = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if not entry.task.cancelled():
+                raise
+            result = None
+        except Exception:
+            result = None
+        if result is None:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self._count("misses")
+            return None
+        if not entry.used:
+            entry.used = True
+            self._count("used")
+        self._count("hits")
+        return result
+
+    def discard(self, key: Hashable) -> None:
+        """Drop the entry for `key`, if any, e.g. after a write made it stale."""
+
+        if key in self._entries:
+            self._discard(key)
+
+    def cancel(self, owner: Any, keep: Collection[Hashable] = ()) -> None:
+        """
+        Release `owner`'s hold on its entries, except `keep`. Entries no other owner holds are
+        dropped, and their prefetches still in flight stopped.
+        """
+
+        released = []
+        for key, entry in self._entries.items():
+            if owner in entry.owners and key not in keep:
+                entry.owners.discard(owner)
+                if not entry.owners:
+                    released.append(key)
+        for key in released:
+            self._discard(key)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "use_rate": self.counters["used"] / max(1, self.counters["scheduled"]),
+            "hit_rate": self.counters["hits"] / max(1, lookups),
+        }
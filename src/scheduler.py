@@ -0,0 +1,278 @@
+"""
+Process-wide, rate-limit-aware scheduler for model calls.
+
+Every provider call goes through `model_scheduler.run` (from `ainvoke_model`). Before a call is
+sent it must take one request from the requests-per-minute bucket and its estimated tokens
+(prompt estimate plus the expected completion) from the tokens-per-minute bucket. The estimate
+is corrected from the response's reported usage. Calls that cannot proceed wait in a priority
+queue, where interactive supervisor turns are served before background subagent work.
+
+Rate-limit errors (429) pause the whole queue for the backoff delay, so concurrent threads stop
+hammering the provider together. Transient errors (5xx, timeouts) are retried for the failing
+call only. Both use exponential backoff with full jitter and honor `Retry-After`.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config import (
+    METRICS,
+    MODEL_BACKOFF_MAX_SECONDS,
+    MODEL_BACKOFF_SECONDS,
+    MODEL_MAX_RETRIES,
+    MODEL_RPM,
+    MODEL_TPM,
+)
+from src.metrics import (
+    LatencyRecorder,
+    model_queue_depth,
+    model_queue_wait,
+    model_retries,
+)
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+def retry_reason(error: BaseException) -> Optional[str]:
+    """Retry class of a provider error: "rate_limit", "transient", or None (do not retry)."""
+
+    # openai is only imported once one of its errors shows up, keeping it off the cold path
+    if not type(error).__module__.startswith("openai"):
+        return None
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limit"
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        # APIConnectionError includes APITimeoutError
+        return "transient"
+    return None
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute up to a burst of one minute's worth. 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _refill(self, now: float) -> None:
+        rate = self.per_minute / 60
+        self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available."""
+
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        # A request larger than the burst can never fit; let it through on a full bucket
+        amount = min(amount, self.capacity)
+        missing = amount - self.level
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) units after the fact."""
+
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level - delta)
+
+
+class ModelScheduler:
+    """
+    Admission control for model calls: RPM/TPM token buckets, a priority queue and retries.
+
+    Like `ConnectionPool`, the scheduler binds to the running event loop and resets its
+    queue if it is used from a new loop.
+    """
+
+    def __init__(
+        self,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_retries: int = 4,
+        backoff_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.counters: Counter = Counter()
+        self.wait = LatencyRecorder()
+        self.max_queue_depth = 0
+        self._queue: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._changed: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._queue = []
+            self._changed = asyncio.Condition()
+
+    def _delay(self, tokens: float) -> float:
+        now = time.monotonic()
+        return max(
+            self._paused_until - now,
+            self.requests.delay(1, now),
+            self.tokens.delay(tokens, now),
+        )
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _record_depth(self) -> None:
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        if METRICS:
+            model_queue_depth.set(len(self._queue))
+
+    async def acquire(
+        self, tokens: float, priority: int = PRIORITY_BACKGROUND
+    ) -> float:
+        """Wait for capacity for one call of about `tokens` tokens. Returns the time waited."""
+
+        self._bind_loop()
+        start = time.perf_counter()
+        if not self._queue and self._delay(tokens) <= 0:
+            # Uncontended: take capacity without queueing
+            now = time.monotonic()
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            return self._record_wait(priority, start)
+
+        entry = [priority, next(self._sequence), tokens]
+        heapq.heappush(self._queue, entry)
+        self._record_depth()
+        try:
+            while True:
+                delay = None
+                if self._queue[0] is entry:
+                    delay = self._delay(tokens)
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        now = time.monotonic()
+                        self.requests.take(1, now)
+                        self.tokens.take(tokens, now)
+                        break
+                async with self._changed:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+        except BaseException:
+            # Cancelled while queued: leave the queue and let the next caller move up
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            self._record_depth()
+            await asyncio.shield(self._notify())
+            raise
+
+        self._record_depth()
+        await self._notify()
+        return self._record_wait(priority, start)
+
+    def _record_wait(self, priority: int, start: float) -> float:
+        waited = time.perf_counter() - start
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        self.wait.record(name, waited)
+        if METRICS:
+            model_queue_wait.observe(waited, name)
+        if waited > 0.001:
+            self.counters["throttled"] += 1
+        return waited
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except (TypeError, ValueError):
+                retry_after = None
+        ceiling = min(self.backoff_max_seconds, self.backoff_seconds * 2**attempt)
+        jittered = random.uniform(0, ceiling)
+        return max(jittered, retry_after or 0.0)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        tokens: float,
+        priority: int = PRIORITY_BACKGROUND,
+    ) -> Any:
+        """Run `call` once capacity allows, retrying rate-limit and transient errors."""
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens, priority)
+            self.counters["calls"] += 1
+            try:
+                response = await call()
+            except Exception as e:
+                reason = retry_reason(e)
+                if reason is None or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                if reason == "rate_limit":
+                    # Everyone backs off, not just this caller
+                    self._paused_until = max(
+                        self._paused_until, time.monotonic() + delay
+                    )
+                self._count_retry(reason)
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage_metadata", None)
+            if usage and usage.get("total_tokens"):
+                self.tokens.adjust(usage["total_tokens"] - tokens)
+            return response
+
+    def _count_retry(self, reason: str) -> None:
+        self.counters[f"retries_{reason}"] += 1
+        if METRICS:
+            model_retries.inc(reason)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+            "wait": self.wait.summary(),
+        }
+
+
+model_scheduler = ModelScheduler(
+    rpm=MODEL_RPM,
+    tpm=MODEL_TPM,
+    max_retries=MODEL_MAX_RETRIES,
+    backoff_seconds=MODEL_BACKOFF_SECONDS,
+    backoff_max_seconds=MODEL_BACKOFF_MAX_SECONDS,
+)
@@ -0,0 +1,51 @@
+"""
+In-flight request coalescing ("singleflight").
+
+At peak, many threads ask for the same thing at the same moment. `SingleFlight.run(key, fn)`
+starts `fn()` for the first caller of a key and lets every caller that arrives while it is
+still running await the same result instead of repeating the work. The entry is dropped when
+the call finishes, so nothing is cached beyond the call's lifetime.
+
+The shared call runs in its own task: a caller that is cancelled (deadline, client gone) stops
+waiting without cancelling the work the other callers are waiting for. Results are shared
+objects and must be treated as read-only.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from src.config import METRICS
+from src.metrics import coalesced_calls
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with equal keys; `name` labels its metrics."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counters: Counter = Counter()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.counters["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.counters["coalesced"] += 1
+            if METRICS:
+                coalesced_calls.inc(self.name)
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the error retrieved in case every caller stopped waiting
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "inflight": len(self._inflight)}
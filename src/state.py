@@ -1,5 +1,5 @@
 from typing import Annotated, List
-from typing_extensions import TypedDict
+from typing_extensions import NotRequired, TypedDict
 from langgraph.graph.message import AnyMessage, add_messages
 from langgraph.prebuilt.chat_agent_executor import AgentState
 
@@ -8,3 +8,5 @@ class TravelPlannerState(AgentState):
     """State for the travel planner"""
 
     messages: Annotated[list[AnyMessage], add_messages]
+    # Running summary of history compacted out of `messages` (see src/compaction.py)
+    summary: NotRequired[str]
@@ -0,0 +1,144 @@
+"""
+Streaming for the travel planner graph.
+
+`supervisor_tools_node` runs subagents inside a node, so by default a caller sees nothing until
+every delegated subagent has finished. Subagents are now invoked with the node's config (plus
+`subagent` / `delegation_id` metadata), which lets their model tokens and tool results flow
+through `astream(..., subgraphs=True)` and `astream_events` on the top-level graph, and the
+supervisor emits `custom` progress events when a delegation starts and finishes.
+
+`stream_travel_planner` turns those streams into flat events attributed to the agent (and, for
+parallel delegations, the tool call) that produced them, and records time-to-first-token.
+"""
+
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
+from langgraph.config import get_stream_writer
+
+from src.deadlines import with_deadline
+from src.metrics import LatencyRecorder
+
+SUPERVISOR = "supervisor"
+
+# Time from stream start to the first token, overall ("overall") and per agent
+time_to_first_token = LatencyRecorder()
+
+
+def subagent_config(
+    config: Optional[RunnableConfig], agent: str, delegation_id: str
+) -> RunnableConfig:
+    """Config for a subagent run that keeps the parent's callbacks and tags its output."""
+
+    return merge_configs(
+        config,
+        {
+            "metadata": {"subagent": agent, "delegation_id": delegation_id},
+            "tags": [f"subagent:{agent}"],
+        },
+    )
+
+
+def emit_progress(
+    agent: str, delegation_id: Optional[str], status: str, **fields: Any
+) -> None:
+    """Write a progress event to the `custom` stream (a no-op when it is not requested)."""
+
+    get_stream_writer()(
+        {"agent": agent, "delegation_id": delegation_id, "status": status, **fields}
+    )
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    # Content blocks: keep the text parts
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+async def stream_travel_planner(
+    graph: Any,
+    input: Any,
+    config: Optional[RunnableConfig] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run `graph` (from `create_travel_planner`) and yield events as they happen:
+
+    - `{"type": "token", "agent", "delegation_id", "text"}` for model output tokens
+    - `{"type": "tool_result", "agent", "delegation_id", "name", "content"}` for tool results,
+      including each subagent's answer once it reaches the supervisor
+    - `{"type": "progress", "agent", "delegation_id", "status", ...}` for delegation progress
+    - a final `{"type": "done", "time_to_first_token_ms", "elapsed_ms"}`
+
+    `agent` is "supervisor" for the supervisor's own output. `timeout` sets a request deadline
+    (see `src/deadlines.py`).
+    """
+
+    if timeout is not None:
+        config = with_deadline(config, timeout)
+
+    start = time.perf_counter()
+    first_token: Optional[float] = None
+    # Per-agent start: the delegation's "started" event, else the stream start
+    agent_start: Dict[Any, float] = {}
+    agent_first: set = set()
+
+    async for _, mode, chunk in graph.astream(
+        input, config, stream_mode=["messages", "custom"], subgraphs=True
+    ):
+        now = time.perf_counter()
+        if mode == "custom":
+            if isinstance(chunk, dict) and chunk.get("status") == "started":
+                agent_start[chunk.get("delegation_id")] = now
+            yield {"type": "progress", **chunk}
+            continue
+
+        message, metadata = chunk
+        agent = metadata.get("subagent", SUPERVISOR)
+        delegation_id = metadata.get("delegation_id")
+
+        if isinstance(message, ToolMessage):
+            yield {
+                "type": "tool_result",
+                "agent": agent,
+                "delegation_id": delegation_id or message.tool_call_id,
+                "name": message.name,
+                "content": _text(message.content),
+            }
+            continue
+
+        # Streamed chunks, or a whole message when the model did not stream (e.g. a cache hit)
+        if not isinstance(message, (AIMessageChunk, AIMessage)):
+            continue
+        text = _text(message.content)
+        if not text:
+            continue
+        if first_token is None:
+            first_token = now - start
+            time_to_first_token.record("overall", first_token)
+        if delegation_id not in agent_first:
+            agent_first.add(delegation_id)
+            time_to_first_token.record(
+                agent, now - agent_start.get(delegation_id, start)
+            )
+        yield {
+            "type": "token",
+            "agent": agent,
+            "delegation_id": delegation_id,
+            "text": text,
+        }
+
+    yield {
+        "type": "done",
+        "time_to_first_token_ms": (
+            first_token * 1000 if first_token is not None else None
+        ),
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
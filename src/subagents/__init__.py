@@ -1 +1,12 @@
-# Subagents package
+# Subagents package: importing it registers every domain agent.
+# Registration order is the order of the supervisor's delegate tools.
+from src.subagents import flight_booking  # noqa: F401
+from src.subagents import hotel_booking  # noqa: F401
+from src.subagents import car_rental  # noqa: F401
+from src.subagents.registry import (
+    SUBAGENTS,
+    SubagentSpec,
+    register,
+    subagent_for_tool,
+    subagent_graph,
+)
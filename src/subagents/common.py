@@ -0,0 +1,43 @@
+"""
+Helpers shared by the subagent graphs.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+from langchain_core.messages import ToolMessage
+from src.config import TOOL_CONCURRENCY
+
+
+async def execute_tool_calls(
+    tool_calls: List[Dict[str, Any]],
+    tools_by_name: Dict[str, Any],
+    max_concurrency: int = TOOL_CONCURRENCY,
+) -> List[ToolMessage]:
+    """
+    Invoke the tool calls from one model turn concurrently, at most `max_concurrency` at a time.
+
+    Returns one tool message per call, in the same order as `tool_calls`. A failing call
+    (unknown tool, bad arguments, tool error) produces an error tool message instead of
+    aborting the other calls.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(tool_call):
+        try:
+            tool = tools_by_name.get(tool_call["name"])
+            if tool is None:
+                raise ValueError(f"Unknown tool: {tool_call['name']}")
+            async with semaphore:
+                # Invoking with the full tool call returns a ToolMessage carrying the artifact
+                return await tool.ainvoke({**tool_call, "type": "tool_call"})
+        except Exception as e:
+            return ToolMessage(
+                content=f"Error executing {tool_call['name']}: {e}",
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                status="error",
+            )
+
+    return list(await asyncio.gather(*(run(tc) for tc in tool_calls)))
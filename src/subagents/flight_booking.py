@@ -1,78 +1,27 @@
-from langgraph.types import Command
-from src.state import TravelPlannerState
-from src.tools import search_flights
-from src.model import model
-from src.prompts import FLIGHT_BOOKING_PROMPT
-from langgraph.graph import StateGraph, START, END
-from typing import Literal
-from langchain_core.messages import SystemMessage
+from typing import Any, Dict
 
-flight_booking_tools = [search_flights]
-tools_by_name = {tool.name: tool for tool in flight_booking_tools}
-model_with_tools = model.bind_tools(flight_booking_tools)
+from src.prompts import FLIGHT_BOOKING_PROMPT
+from src.subagents.registry import SubagentSpec, register
+from src.tools import BookFlight, book_flight, search_flights, search_flights_batch
 
 
-async def tool_handler(state: TravelPlannerState):
-    """
-    Tool-calling node that extracts the arguments from the tool call and invokes the tool.
-    Args:
-    - state: TravelPlannerState
-    Returns:
-    - Command: Command(update={"messages": result})
-    """
+def flight_scope(args: Dict[str, Any]) -> str:
+    """Prefix the instruction with the structured route when the supervisor provided one."""
 
-    result = []
-    # Iterate through tool calls
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observation = await tool.ainvoke(tool_call["args"])
-        result.append(
-            {
-                "role": "tool",
-                "content": observation,
-                "name": tool_call["name"],
-                "tool_call_id": tool_call["id"],
-            }
+    scope_text = args.get("instruction") or ""
+    if args.get("origin") and args.get("destination"):
+        scope_text = (
+            f"Book flight from {args['origin']} to {args['destination']}. {scope_text}"
         )
+    return scope_text
 
-    return {"messages": result}
-
-
-async def llm(state: TravelPlannerState):
-    messages = state["messages"]
-    messages_with_system = [SystemMessage(content=FLIGHT_BOOKING_PROMPT)] + messages
-    response = await model_with_tools.ainvoke(messages_with_system)
-    return Command(update={"messages": [response]})
-
-
-def should_continue(state: TravelPlannerState) -> Literal["tool_handler", "__end__"]:
-    """Route to tool handler, or end if no more tool calls."""
 
-    # Get the last message
-    messages = state["messages"]
-    last_message = messages[-1]
-
-    if not last_message.tool_calls:
-        return END
-    else:
-        return "tool_handler"
-
-
-# Build the graph
-graph = StateGraph(TravelPlannerState)
-graph.add_node("llm", llm)
-graph.add_node("tool_handler", tool_handler)
-
-graph.add_conditional_edges(
-    "llm",
-    should_continue,
-    {
-        "tool_handler": "tool_handler",
-        "__end__": END,
-    },
+flight_booking = register(
+    SubagentSpec(
+        name="flight_booking_agent",
+        prompt=FLIGHT_BOOKING_PROMPT,
+        tools=[search_flights, search_flights_batch, book_flight],
+        schema=BookFlight,
+        scope=flight_scope,
+    )
 )
-
-graph.add_edge(START, "llm")
-graph.add_edge("tool_handler", "llm")
-
-flight_booking_agent = graph.compile(name="flight_booking_agent")
@@ -0,0 +1,177 @@
+"""
+Declarative registry of the domain subagents.
+
+A domain agent is declared once with `register(SubagentSpec(...))`: its name, system prompt,
+search tools and the Pydantic schema the supervisor calls to delegate to it. Every registered
+agent runs on the same ReAct graph (`llm` <-> `tool_handler`), compiled once on first use; the
+agent is picked per run from `config["configurable"]["subagent"]`, which `subagent_graph` binds.
+Adding a domain (trains, activities, ...) therefore only needs a prompt, tools and a schema.
+
+The supervisor dispatches on the delegate tool name with `subagent_for_tool`, a dict lookup.
+Each agent calls its own model (`node_model`); with `TRAVEL_MODEL_CASCADE=true` turns try the
+fast model first (see src/cascade.py).
+"""
+
+import functools
+from datetime import date
+from typing import Any, Callable, Dict, List, Literal, NamedTuple, Optional, Type
+
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+from pydantic import BaseModel
+
+from src.cascade import Cascade
+from src.config import MODEL_CASCADE, MODEL_CASCADE_FAST
+from src.metrics import instrument_node
+from src.model import ainvoke_model, get_model, node_model
+from src.state import TravelPlannerState
+from src.subagents.common import execute_tool_calls
+
+
+def instruction_scope(args: Dict[str, Any]) -> str:
+    """Scoped request for the subagent: the delegate call's instruction."""
+
+    return args.get("instruction") or ""
+
+
+class SubagentSpec(NamedTuple):
+    # Graph node / agent name, e.g. "hotel_booking_agent"
+    name: str
+    prompt: str
+    tools: List[Any]
+    # Delegate tool the supervisor binds, e.g. BookHotel
+    schema: Type[BaseModel]
+    # Turns the delegate call's arguments into the subagent's HumanMessage
+    scope: Callable[[Dict[str, Any]], str] = instruction_scope
+
+
+# Agent name -> spec, in registration order; delegate tool name -> spec
+SUBAGENTS: Dict[str, SubagentSpec] = {}
+_by_tool: Dict[str, SubagentSpec] = {}
+
+
+def register(spec: SubagentSpec) -> SubagentSpec:
+    for table, key in ((SUBAGENTS, spec.name), (_by_tool, spec.schema.__name__)):
+        if key in table:
+            raise ValueError(f"Subagent {key!r} is already registered")
+    SUBAGENTS[spec.name] = spec
+    _by_tool[spec.schema.__name__] = spec
+    return spec
+
+
+def subagent_for_tool(tool_name: str) -> Optional[SubagentSpec]:
+    """Spec behind a supervisor delegate tool, or None for an unknown tool."""
+
+    return _by_tool.get(tool_name)
+
+
+@functools.lru_cache(maxsize=None)
+def tools_by_name(agent: str) -> Dict[str, Any]:
+    return {tool.name: tool for tool in SUBAGENTS[agent].tools}
+
+
+@functools.lru_cache(maxsize=None)
+def model_with_tools(agent: str, model: Optional[str] = None):
+    """
+    Chat model `model` (default: the agent's `node_model`) with `agent`'s tools bound, built on
+    the agent's first turn.
+    """
+
+    return get_model(model or node_model(agent)).bind_tools(SUBAGENTS[agent].tools)
+
+
+# Optional fast-model-first policy for subagent turns
+cascade = Cascade(MODEL_CASCADE_FAST) if MODEL_CASCADE else None
+
+
+def _agent(config: RunnableConfig) -> str:
+    return config["configurable"]["subagent"]
+
+
+@instrument_node()
+async def tool_handler(state: TravelPlannerState, config: RunnableConfig):
+    """
+    Tool-calling node that extracts the arguments from the tool call and invokes the tool.
+    Args:
+    - state: TravelPlannerState
+    - config: RunnableConfig naming the subagent
+    Returns:
+    - dict: {"messages": result}
+    """
+
+    # Run independent tool calls from the same turn concurrently, preserving their order
+    result = await execute_tool_calls(
+        state["messages"][-1].tool_calls, tools_by_name(_agent(config))
+    )
+
+    return {"messages": result}
+
+
+@instrument_node()
+async def llm(state: TravelPlannerState, config: RunnableConfig):
+    agent = _agent(config)
+    messages = state["messages"]
+    # Today's date lets the agent turn "next week" into a search date window
+    messages_with_system = [
+        SystemMessage(content=SUBAGENTS[agent].prompt),
+        SystemMessage(content=f"Today's date: {date.today().isoformat()}"),
+    ] + messages
+    if cascade is None:
+        response = await ainvoke_model(model_with_tools(agent), messages_with_system)
+    else:
+        response = await cascade.ainvoke(
+            agent,
+            messages_with_system,
+            model_with_tools(agent, cascade.fast_model),
+            model_with_tools(agent),
+            tools_by_name(agent),
+        )
+    return Command(update={"messages": [response]})
+
+
+def should_continue(state: TravelPlannerState) -> Literal["tool_handler", "__end__"]:
+    """Route to tool handler, or end if no more tool calls."""
+
+    messages = state["messages"]
+    last_message = messages[-1]
+
+    if not last_message.tool_calls:
+        return END
+    else:
+        return "tool_handler"
+
+
+@functools.lru_cache(maxsize=None)
+def react_graph():
+    """The ReAct graph every subagent runs on, compiled once."""
+
+    graph = StateGraph(TravelPlannerState)
+    graph.add_node("llm", llm)
+    graph.add_node("tool_handler", tool_handler)
+
+    graph.add_conditional_edges(
+        "llm",
+        should_continue,
+        {
+            "tool_handler": "tool_handler",
+            "__end__": END,
+        },
+    )
+
+    graph.add_edge(START, "llm")
+    graph.add_edge("tool_handler", "llm")
+
+    return graph.compile(name="subagent")
+
+
+@functools.lru_cache(maxsize=None)
+def subagent_graph(agent: str):
+    """`react_graph` bound to `agent`; binding is cheap and shares the compiled graph."""
+
+    if agent not in SUBAGENTS:
+        raise ValueError(f"Unknown subagent: {agent}")
+    return react_graph().with_config(
+        {"configurable": {"subagent": agent}, "run_name": agent}
+    )
@@ -0,0 +1,24 @@
+"""
+Token estimates for chat messages.
+
+Counts are approximated from message text (about four characters per token) plus a fixed
+per-message overhead, which is close enough for budgeting without loading a tokenizer.
+"""
+
+from typing import Sequence
+
+from langchain_core.messages import BaseMessage
+
+# Per-message overhead for role and formatting tokens
+_MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    total = 0
+    for message in messages:
+        content = message.content
+        text = content if isinstance(content, str) else str(content)
+        total += len(text) // 4 + _MESSAGE_OVERHEAD
+        for tool_call in getattr(message, "tool_calls", None) or ():
+            total += len(str(tool_call.get("args", ""))) // 4 + _MESSAGE_OVERHEAD
+    return total
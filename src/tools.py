@@ -1,13 +1,143 @@
-import aiosqlite
+import asyncio
+import functools
 import re
-from typing import Annotated, Optional, Dict, Any, List
-from datetime import datetime
-from langchain_core.tools import tool
+from typing import Annotated, Optional, Dict, Any, Iterable, List, Tuple
+from datetime import date, datetime
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import InjectedToolCallId, tool
 from pydantic import BaseModel, Field
 from src.model import Destination, TravelBooking
-from src.model import model
+from src.model import FlightOption, CarOption, HotelOption, SearchPage
+from src.config import (
+    BOOKING_BUSY_TIMEOUT_MS,
+    BOOKING_MAX_BATCH,
+    BOOKING_SYNCHRONOUS,
+    DB_PATH,
+    DB_POOL_SIZE,
+    DB_SEED_PATH,
+    DB_AUTO_MIGRATE,
+    INVENTORY_SNAPSHOT,
+    INVENTORY_SNAPSHOT_REFRESH_SECONDS,
+    PREFETCH,
+    PREFETCH_CONCURRENCY,
+    PREFETCH_MAX_ENTRIES,
+    PREFETCH_TTL_SECONDS,
+    RESULT_TOP_K,
+    SEARCH_COALESCE,
+)
+from src.db.bookings import BOOKABLE, BookingStore
+from src.db.pool import ConnectionPool, ensure_database
+from src.db.query import (
+    NO_FILTER,
+    SearchFilter,
+    filter_rows,
+    inventory_query,
+    search_filter,
+    trip_query,
+)
+from src.db.snapshot import InventorySnapshot
+from src.cities import CityIndex
+from src.encoding import encode_results, page_bounds
+from src.metrics import instrument_tool
+from src.prefetch import Prefetcher
+from src.singleflight import SingleFlight
+
+
+# Inventory objects are built on first use, so importing the tools (and the graph) opens nothing
+@functools.lru_cache(maxsize=None)
+def inventory_database() -> str:
+    """Path of the runtime copy of the committed seed inventory, made on first use."""
+
+    ensure_database(DB_PATH, DB_SEED_PATH, DB_AUTO_MIGRATE)
+    return DB_PATH
+
+
+@functools.lru_cache(maxsize=None)
+def inventory_pool() -> ConnectionPool:
+    """Long-lived read connections shared by all search tools."""
+
+    return ConnectionPool(
+        inventory_database(), size=DB_POOL_SIZE, auto_migrate=DB_AUTO_MIGRATE
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def booking_store() -> BookingStore:
+    """Single group-commit writer for bookings; searches keep using the read-only pool."""
+
+    return BookingStore(
+        inventory_database(),
+        synchronous=BOOKING_SYNCHRONOUS,
+        max_batch=BOOKING_MAX_BATCH,
+        busy_timeout_ms=BOOKING_BUSY_TIMEOUT_MS,
+        auto_migrate=DB_AUTO_MIGRATE,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def inventory_snapshot() -> Optional[InventorySnapshot]:
+    """Optional in-memory copy of the inventory; when enabled, searches never touch SQLite."""
+
+    if not INVENTORY_SNAPSHOT:
+        return None
+    return InventorySnapshot(
+        inventory_database(),
+        refresh_interval=INVENTORY_SNAPSHOT_REFRESH_SECONDS,
+        auto_migrate=DB_AUTO_MIGRATE,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def city_index() -> CityIndex:
+    """Resolves "NYC", "JFK", "paris, france" etc. to the canonical inventory city."""
+
+    return CityIndex(inventory_database())
+
+
+# Concurrent lookups of the same (table, resolved key) share one query
+search_coalescer = SingleFlight("search") if SEARCH_COALESCE else None
+
+# Hotel and car lookups warmed in the background for BookFlight destinations; a snapshot
+# already answers them without I/O
+inventory_prefetch = (
+    Prefetcher(
+        max_concurrency=PREFETCH_CONCURRENCY,
+        ttl_seconds=PREFETCH_TTL_SECONDS,
+        max_entries=PREFETCH_MAX_ENTRIES,
+    )
+    if PREFETCH and not INVENTORY_SNAPSHOT
+    else None
+)
+PREFETCH_TABLES = ("hotels", "cars")
+
+
+async def _lookup(table: str, key: Any, query, search: SearchFilter = NO_FILTER):
+    if inventory_prefetch is not None and table in PREFETCH_TABLES:
+        rows = await inventory_prefetch.get((table, key))
+        if rows is not None:
+            # Prefetches hold every offer for the key; filter them like the query would
+            return filter_rows(rows, search)
+    if search_coalescer is None:
+        return await query()
+    return await search_coalescer.run((table, key, search), query)
+
+
+async def close_inventory() -> None:
+    """
+    Commit queued bookings and close the inventory connections; call on shutdown. Hosts that skip
+    it still exit: the pool also closes its connections when its event loop shuts down.
+    """
+
+    # Only what was used: closing must not build (or copy the database for) the rest
+    if booking_store.cache_info().currsize:
+        await booking_store().close()
+    if inventory_pool.cache_info().currsize:
+        await inventory_pool().close()
+    if inventory_snapshot.cache_info().currsize:
+        snapshot = inventory_snapshot()
+        if snapshot is not None:
+            snapshot.close()
 
-DB_PATH = "src/db/travel_data.db"
 
 ## SUPERVISOR TOOLS
 ## ----------------------------------------------------------------------------
@@ -62,140 +192,735 @@ class RentCar(BaseModel):
     )
 
 
+## INVENTORY QUERIES
+## ----------------------------------------------------------------------------
+
+
+def _offer(row) -> dict:
+    return {"travel_date": row[4], "price": row[5], "available": row[6]}
+
+
+def flight_option(row) -> dict:
+    return {
+        "flight_id": row[0],
+        "origin_city": row[1],
+        "destination_city": row[2],
+        "plane_type": row[3],
+        **_offer(row),
+    }
+
+
+def car_option(row) -> dict:
+    return {
+        "car_id": row[0],
+        "pickup_city": row[1],
+        "make": row[2],
+        "color": row[3],
+        **_offer(row),
+    }
+
+
+def hotel_option(row) -> dict:
+    return {
+        "hotel_id": row[0],
+        "location_city": row[1],
+        "name": row[2],
+        "description": row[3],
+        **_offer(row),
+    }
+
+
+async def _rows(table: str, key: Any, search: SearchFilter = NO_FILTER) -> list:
+    """Offers under one search key (route tuple or city), filtered and ranked by `search`."""
+
+    snapshot = inventory_snapshot()
+    if snapshot is not None:
+        rows = await snapshot.lookup(table, key)
+        return filter_rows(rows, search)
+    keys = key if isinstance(key, tuple) else (key,)
+    return await inventory_pool().fetchall(*inventory_query(table, keys, search))
+
+
+async def find_flights(
+    origin_city: str, destination_city: str, search: SearchFilter = NO_FILTER
+) -> List[dict]:
+    """Search inventory for flights between two cities; city names are normalized first."""
+
+    route = (city_index().resolve(origin_city), city_index().resolve(destination_city))
+    rows = await _lookup(
+        "flights", route, lambda: _rows("flights", route, search), search
+    )
+
+    return [flight_option(row) for row in rows]
+
+
+async def find_cars(pickup_city: str, search: SearchFilter = NO_FILTER) -> List[dict]:
+    """Search inventory for rental cars in a city; city names are normalized first."""
+
+    pickup_city = city_index().resolve(pickup_city)
+    rows = await _lookup(
+        "cars", pickup_city, lambda: _rows("cars", pickup_city, search), search
+    )
+
+    return [car_option(row) for row in rows]
+
+
+async def find_hotels(
+    location_city: str, search: SearchFilter = NO_FILTER
+) -> List[dict]:
+    """Search inventory for hotels in a city; city names are normalized first."""
+
+    location_city = city_index().resolve(location_city)
+    rows = await _lookup(
+        "hotels", location_city, lambda: _rows("hotels", location_city, search), search
+    )
+
+    return [hotel_option(row) for row in rows]
+
+
+def prefetch_destinations(owner: Any, cities: Iterable[str]) -> None:
+    """
+    Start warming the hotel and car lookups for `cities` in the background, on behalf of
+    conversation thread `owner`. The owner's prefetches for earlier destinations are released:
+    the new ones replace them. Nothing is prefetched without an owner, since no thread could
+    release it.
+    """
+
+    if inventory_prefetch is None or owner is None:
+        return
+    # Ordered: when the concurrency limit drops some, the first destinations are warmed first
+    keys = dict.fromkeys(
+        (table, city_index().resolve(city))
+        for city in cities
+        for table in PREFETCH_TABLES
+    )
+    inventory_prefetch.cancel(owner, keep=keys)
+    for table, city in keys:
+        inventory_prefetch.schedule(
+            owner, (table, city), lambda table=table, city=city: _rows(table, city)
+        )
+
+
+def cancel_prefetch(owner: Any) -> None:
+    """Release `owner`'s prefetches, e.g. when its conversation thread ends."""
+
+    if inventory_prefetch is not None:
+        inventory_prefetch.cancel(owner)
+
+
+async def find_trip(
+    origin_city: str, destination_city: str, search: SearchFilter
+) -> Dict[str, List[dict]]:
+    """
+    Flights for the route plus hotels and cars at the destination, from one UNION ALL query on
+    one pooled connection, every group filtered by `search`. Takes canonical city names
+    (`city_index().resolve`). Returns {"flights": [...], "hotels": [...], "cars": [...]}.
+    """
+
+    async def query():
+        snapshot = inventory_snapshot()
+        if snapshot is not None:
+            return {
+                "flights": filter_rows(
+                    await snapshot.lookup("flights", (origin_city, destination_city)),
+                    search,
+                ),
+                "hotels": filter_rows(
+                    await snapshot.lookup("hotels", destination_city), search
+                ),
+                "cars": filter_rows(
+                    await snapshot.lookup("cars", destination_city), search
+                ),
+            }
+        rows = await inventory_pool().fetchall(
+            *trip_query(origin_city, destination_city, search)
+        )
+        grouped: Dict[str, list] = {"flights": [], "hotels": [], "cars": []}
+        for row in rows:
+            grouped[row[0]].append(tuple(row[1:]))
+        return grouped
+
+    grouped = await _lookup("trip", (origin_city, destination_city), query, search)
+    return {
+        "flights": [flight_option(row) for row in grouped["flights"]],
+        "hotels": [hotel_option(row) for row in grouped["hotels"]],
+        "cars": [car_option(row) for row in grouped["cars"]],
+    }
+
+
+## SEARCH TOOLS
+## ----------------------------------------------------------------------------
+
+Offset = Annotated[
+    int,
+    "Index of the first result to return; use the offset given when more are available",
+]
+Fields = Annotated[
+    Optional[List[str]],
+    "Optional subset of columns to return, e.g. ['flight_id', 'plane_type']",
+]
+# Any of these returns only available offers, cheapest first
+DateFrom = Annotated[Optional[str], "Earliest travel date, YYYY-MM-DD (inclusive)"]
+DateTo = Annotated[Optional[str], "Latest travel date, YYYY-MM-DD (inclusive)"]
+MaxPrice = Annotated[Optional[float], "Highest acceptable price"]
+Cheapest = Annotated[Optional[int], "Return only this many of the cheapest offers"]
+
+
+def _page(
+    rows: List[dict], option: type, offset: int, fields: Optional[List[str]], noun: str
+) -> Tuple[str, SearchPage]:
+    """Model-facing table plus the typed page artifact for one search."""
+
+    offset = max(0, offset)
+    content = encode_results(rows, fields, offset=offset, noun=noun)
+    artifact = SearchPage(
+        items=[option(**row) for row in rows[offset : offset + RESULT_TOP_K]],
+        total=len(rows),
+        offset=offset,
+        next_offset=page_bounds(len(rows), offset),
+    )
+    return content, artifact
+
+
 @tool(
     "search_flights",
     description=(
-        "Search for available flights by origin city and destination city. "
-        "Returns flight options with aircraft type and route information."
+        "Search for available flights by origin city and destination city, optionally within a "
+        "departure date window, under a maximum fare, or only the cheapest few. "
+        "Returns flight options with aircraft type, date, price and seats available "
+        "as a table with a header row, one page at a time."
     ),
+    response_format="content_and_artifact",
 )
-async def search_flights(origin_city: str, destination_city: str) -> List[dict]:
+@instrument_tool
+async def search_flights(
+    origin_city: str,
+    destination_city: str,
+    offset: Offset = 0,
+    fields: Fields = None,
+    date_from: DateFrom = None,
+    date_to: DateTo = None,
+    max_price: MaxPrice = None,
+    cheapest: Cheapest = None,
+) -> Tuple[str, SearchPage]:
     """
     Search for flights between two cities
 
     Args:
         origin_city: Departure city name
         destination_city: Arrival city name
+        offset: First result to return
+        fields: Columns to include (all if omitted)
+        date_from: Earliest departure date
+        date_to: Latest departure date
+        max_price: Highest acceptable fare
+        cheapest: Number of cheapest flights to return
 
     Returns:
-        List of flight options with details
-    """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        cursor = await conn.cursor()
-
-        # Query database for flights matching origin and destination
-        await cursor.execute(
-            """
-            SELECT id, origin_city, destination_city, plane_type
-            FROM flights 
-            WHERE origin_city = ? AND destination_city = ?
-        """,
-            (origin_city, destination_city),
-        )
-
-        rows = await cursor.fetchall()
-
-        flights = []
-        for row in rows:
-            flights.append(
-                {
-                    "flight_id": row[0],
-                    "origin_city": row[1],
-                    "destination_city": row[2],
-                    "plane_type": row[3],
-                }
-            )
-
-        return str(flights)
+        Page of flight options for the model, and the typed page as artifact
+    """
+    search = search_filter(date_from, date_to, max_price, cheapest)
+    flights = await find_flights(origin_city, destination_city, search)
+    return _page(flights, FlightOption, offset, fields, "flights")
 
 
 @tool(
     "search_cars",
     description=(
         "Search for available rental cars. If the user mentions a city, use that as the pickup city. "
-        "Returns car options with make and color information."
+        "Optionally filter by rental date window and maximum daily price, or keep only the cheapest few. "
+        "Returns car options with make, color, date, price and cars available "
+        "as a table with a header row, one page at a time."
     ),
+    response_format="content_and_artifact",
 )
-async def search_cars(pickup_city: str) -> List[dict]:
+@instrument_tool
+async def search_cars(
+    pickup_city: str,
+    offset: Offset = 0,
+    fields: Fields = None,
+    date_from: DateFrom = None,
+    date_to: DateTo = None,
+    max_price: MaxPrice = None,
+    cheapest: Cheapest = None,
+) -> Tuple[str, SearchPage]:
     """
     Search for rental cars in a specific city
 
     Args:
         pickup_city: City where car will be picked up
+        offset: First result to return
+        fields: Columns to include (all if omitted)
+        date_from: Earliest rental day
+        date_to: Latest rental day
+        max_price: Highest acceptable price per day
+        cheapest: Number of cheapest cars to return
 
     Returns:
-        List of car rental options with details
-    """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        cursor = await conn.cursor()
-
-        # Query database for cars available in the pickup city
-        await cursor.execute(
-            """
-            SELECT id, pickup_city, make, color
-            FROM cars 
-            WHERE pickup_city = ?
-        """,
-            (pickup_city,),
+        Page of car rental options for the model, and the typed page as artifact
+    """
+    search = search_filter(date_from, date_to, max_price, cheapest)
+    cars = await find_cars(pickup_city, search)
+    return _page(cars, CarOption, offset, fields, "cars")
+
+
+@tool(
+    "search_hotels",
+    description=(
+        "Search for hotel accommodations by location city, optionally within a date window, under a "
+        "maximum nightly price, or only the cheapest few. "
+        "Returns hotel options with name, description, date, price and rooms available "
+        "as a table with a header row, one page at a time."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def search_hotels(
+    location_city: str,
+    offset: Offset = 0,
+    fields: Fields = None,
+    date_from: DateFrom = None,
+    date_to: DateTo = None,
+    max_price: MaxPrice = None,
+    cheapest: Cheapest = None,
+) -> Tuple[str, SearchPage]:
+    """
+    Search for hotels in a specific city
+
+    Args:
+        location_city: City where hotels are located
+        offset: First result to return
+        fields: Columns to include (all if omitted)
+        date_from: Earliest night
+        date_to: Latest night
+        max_price: Highest acceptable price per night
+        cheapest: Number of cheapest hotels to return
+
+    Returns:
+        Page of hotel options for the model, and the typed page as artifact
+    """
+    search = search_filter(date_from, date_to, max_price, cheapest)
+    hotels = await find_hotels(location_city, search)
+    return _page(hotels, HotelOption, offset, fields, "hotels")
+
+
+## BATCH SEARCH TOOLS
+## ----------------------------------------------------------------------------
+
+# Keys per batched query; keeps bound parameters well under SQLite's limit
+MAX_BATCH_KEYS = 200
+
+# Columns shown in grouped results (batch and trip searches)
+FLIGHT_FIELDS = ["flight_id", "plane_type", "travel_date", "price"]
+HOTEL_FIELDS = ["hotel_id", "name", "description", "travel_date", "price"]
+CAR_FIELDS = ["car_id", "make", "color", "travel_date", "price"]
+
+
+class FlightRoute(BaseModel):
+    """One origin/destination pair in a batched flight search."""
+
+    origin_city: str = Field(description="Departure city name")
+    destination_city: str = Field(description="Arrival city name")
+
+
+def _chunks(items: List[Any], size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _grouped(
+    groups: Dict[str, List[dict]], option: type, fields: List[str], noun: str
+) -> Tuple[str, Dict[str, SearchPage]]:
+    """One first page per route or city; the group key columns are left out of each table."""
+
+    sections, artifact = [], {}
+    for label, rows in groups.items():
+        body = encode_results(
+            rows,
+            fields,
+            noun=noun,
+            more_hint="search this one alone with offset={next_offset}",
+        )
+        sections.append(f"## {label}\n{body}")
+        artifact[label] = SearchPage(
+            items=[option(**row) for row in rows[:RESULT_TOP_K]],
+            total=len(rows),
+            next_offset=page_bounds(len(rows), 0),
         )
+    return "\n\n".join(sections), artifact
 
-        rows = await cursor.fetchall()
 
-        cars = []
-        for row in rows:
-            cars.append(
-                {
-                    "car_id": row[0],
-                    "pickup_city": row[1],
-                    "make": row[2],
-                    "color": row[3],
-                }
+@tool(
+    "search_flights_batch",
+    description=(
+        "Search for flights on several origin/destination pairs in one call, e.g. every leg of a "
+        "multi-city itinerary. Returns flight options grouped by route."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def search_flights_batch(
+    routes: List[FlightRoute],
+) -> Tuple[str, Dict[str, SearchPage]]:
+    """
+    Search for flights on many routes with one set-based query
+
+    Args:
+        routes: Origin/destination pairs to search
+
+    Returns:
+        First page of flight options per distinct route, and the typed pages as artifact
+    """
+    pairs = list(
+        dict.fromkeys(
+            (
+                city_index().resolve(r.origin_city),
+                city_index().resolve(r.destination_city),
+            )
+            for r in routes
+        )
+    )
+    by_route: Dict[tuple, list] = {pair: [] for pair in pairs}
+
+    snapshot = inventory_snapshot()
+    if snapshot is not None:
+        for pair in pairs:
+            by_route[pair] = await snapshot.lookup("flights", pair)
+    else:
+        for chunk in _chunks(pairs, MAX_BATCH_KEYS):
+            # Join the requested routes against the route index in a single statement
+            values = ", ".join("(?, ?)" for _ in chunk)
+            rows = await inventory_pool().fetchall(
+                f"""
+                WITH routes (origin_city, destination_city) AS (VALUES {values})
+                SELECT f.id, f.origin_city, f.destination_city, f.plane_type,
+                       f.travel_date, f.price, f.available
+                FROM routes
+                JOIN flights f
+                  ON f.origin_city = routes.origin_city
+                 AND f.destination_city = routes.destination_city
+                ORDER BY f.id
+            """,
+                [city for pair in chunk for city in pair],
             )
+            for row in rows:
+                by_route[(row[1], row[2])].append(row)
 
-        return str(cars)
+    groups = {}
+    for (origin_city, destination_city), rows in by_route.items():
+        groups[f"{origin_city} -> {destination_city}"] = [
+            flight_option(row) for row in rows
+        ]
+
+    return _grouped(groups, FlightOption, FLIGHT_FIELDS, "flights")
 
 
 @tool(
-    "search_hotels",
+    "search_cars_batch",
     description=(
-        "Search for hotel accommodations by location city. "
-        "Returns hotel options with name and description information."
+        "Search for available rental cars in several pickup cities in one call. "
+        "Returns car options grouped by pickup city."
     ),
+    response_format="content_and_artifact",
 )
-async def search_hotels(location_city: str) -> List[dict]:
+@instrument_tool
+async def search_cars_batch(
+    pickup_cities: List[str],
+) -> Tuple[str, Dict[str, SearchPage]]:
     """
-    Search for hotels in a specific city
+    Search for rental cars in many cities with one set-based query
 
     Args:
-        location_city: City where hotels are located
+        pickup_cities: Cities where cars will be picked up
 
     Returns:
-        List of hotel options with details
-    """
-    async with aiosqlite.connect(DB_PATH) as conn:
-        cursor = await conn.cursor()
-
-        # Query database for hotels in the specified city
-        await cursor.execute(
-            """
-            SELECT id, location_city, name, description
-            FROM hotels 
-            WHERE location_city = ?
-        """,
-            (location_city,),
-        )
+        First page of car rental options per distinct city, and the typed pages as artifact
+    """
+    cities = list(dict.fromkeys(city_index().resolve(city) for city in pickup_cities))
+    by_city: Dict[str, list] = {city: [] for city in cities}
+
+    snapshot = inventory_snapshot()
+    if snapshot is not None:
+        for city in cities:
+            by_city[city] = await snapshot.lookup("cars", city)
+    else:
+        for chunk in _chunks(cities, MAX_BATCH_KEYS):
+            rows = await inventory_pool().fetchall(
+                f"""
+                SELECT id, pickup_city, make, color, travel_date, price, available
+                FROM cars
+                WHERE pickup_city IN ({", ".join("?" for _ in chunk)})
+                ORDER BY id
+            """,
+                chunk,
+            )
+            for row in rows:
+                by_city[row[1]].append(row)
 
-        rows = await cursor.fetchall()
+    groups = {}
+    for city, rows in by_city.items():
+        groups[city] = [car_option(row) for row in rows]
 
-        hotels = []
-        for row in rows:
-            hotels.append(
-                {
-                    "hotel_id": row[0],
-                    "location_city": row[1],
-                    "name": row[2],
-                    "description": row[3],
-                }
+    return _grouped(groups, CarOption, CAR_FIELDS, "cars")
+
+
+@tool(
+    "search_hotels_batch",
+    description=(
+        "Search for hotel accommodations in several cities in one call, e.g. every stop of a "
+        "multi-city trip. Returns hotel options grouped by city."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def search_hotels_batch(
+    location_cities: List[str],
+) -> Tuple[str, Dict[str, SearchPage]]:
+    """
+    Search for hotels in many cities with one set-based query
+
+    Args:
+        location_cities: Cities where hotels are located
+
+    Returns:
+        First page of hotel options per distinct city, and the typed pages as artifact
+    """
+    cities = list(dict.fromkeys(city_index().resolve(city) for city in location_cities))
+    by_city: Dict[str, list] = {city: [] for city in cities}
+
+    snapshot = inventory_snapshot()
+    if snapshot is not None:
+        for city in cities:
+            by_city[city] = await snapshot.lookup("hotels", city)
+    else:
+        for chunk in _chunks(cities, MAX_BATCH_KEYS):
+            rows = await inventory_pool().fetchall(
+                f"""
+                SELECT id, location_city, name, description, travel_date, price, available
+                FROM hotels
+                WHERE location_city IN ({", ".join("?" for _ in chunk)})
+                ORDER BY id
+            """,
+                chunk,
             )
+            for row in rows:
+                by_city[row[1]].append(row)
+
+    groups = {}
+    for city, rows in by_city.items():
+        groups[city] = [hotel_option(row) for row in rows]
 
-        return str(hotels)
+    return _grouped(groups, HotelOption, HOTEL_FIELDS, "hotels")
+
+
+## TRIP SEARCH
+## ----------------------------------------------------------------------------
+
+
+@tool(
+    "search_trip",
+    description=(
+        "Search flights from the origin to the destination together with hotels and rental cars at "
+        "the destination, in one call. Use it for complete-trip requests (flight, hotel and car) "
+        "with a known origin and destination and no specific preferences. Returns the first page "
+        "of each, grouped."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def search_trip(
+    origin_city: str, destination_city: str
+) -> Tuple[str, Dict[str, SearchPage]]:
+    """
+    Search flights, hotels and cars for a trip with a single inventory query
+
+    Args:
+        origin_city: Departure city name
+        destination_city: Arrival city name, where hotels and cars are searched
+
+    Returns:
+        First page of flights, hotels and cars, and the typed pages as artifact
+    """
+    origin = city_index().resolve(origin_city)
+    destination = city_index().resolve(destination_city)
+    # Only offers that can still be booked: sold-out and past-dated rows are left out
+    upcoming = SearchFilter(date_from=date.today().isoformat())
+    trip = await find_trip(origin, destination, upcoming)
+
+    sections, artifact = [], {}
+    # (kind, option, fields, heading, delegate tool that pages further)
+    for kind, option, fields, label, delegate in (
+        (
+            "flights",
+            FlightOption,
+            FLIGHT_FIELDS,
+            f"Flights {origin} -> {destination}",
+            "BookFlight",
+        ),
+        (
+            "hotels",
+            HotelOption,
+            HOTEL_FIELDS,
+            f"Hotels in {destination}",
+            "BookHotel",
+        ),
+        (
+            "cars",
+            CarOption,
+            CAR_FIELDS,
+            f"Cars in {destination}",
+            "RentCar",
+        ),
+    ):
+        rows = trip[kind]
+        body = encode_results(
+            rows,
+            fields,
+            noun=kind,
+            more_hint=f"use {delegate} to see the rest",
+        )
+        sections.append(f"## {label}\n{body}")
+        artifact[kind] = SearchPage(
+            items=[option(**row) for row in rows[:RESULT_TOP_K]],
+            total=len(rows),
+            next_offset=page_bounds(len(rows), 0),
+        )
+    return "\n\n".join(sections), artifact
+
+
+## BOOKING TOOLS
+## ----------------------------------------------------------------------------
+
+ExpectedPrice = Annotated[
+    Optional[float],
+    "Unit price shown in the search results; the booking fails if the price has changed",
+]
+
+
+def _idempotency_key(config: RunnableConfig, tool_call_id: str) -> str:
+    # A replayed tool call keeps its id, so it finds the booking the first attempt made
+    thread_id = config.get("configurable", {}).get("thread_id", "")
+    return f"{thread_id}:{tool_call_id}"
+
+
+async def _book(
+    booking_type: str,
+    item_id: str,
+    quantity: int,
+    expected_price: Optional[float],
+    config: RunnableConfig,
+    tool_call_id: str,
+) -> Tuple[str, TravelBooking]:
+    booking = await booking_store().book(
+        booking_type,
+        item_id,
+        quantity,
+        _idempotency_key(config, tool_call_id),
+        expected_price,
+    )
+    # The booking changed availability only, which does not reload whole snapshot tables
+    table = BOOKABLE[booking_type].table
+    snapshot = inventory_snapshot()
+    if snapshot is not None:
+        await asyncio.to_thread(snapshot.refresh_row, table, item_id)
+    if inventory_prefetch is not None and table in PREFETCH_TABLES:
+        inventory_prefetch.discard((table, booking.destination))
+    content = (
+        f"Booked {booking.booking_id}: {booking.details}. Total {booking.price:.2f}"
+    )
+    return content, booking
+
+
+@tool(
+    "book_flight",
+    description=(
+        "Book seats on a flight offer returned by a flight search, by flight_id. Pass the fare "
+        "shown in the search as expected_price. Returns the booking id and details; fails if "
+        "the flight is sold out or its fare changed."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def book_flight(
+    flight_id: str,
+    config: RunnableConfig,
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    seats: Annotated[int, "Number of seats"] = 1,
+    expected_price: ExpectedPrice = None,
+) -> Tuple[str, TravelBooking]:
+    """
+    Book seats on a flight offer
+
+    Args:
+        flight_id: Flight offer to book
+        seats: Number of seats
+        expected_price: Fare per seat the traveler agreed to
+
+    Returns:
+        Booking confirmation for the model, and the TravelBooking as artifact
+    """
+    return await _book("flight", flight_id, seats, expected_price, config, tool_call_id)
+
+
+@tool(
+    "book_hotel",
+    description=(
+        "Book rooms at a hotel offer returned by a hotel search, by hotel_id. Each offer is one "
+        "night; book every night of a stay. Pass the nightly price shown in the search as "
+        "expected_price. Returns the booking id and details; fails if no rooms are left or the "
+        "price changed."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def book_hotel(
+    hotel_id: str,
+    config: RunnableConfig,
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    rooms: Annotated[int, "Number of rooms"] = 1,
+    expected_price: ExpectedPrice = None,
+) -> Tuple[str, TravelBooking]:
+    """
+    Book rooms at a hotel offer for one night
+
+    Args:
+        hotel_id: Hotel offer to book
+        rooms: Number of rooms
+        expected_price: Price per room and night the traveler agreed to
+
+    Returns:
+        Booking confirmation for the model, and the TravelBooking as artifact
+    """
+    return await _book("hotel", hotel_id, rooms, expected_price, config, tool_call_id)
+
+
+@tool(
+    "book_car",
+    description=(
+        "Reserve a rental car offer returned by a car search, by car_id. Each offer is one "
+        "rental day; book every day of the rental. Pass the daily price shown in the search as "
+        "expected_price. Returns the booking id and details; fails if no cars are left or the "
+        "price changed."
+    ),
+    response_format="content_and_artifact",
+)
+@instrument_tool
+async def book_car(
+    car_id: str,
+    config: RunnableConfig,
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    cars: Annotated[int, "Number of cars"] = 1,
+    expected_price: ExpectedPrice = None,
+) -> Tuple[str, TravelBooking]:
+    """
+    Reserve a rental car offer for one day
+
+    Args:
+        car_id: Car offer to book
+        cars: Number of cars
+        expected_price: Price per car and day the traveler agreed to
+
+    Returns:
+        Booking confirmation for the model, and the TravelBooking as artifact
+    """
+    return await _book("car", car_id, cars, expected_price, config, tool_call_id)
@@ -0,0 +1,28 @@
+"""
+HTTP app mounted by the LangGraph server (`http.app` in langgraph.json).
+
+It adds no routes. Its lifespan starts the metrics endpoint (with `TRAVEL_METRICS` and
+`TRAVEL_METRICS_PORT` set) when the server starts, and closes the inventory connections and
+commits queued bookings when it shuts down.
+"""
+
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+
+from src.config import METRICS, METRICS_PORT
+from src.metrics import serve
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    server = serve(METRICS_PORT) if METRICS and METRICS_PORT else None
+    yield
+    if server is not None:
+        server.shutdown()
+    from src.tools import close_inventory
+
+    await close_inventory()
+
+
+app = Starlette(lifespan=lifespan)